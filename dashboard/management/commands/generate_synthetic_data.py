@@ -0,0 +1,324 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from accounts.models import User, Vendor
+from inventory.models import Inventory, HistoricalInventory
+from purchase.models import PurchaseRequisition, SupplierBid, PurchaseOrder
+from logistics.models import Invoice
+from dashboard.synthetic import (
+    LOCATIONS,
+    generate_synthetic_weekly_demand,
+    generate_synthetic_stock,
+    generate_gstins,
+)
+
+
+def to_decimal(value):
+    return Decimal(f"{value:.2f}")
+
+
+class Command(BaseCommand):
+    help = "Generate reproducible synthetic users, vendors, inventory, demand history, requisitions, bids, orders and invoices"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--officers", type=int, default=5)
+        parser.add_argument("--vendors", type=int, default=20)
+        parser.add_argument("--items", type=int, default=100)
+        parser.add_argument(
+            "--weeks",
+            type=int,
+            default=260,
+            help="Weeks of demand history per inventory item",
+        )
+        parser.add_argument(
+            "--requisition-rate",
+            type=float,
+            default=0.5,
+            help="Share of inventory items with a purchase requisition",
+        )
+        parser.add_argument(
+            "--bids", type=int, default=3, help="Supplier bids per requisition"
+        )
+        parser.add_argument(
+            "--order-rate",
+            type=float,
+            default=0.5,
+            help="Share of requisitions with an accepted bid and a purchase order",
+        )
+        parser.add_argument(
+            "--invoice-rate",
+            type=float,
+            default=0.8,
+            help="Share of purchase orders with an invoice",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--prefix",
+            default="synthetic",
+            help="Prefix of the generated usernames, emails and document numbers",
+        )
+        parser.add_argument("--password", default="synthetic-password")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["officers"] < 1 or options["vendors"] < 1:
+            raise CommandError("At least one officer and one vendor are required.")
+        if options["weeks"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--weeks and --batch-size must be at least 1.")
+        for option in ["requisition_rate", "order_rate", "invoice_rate"]:
+            if not 0 <= options[option] <= 1:
+                raise CommandError(
+                    f"--{option.replace('_', '-')} must be between 0 and 1."
+                )
+
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(
+                f"Synthetic data with the prefix '{prefix}' already exists, use another --prefix."
+            )
+
+        self.rng = np.random.default_rng(options["seed"])
+        self.prefix = prefix
+        self.batch_size = options["batch_size"]
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            officers, vendors = self.create_users(
+                options["officers"], options["vendors"], options["password"]
+            )
+            items, history_rows = self.create_inventory(
+                officers, options["items"], options["weeks"]
+            )
+            requisitions, bids, orders = self.create_purchases(
+                items,
+                vendors,
+                options["requisition_rate"],
+                min(options["bids"], len(vendors)),
+                options["order_rate"],
+            )
+            invoices = self.create_invoices(orders, options["invoice_rate"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(officers)} officers, {len(vendors)} vendors, "
+                f"{len(items)} inventory items, {history_rows} history rows, "
+                f"{len(requisitions)} requisitions, {len(bids)} bids, "
+                f"{len(orders)} orders and {len(invoices)} invoices "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        )
+
+    def create_users(self, n_officers, n_vendors, password):
+        # Hashing is slow, every generated user shares one password hash
+        password = make_password(password)
+        gstins = generate_gstins(self.prefix, n_officers + n_vendors)
+        roles = ["procurement_officer"] * n_officers + ["vendor"] * n_vendors
+
+        users = [
+            User(
+                username=f"{self.prefix}_{role}_{index}",
+                email=f"{self.prefix}_{role}_{index}@example.com",
+                password=password,
+                first_name=role.replace("_", " ").title(),
+                last_name=str(index),
+                phone_number=f"9{index:09d}",
+                gstin=gstin,
+                company_name=f"{self.prefix.title()} Company {index}",
+                address=f"{index} Main Street",
+                user_role=role,
+            )
+            for index, (role, gstin) in enumerate(zip(roles, gstins))
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        officers, vendors = users[:n_officers], users[n_officers:]
+
+        vendor_types = self.rng.choice(
+            [choice for choice, _ in Vendor.VENDOR_TYPE_CHOICES], size=n_vendors
+        )
+        ratings = self.rng.uniform(1, 5, size=n_vendors).round(1)
+        total_ratings = self.rng.integers(1, 50, size=n_vendors)
+        Vendor.objects.bulk_create(
+            [
+                Vendor(
+                    user=user,
+                    vendor_certified=True,
+                    vendor_type=vendor_type,
+                    vendor_rating=rating,
+                    total_ratings=total,
+                )
+                for user, vendor_type, rating, total in zip(
+                    vendors,
+                    vendor_types.tolist(),
+                    ratings.tolist(),
+                    total_ratings.tolist(),
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+        return officers, vendors
+
+    def create_inventory(self, officers, n_items, n_weeks):
+        now = timezone.now()
+        datetimes = [now - timedelta(weeks=n_weeks - week) for week in range(n_weeks)]
+
+        # Items are created together with their history, a chunk at a time,
+        # so memory does not grow with the number of items
+        chunk_items = max(1, self.batch_size // n_weeks)
+        items = []
+        history_rows = 0
+        for chunk_start in range(0, n_items, chunk_items):
+            size = min(chunk_items, n_items - chunk_start)
+            demand = generate_synthetic_weekly_demand(self.rng, size, n_weeks)
+            stock = generate_synthetic_stock(self.rng, demand)
+            officer_index = self.rng.integers(0, len(officers), size=size)
+            location_index = self.rng.integers(0, len(LOCATIONS), size=size)
+            unit_price = self.rng.uniform(1, 1000, size=size)
+
+            chunk = [
+                Inventory(
+                    item_name=f"{self.prefix.title()} Item {chunk_start + index}",
+                    description=f"Synthetic inventory item {chunk_start + index}",
+                    unit_price=to_decimal(unit_price[index]),
+                    stock_quantity=int(stock[index, -1]),
+                    location=LOCATIONS[location_index[index]],
+                    procurement_officer=officers[officer_index[index]],
+                )
+                for index in range(size)
+            ]
+            Inventory.objects.bulk_create(chunk, batch_size=self.batch_size)
+            items.extend(chunk)
+
+            HistoricalInventory.objects.bulk_create(
+                (
+                    HistoricalInventory(
+                        stock_quantity=stock_value,
+                        demand=demand_value,
+                        datetime=datetime,
+                        inventory_id=item.id,
+                    )
+                    for item, demand_row, stock_row in zip(
+                        chunk, demand.tolist(), stock.tolist()
+                    )
+                    for datetime, demand_value, stock_value in zip(
+                        datetimes, demand_row, stock_row
+                    )
+                ),
+                batch_size=self.batch_size,
+            )
+            history_rows += demand.size
+
+        return items, history_rows
+
+    def create_purchases(self, items, vendors, requisition_rate, n_bids, order_rate):
+        today = timezone.localdate()
+        n_requisitions = int(round(len(items) * requisition_rate))
+        requisition_items = [
+            items[index]
+            for index in np.sort(
+                self.rng.choice(len(items), size=n_requisitions, replace=False)
+            )
+        ]
+
+        quantity = self.rng.integers(10, 500, size=n_requisitions)
+        delivery_days = self.rng.integers(7, 60, size=n_requisitions)
+        urgency = self.rng.choice(["low", "medium", "high"], size=n_requisitions)
+        # Requisitions with an order are approved, the others are mostly still open
+        ordered = (
+            self.rng.random(n_requisitions) < order_rate
+            if n_bids
+            else np.zeros(n_requisitions, dtype=bool)
+        )
+        rejected = ~ordered & (self.rng.random(n_requisitions) < 0.2)
+        requisition_status = np.select(
+            [ordered, rejected], ["approved", "rejected"], default="pending"
+        )
+
+        requisitions = [
+            PurchaseRequisition(
+                requisition_number=f"{self.prefix.upper()}-PR-{index:06d}",
+                quantity_requested=int(quantity[index]),
+                expected_delivery_date=today
+                + timedelta(days=int(delivery_days[index])),
+                urgency_level=urgency[index],
+                status=requisition_status[index],
+                inventory=item,
+            )
+            for index, item in enumerate(requisition_items)
+        ]
+        PurchaseRequisition.objects.bulk_create(
+            requisitions, batch_size=self.batch_size
+        )
+
+        bids = []
+        winning_bids = []
+        for index, requisition in enumerate(requisitions):
+            supplier_index = self.rng.choice(len(vendors), size=n_bids, replace=False)
+            extra_quantity = self.rng.integers(0, 50, size=n_bids)
+            price_factor = self.rng.uniform(0.8, 1.2, size=n_bids)
+            days_delivery = self.rng.integers(1, 30, size=n_bids)
+            unit_price = float(requisition.inventory.unit_price)
+            for bid_index in range(n_bids):
+                if ordered[index]:
+                    bid_status = "accepted" if bid_index == 0 else "rejected"
+                elif rejected[index]:
+                    bid_status = "rejected"
+                else:
+                    bid_status = "submitted"
+                bid = SupplierBid(
+                    quantity_fulfilled=requisition.quantity_requested
+                    + int(extra_quantity[bid_index]),
+                    unit_price=to_decimal(unit_price * price_factor[bid_index]),
+                    days_delivery=int(days_delivery[bid_index]),
+                    status=bid_status,
+                    supplier=vendors[supplier_index[bid_index]],
+                    requisition=requisition,
+                )
+                bids.append(bid)
+                if bid_status == "accepted":
+                    winning_bids.append(bid)
+        SupplierBid.objects.bulk_create(bids, batch_size=self.batch_size)
+
+        order_status = self.rng.choice(
+            ["pending", "shipped", "delivered"], size=len(winning_bids)
+        )
+        orders = [
+            PurchaseOrder(
+                order_number=f"{self.prefix.upper()}-PO-{index:06d}",
+                status=order_status[index],
+                bid=bid,
+            )
+            for index, bid in enumerate(winning_bids)
+        ]
+        PurchaseOrder.objects.bulk_create(orders, batch_size=self.batch_size)
+
+        return requisitions, bids, orders
+
+    def create_invoices(self, orders, invoice_rate):
+        today = timezone.localdate()
+        invoiced = self.rng.random(len(orders)) < invoice_rate
+        account_numbers = self.rng.integers(10**11, 10**12, size=len(orders))
+        payment_mode = self.rng.choice(
+            [choice for choice, _ in Invoice.PAYMENT_MODE_CHOICES], size=len(orders)
+        )
+        payment_status = self.rng.choice(["paid", "pending"], size=len(orders))
+
+        invoices = [
+            Invoice(
+                invoice_number=f"{self.prefix.upper()}-INV-{index:06d}",
+                account_number=str(account_numbers[index]),
+                total_amount=order.bid.unit_price * order.bid.quantity_fulfilled,
+                payment_due_date=today + timedelta(days=30),
+                payment_mode=payment_mode[index],
+                payment_status=payment_status[index],
+                order=order,
+            )
+            for index, order in enumerate(orders)
+            if invoiced[index]
+        ]
+        Invoice.objects.bulk_create(invoices, batch_size=self.batch_size)
+        return invoices
@@ -0,0 +1,54 @@
+import zlib
+import string
+import numpy as np
+
+LOCATIONS = ["Mumbai", "Pune", "Delhi", "Bengaluru", "Chennai", "Kolkata"]
+
+
+def generate_synthetic_weekly_demand(rng, n_series, n_weeks):
+    # Yearly seasonal demand with a linear trend and noise, one row per series
+    weeks = np.arange(n_weeks)
+    level = rng.uniform(5, 100, size=(n_series, 1))
+    amplitude = level * rng.uniform(0.1, 0.5, size=(n_series, 1))
+    phase = rng.uniform(0, 2 * np.pi, size=(n_series, 1))
+    trend = level * rng.uniform(-0.001, 0.005, size=(n_series, 1))
+    noise = rng.normal(0, 1, size=(n_series, n_weeks)) * level * 0.1
+    demand = (
+        level
+        + amplitude * np.sin(2 * np.pi * weeks / 52 + phase)
+        + trend * weeks
+        + noise
+    )
+    return np.clip(demand, 0, None).round().astype(int)
+
+
+def generate_synthetic_stock(rng, demand):
+    # Stock is drawn down by demand and refilled to an order-up-to level when it runs low,
+    # weeks are stepped in order for all series at once
+    n_series, n_weeks = demand.shape
+    order_up_to = np.ceil(
+        demand.mean(axis=1) * rng.uniform(4, 8, size=n_series) + 1
+    ).astype(int)
+    reorder_point = order_up_to // 4
+    stock = np.empty_like(demand)
+    current = order_up_to.copy()
+    for week in range(n_weeks):
+        current = np.maximum(current - demand[:, week], 0)
+        current = np.where(current <= reorder_point, order_up_to, current)
+        stock[:, week] = current
+    return stock
+
+
+def generate_gstins(prefix, count):
+    # State code and serial number come from the prefix, the five PAN letters from the index,
+    # so runs with different prefixes do not collide
+    checksum = zlib.crc32(prefix.encode("utf-8"))
+    state, serial = checksum % 100, checksum // 100 % 10000
+    gstins = []
+    for index in range(count):
+        letters = ""
+        for _ in range(5):
+            index, remainder = divmod(index, 26)
+            letters = string.ascii_uppercase[remainder] + letters
+        gstins.append(f"{state:02d}{letters}{serial:04d}A1Z5")
+    return gstins
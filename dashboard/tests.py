@@ -3,11 +3,15 @@ from django.urls import reverse
 from django.core.cache import cache
 from rest_framework import status
 from rest_framework.test import APIClient
+from io import StringIO
 from datetime import timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.utils import timezone
 from accounts.models import User, Vendor
-from inventory.models import Inventory
+from inventory.models import Inventory, HistoricalInventory
 from purchase.models import PurchaseRequisition, SupplierBid, PurchaseOrder
+from logistics.models import Invoice
 
 
 class SetupClass(TestCase):
@@ -186,3 +190,89 @@ class DashboardViewsTests(SetupClass, TestCase):
         self.client.force_authenticate(user=self.vendor)
         response = self.client.post(self.vendor_dashboard_url)
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class GenerateSyntheticDataCommandTests(TestCase):
+    def generate(self, prefix, seed=1):
+        out = StringIO()
+        call_command(
+            "generate_synthetic_data",
+            "--officers=2",
+            "--vendors=4",
+            "--items=30",
+            "--weeks=60",
+            "--bids=3",
+            "--requisition-rate=0.5",
+            "--order-rate=0.5",
+            "--invoice-rate=1",
+            f"--seed={seed}",
+            f"--prefix={prefix}",
+            "--batch-size=500",
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_generate_synthetic_data(self):
+        output = self.generate("load")
+        self.assertIn("30 inventory items", output)
+
+        self.assertEqual(
+            User.objects.filter(user_role="procurement_officer").count(), 2
+        )
+        self.assertEqual(Vendor.objects.count(), 4)
+        self.assertEqual(Inventory.objects.count(), 30)
+        self.assertEqual(HistoricalInventory.objects.count(), 30 * 60)
+        self.assertEqual(PurchaseRequisition.objects.count(), 15)
+        self.assertEqual(SupplierBid.objects.count(), 45)
+
+        # Every order has exactly one accepted bid on an approved requisition
+        orders = PurchaseOrder.objects.select_related("bid__requisition")
+        self.assertEqual(
+            orders.count(), SupplierBid.objects.filter(status="accepted").count()
+        )
+        for order in orders:
+            self.assertEqual(order.bid.status, "accepted")
+            self.assertEqual(order.bid.requisition.status, "approved")
+        self.assertEqual(Invoice.objects.count(), orders.count())
+
+        # The current stock of an item is the last stock of its history
+        item = Inventory.objects.first()
+        latest = HistoricalInventory.objects.filter(inventory=item).latest("datetime")
+        self.assertEqual(item.stock_quantity, latest.stock_quantity)
+
+        user = User.objects.get(username="load_vendor_2")
+        self.assertTrue(user.check_password("synthetic-password"))
+        user.full_clean()
+
+    def test_generate_synthetic_data_is_reproducible(self):
+        self.generate("first", seed=7)
+        self.generate("second", seed=7)
+
+        def history(prefix):
+            return list(
+                HistoricalInventory.objects.filter(
+                    inventory__procurement_officer__username__startswith=f"{prefix}_"
+                )
+                .order_by("inventory_id", "datetime")
+                .values_list("demand", "stock_quantity")
+            )
+
+        self.assertEqual(history("first"), history("second"))
+        self.assertEqual(
+            list(
+                PurchaseRequisition.objects.filter(
+                    requisition_number__startswith="FIRST-"
+                ).values_list("quantity_requested", "status")
+            ),
+            list(
+                PurchaseRequisition.objects.filter(
+                    requisition_number__startswith="SECOND-"
+                ).values_list("quantity_requested", "status")
+            ),
+        )
+
+    def test_generate_synthetic_data_existing_prefix(self):
+        self.generate("load")
+        with self.assertRaises(CommandError):
+            self.generate("load")
+        self.assertEqual(Inventory.objects.count(), 30)
@@ -1,8 +1,22 @@
 from django.contrib import admin
-from .models import Inventory, HistoricalInventory, OptimizedInventory
+from .models import (
+    Inventory,
+    HistoricalInventory,
+    OptimizedInventory,
+    ForecastJob,
+    ForecastResult,
+    ARIMAModelOrder,
+    InventoryImport,
+    InventorySimulation,
+)
 
 # Register your models here.
 
 admin.site.register(Inventory)
 admin.site.register(HistoricalInventory)
 admin.site.register(OptimizedInventory)
+admin.site.register(ForecastJob)
+admin.site.register(ForecastResult)
+admin.site.register(ARIMAModelOrder)
+admin.site.register(InventoryImport)
+admin.site.register(InventorySimulation)
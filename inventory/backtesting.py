@@ -0,0 +1,108 @@
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .forecasting import (
+    FORECAST_ENGINES,
+    FORECAST_PARAMETERS,
+    calculate_mape,
+    fit_inline_auto_arima,
+)
+
+# tracemalloc only sees allocations of this process, so every engine fits in it.
+# Backtests are not served to users and already run in their own pool processes.
+BACKTEST_ENGINES = {**FORECAST_ENGINES, "auto_arima": fit_inline_auto_arima}
+
+
+def calculate_rmse(actual, predicted):
+    actual = np.asarray(actual, dtype=float)
+    predicted = np.asarray(predicted, dtype=float)
+    return float(np.sqrt(np.mean((actual - predicted) ** 2)))
+
+
+def generate_synthetic_monthly_demand(n_series, n_months, seed=None):
+    # Seasonal demand with a linear trend and noise, one row per series
+    rng = np.random.default_rng(seed)
+    months = np.arange(n_months)
+    level = rng.uniform(50, 500, size=(n_series, 1))
+    amplitude = level * rng.uniform(0.1, 0.5, size=(n_series, 1))
+    phase = rng.uniform(0, 2 * np.pi, size=(n_series, 1))
+    trend = level * rng.uniform(-0.005, 0.02, size=(n_series, 1))
+    noise = rng.normal(0, 1, size=(n_series, n_months)) * level * 0.1
+    demand = (
+        level
+        + amplitude * np.sin(2 * np.pi * months / 12 + phase)
+        + trend * months
+        + noise
+    )
+    return np.clip(demand, 0, None).round()
+
+
+def backtest_series(name, demand, engine, horizon, min_train, step):
+    # Rolling-origin cross-validation: refit on every origin, score the next `horizon` months
+    demand = np.asarray(demand, dtype=float)
+    actual, predicted = [], []
+    folds = 0
+    failed = 0
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for origin in range(min_train, len(demand) - horizon + 1, step):
+        try:
+            forecast = BACKTEST_ENGINES[engine](
+                pd.Series(demand[:origin]), horizon, m=FORECAST_PARAMETERS["m"]
+            )
+        except Exception:
+            failed += 1
+            continue
+        actual.extend(demand[origin : origin + horizon])
+        predicted.extend(forecast)
+        folds += 1
+    wall_time = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "series": name,
+        "engine": engine,
+        "folds": folds,
+        "failed_folds": failed,
+        "mape": calculate_mape(actual, predicted) if folds else np.nan,
+        "rmse": calculate_rmse(actual, predicted) if folds else np.nan,
+        "fit_time": wall_time / max(folds + failed, 1),
+        "peak_memory": peak_memory,
+    }
+
+
+def run_backtest(series, engines, horizon=12, min_train=24, step=1, workers=None):
+    # `series` maps a name to its monthly demand values
+    tasks = [
+        (name, list(demand), engine, horizon, min_train, step)
+        for name, demand in series.items()
+        for engine in engines
+    ]
+
+    if workers == 1:
+        return [backtest_series(*task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(backtest_series, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def summarize_backtest(results):
+    df = pd.DataFrame(results)
+    return (
+        df.groupby("engine", sort=False)
+        .agg(
+            series=("series", "count"),
+            folds=("folds", "sum"),
+            failed_folds=("failed_folds", "sum"),
+            mape=("mape", "mean"),
+            rmse=("rmse", "mean"),
+            fit_time=("fit_time", "mean"),
+            peak_memory=("peak_memory", "max"),
+        )
+        .reset_index()
+    )
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from procurement_system_backend.cache import get_version, bump_version
+
+INVENTORY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_inventory_generation_key(officer_id):
+    return f"{officer_id}_inventory_generation"
+
+
+def get_inventory_list_key(officer_id, generation):
+    return f"{officer_id}_inventory_list_{generation}"
+
+
+def get_inventory_item_key(inventory_id):
+    return f"{inventory_id}_inventory_item"
+
+
+def get_inventory_generation(officer_id):
+    return get_version(get_inventory_generation_key(officer_id))
+
+
+def bump_inventory_generation(officer_id):
+    # Items were added or removed, so the officer's cached id list is outdated
+    bump_version(get_inventory_generation_key(officer_id))
+
+
+def set_inventory_items(items):
+    cache.set_many(
+        {get_inventory_item_key(item["id"]): item for item in items},
+        timeout=INVENTORY_CACHE_TIMEOUT,
+    )
+
+
+def delete_inventory_items(inventory_ids):
+    cache.delete_many([get_inventory_item_key(id) for id in inventory_ids])
@@ -0,0 +1,139 @@
+import zipfile
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_FORMATS = ["npz", "parquet"] if pq is not None else ["npz"]
+EXPORT_CONTENT_TYPES = {
+    "npz": "application/zip",
+    "parquet": "application/vnd.apache.parquet",
+}
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def iter_history_chunks(historical_inventory, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Keyset pagination on id keeps memory flat, server-side cursors are disabled behind pgbouncer
+    last_id = 0
+    while True:
+        rows = list(
+            historical_inventory.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "inventory_id", "datetime", "stock_quantity", "demand")[
+                :chunk_rows
+            ]
+        )
+        if not rows:
+            return
+        last_id = rows[-1][0]
+
+        ids, inventory_ids, datetimes, stock_quantities, demands = zip(*rows)
+        yield {
+            "inventory_id": np.array(inventory_ids, dtype=np.int64),
+            "datetime": np.array(
+                [(value - EPOCH) // timedelta(microseconds=1) for value in datetimes],
+                dtype=np.int64,
+            ).astype("datetime64[us]"),
+            "stock_quantity": np.array(stock_quantities, dtype=np.int64),
+            "demand": np.array(demands, dtype=np.int64),
+        }
+
+
+class ExportStream:
+    # Write-only file whose bytes are taken out as soon as they are written, it cannot seek,
+    # so zip members are written with data descriptors
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+# Writers are generators that yield the number of rows written after every chunk
+
+
+def write_history_npz(file, chunks):
+    # Every chunk is written as its own compressed .npy members, e.g. demand_00000.npy
+    rows = 0
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index, chunk in enumerate(chunks):
+            for column, values in chunk.items():
+                with archive.open(f"{column}_{index:05d}.npy", "w") as member:
+                    np.lib.format.write_array(member, values, allow_pickle=False)
+            rows += len(chunk["demand"])
+            yield rows
+
+
+def read_history_npz(file):
+    columns = {}
+    with np.load(file) as archive:
+        for name in sorted(archive.files):
+            column = name.rsplit("_", 1)[0]
+            columns.setdefault(column, []).append(archive[name])
+    return {column: np.concatenate(values) for column, values in columns.items()}
+
+
+def write_history_parquet(file, chunks):
+    schema = pa.schema(
+        [
+            ("inventory_id", pa.int64()),
+            ("datetime", pa.timestamp("us", tz="UTC")),
+            ("stock_quantity", pa.int64()),
+            ("demand", pa.int64()),
+        ]
+    )
+    rows = 0
+    with pq.ParquetWriter(file, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            writer.write_table(pa.table(chunk).cast(schema))
+            rows += len(chunk["demand"])
+            yield rows
+
+
+EXPORT_WRITERS = {"npz": write_history_npz, "parquet": write_history_parquet}
+
+
+def export_history(
+    file, historical_inventory, file_format, chunk_rows=EXPORT_CHUNK_ROWS
+):
+    rows = 0
+    chunks = iter_history_chunks(historical_inventory, chunk_rows)
+    for rows in EXPORT_WRITERS[file_format](file, chunks):
+        pass
+    return rows
+
+
+def stream_history_export(
+    historical_inventory, file_format, chunk_rows=EXPORT_CHUNK_ROWS
+):
+    # The bytes of every chunk are sent before the next chunk is read,
+    # the archive footer follows once the writer is done
+    stream = ExportStream()
+    chunks = iter_history_chunks(historical_inventory, chunk_rows)
+    for _ in EXPORT_WRITERS[file_format](stream, chunks):
+        yield stream.take()
+    yield stream.take()
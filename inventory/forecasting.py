@@ -0,0 +1,596 @@
+import os
+import sys
+import json
+import time
+import signal
+import hashlib
+import multiprocessing
+import numpy as np
+import pandas as pd
+from pmdarima import ARIMA, auto_arima
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+import plotly.graph_objs as go
+import plotly.io as pio
+from statsmodels.tsa.seasonal import seasonal_decompose
+from statsmodels.stats.diagnostic import acorr_ljungbox
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from .models import ForecastResult, ARIMAModelOrder
+
+# Minimum and maximum number of months of demand history used for forecasting
+MIN_FORECAST_MONTHS = 24
+MAX_FORECAST_MONTHS = 60
+
+# Parameters of the forecasting model, part of the forecast result fingerprint
+FORECAST_PARAMETERS = {
+    "seasonal": True,
+    "m": 12,
+    "n_periods": 12,
+}
+
+DEFAULT_FORECAST_ENGINE = "auto_arima"
+
+# Limits for uploaded demand history files, which are parsed in chunks of rows
+MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+MAX_UPLOAD_ROWS = 1_000_000
+UPLOAD_CHUNK_ROWS = 50_000
+
+# The "auto" engine holds out the latest months and picks the cheapest engine
+# whose forecast error on them is below the threshold
+AUTO_ENGINE_HOLDOUT_MONTHS = 12
+AUTO_ENGINE_MAPE_THRESHOLD = 0.2
+
+# Stored ARIMA orders are reused for refits and searched again on a schedule,
+# or right away when a refit fails the Ljung-Box test that the searched model passed
+ARIMA_ORDER_MAX_AGE_DAYS = 30
+ARIMA_RESIDUAL_PVALUE_THRESHOLD = 0.05
+
+# How often a running fit process is checked against its timeout and memory limit
+FIT_POLL_INTERVAL = 0.1
+
+
+def fit_seasonal_naive(demand, n_periods, m=12):
+    # Repeat the last observed season
+    values = np.asarray(demand, dtype=float)
+    return np.tile(values[-m:], n_periods // m + 1)[:n_periods]
+
+
+def fit_ets(demand, n_periods, m=12):
+    model = ExponentialSmoothing(
+        np.asarray(demand, dtype=float),
+        trend="add",
+        seasonal="add",
+        seasonal_periods=m,
+        initialization_method="estimated",
+    ).fit()
+    return np.asarray(model.forecast(n_periods), dtype=float)
+
+
+class ForecastFitError(Exception):
+    pass
+
+
+class ForecastFitAborted(ForecastFitError):
+    # The fit process was killed for running too long or using too much memory
+    pass
+
+
+def get_process_tree_rss(pid):
+    # Resident memory in bytes of a process and its descendants, only available on Linux.
+    # Only the fit's own process tree is read, not every process on the host.
+    rss = 0
+    pids = [pid]
+    while pids:
+        pid = pids.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as file:
+                rss += int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            # Children are listed under the thread that started them
+            for tid in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{tid}/children") as file:
+                    pids.extend(int(child) for child in file.read().split())
+        except (OSError, ValueError, IndexError):
+            continue
+    return rss
+
+
+def run_fit(connection, fit, args):
+    # Worker processes started by the fit, e.g. for n_jobs, join its new process group
+    os.setsid()
+    try:
+        connection.send((True, fit(*args)))
+    except Exception as e:
+        connection.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+
+def run_fit_in_process(fit, *args, timeout=None, memory_limit=None):
+    # Fits run in a forked process, so a pathological series cannot hang or bloat the
+    # worker. The fit function must not use the database and must return picklable data.
+    # os.fork is used directly, multiprocessing does not start children from daemonic
+    # processes such as prefork Celery workers.
+    if timeout is None:
+        timeout = settings.FORECAST_FIT_TIMEOUT
+    if memory_limit is None:
+        memory_limit = settings.FORECAST_FIT_MEMORY_LIMIT * 1024 * 1024
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    pid = os.fork()
+    if pid == 0:
+        receiver.close()
+        try:
+            run_fit(sender, fit, args)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(0)
+    sender.close()
+
+    deadline = time.monotonic() + timeout
+    try:
+        while not receiver.poll(FIT_POLL_INTERVAL):
+            if time.monotonic() > deadline:
+                raise ForecastFitAborted(
+                    f"Model fit timed out after {timeout} seconds."
+                )
+            if memory_limit and get_process_tree_rss(pid) > memory_limit:
+                raise ForecastFitAborted(
+                    f"Model fit used more than {memory_limit // (1024 * 1024)}MB of memory."
+                )
+        try:
+            succeeded, result = receiver.recv()
+        except EOFError:
+            raise ForecastFitAborted("Model fit process exited without a result.")
+    finally:
+        # The fit process is not reaped yet, so its pid still names its process group
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        receiver.close()
+
+    if not succeeded:
+        raise ForecastFitError(result)
+    return result
+
+
+def search_arima_model(demand, m=12):
+    stepwise = settings.ARIMA_STEPWISE
+    return auto_arima(
+        demand,
+        seasonal=True,
+        m=m,
+        test="adf",
+        maxiter=100,
+        max_order=None,
+        d=None,
+        error_action="ignore",
+        suppress_warnings=True,
+        stepwise=stepwise,
+        # Only the full search can evaluate candidate orders in parallel
+        n_jobs=1 if stepwise else settings.ARIMA_N_JOBS,
+        trace=True,
+    )
+
+
+def get_residual_pvalue(model):
+    residuals = model.resid()
+    lags = max(1, min(12, len(residuals) // 5))
+    ljung_box = acorr_ljungbox(residuals, lags=[lags], return_df=True)
+    return float(ljung_box["lb_pvalue"].iloc[0])
+
+
+def get_arima_fit(model, n_periods):
+    return {
+        "order": list(model.order),
+        "seasonal_order": list(model.seasonal_order),
+        "residual_pvalue": get_residual_pvalue(model),
+        "forecast": np.asarray(
+            model.predict(n_periods=n_periods, return_conf_int=False)
+        ),
+    }
+
+
+def fit_searched_arima(demand, n_periods, m):
+    return get_arima_fit(search_arima_model(demand, m=m), n_periods)
+
+
+def fit_ordered_arima(demand, n_periods, order, seasonal_order):
+    model = ARIMA(
+        order=tuple(order),
+        seasonal_order=tuple(seasonal_order),
+        suppress_warnings=True,
+    ).fit(demand)
+    return get_arima_fit(model, n_periods)
+
+
+def fit_inline_auto_arima(demand, n_periods, m=12):
+    return fit_searched_arima(demand, n_periods, m)["forecast"]
+
+
+def fit_auto_arima(demand, n_periods, m=12):
+    return run_fit_in_process(fit_searched_arima, demand, n_periods, m)["forecast"]
+
+
+def search_and_store_arima_model(inventory_id, demand, m=12, n_periods=1):
+    fit = run_fit_in_process(fit_searched_arima, demand, n_periods, m)
+    ARIMAModelOrder.objects.update_or_create(
+        inventory_id=inventory_id,
+        defaults={
+            "order": fit["order"],
+            "seasonal_order": fit["seasonal_order"],
+            "residual_pvalue": fit["residual_pvalue"],
+            "date_searched": timezone.now(),
+        },
+    )
+    return fit
+
+
+def fit_warm_auto_arima(inventory_id, demand, n_periods, m=12):
+    fit = None
+    model_order = ARIMAModelOrder.objects.filter(inventory_id=inventory_id).first()
+    if model_order is not None:
+        try:
+            fit = run_fit_in_process(
+                fit_ordered_arima,
+                demand,
+                n_periods,
+                model_order.order,
+                model_order.seasonal_order,
+            )
+        except ForecastFitAborted:
+            # A full search would take even longer
+            raise
+        except ForecastFitError:
+            fit = None
+
+        if (
+            fit is not None
+            and model_order.residual_pvalue is not None
+            and model_order.residual_pvalue >= ARIMA_RESIDUAL_PVALUE_THRESHOLD
+            and fit["residual_pvalue"] < ARIMA_RESIDUAL_PVALUE_THRESHOLD
+        ):
+            fit = None
+
+    if fit is None:
+        fit = search_and_store_arima_model(
+            inventory_id, demand, m=m, n_periods=n_periods
+        )
+
+    return fit["forecast"]
+
+
+# Forecast engines, ordered from the cheapest to the most expensive to fit
+FORECAST_ENGINES = {
+    "seasonal_naive": fit_seasonal_naive,
+    "ets": fit_ets,
+    "auto_arima": fit_auto_arima,
+}
+
+FORECAST_ENGINE_CHOICES = ["auto", *FORECAST_ENGINES]
+
+
+def get_forecast_parameters(engine=DEFAULT_FORECAST_ENGINE):
+    return {**FORECAST_PARAMETERS, "engine": engine}
+
+
+def calculate_mape(actual, predicted):
+    # Periods without demand are left out, their percentage error is undefined
+    actual = np.asarray(actual, dtype=float)
+    predicted = np.asarray(predicted, dtype=float)
+    nonzero = actual != 0
+    if not nonzero.any():
+        return np.nan
+    return float(
+        np.mean(np.abs((actual[nonzero] - predicted[nonzero]) / actual[nonzero]))
+    )
+
+
+def select_forecast_engine(demand, m=12):
+    train = demand[:-AUTO_ENGINE_HOLDOUT_MONTHS]
+    test = demand[-AUTO_ENGINE_HOLDOUT_MONTHS:]
+
+    best_engine, best_mape = DEFAULT_FORECAST_ENGINE, np.inf
+    for engine, fit in FORECAST_ENGINES.items():
+        try:
+            predicted = fit(train, AUTO_ENGINE_HOLDOUT_MONTHS, m=m)
+        except Exception:
+            # Not every engine can be fitted on the shortened training series
+            continue
+
+        mape = calculate_mape(test, predicted)
+        if mape <= AUTO_ENGINE_MAPE_THRESHOLD:
+            return engine
+        if mape < best_mape:
+            best_engine, best_mape = engine, mape
+
+    return best_engine
+
+
+def serialize_monthly_demand(monthly_demand):
+    return {
+        "datetime": [index.isoformat() for index in monthly_demand.index],
+        "demand": [float(value) for value in monthly_demand["demand"]],
+    }
+
+
+def deserialize_monthly_demand(data):
+    df = pd.DataFrame(data)
+    df["datetime"] = pd.to_datetime(df["datetime"])
+    df.set_index("datetime", inplace=True)
+    return df.asfreq("M")
+
+
+class DemandFileError(ValueError):
+    pass
+
+
+def read_monthly_demand_csv(file):
+    if file.size > MAX_UPLOAD_SIZE:
+        raise DemandFileError(
+            f"File too large. Maximum size is {MAX_UPLOAD_SIZE // (1024 * 1024)} MB."
+        )
+
+    # Aggregate every chunk into monthly totals so the whole file is never in memory
+    monthly_totals = None
+    rows = 0
+    for chunk in pd.read_csv(file, chunksize=UPLOAD_CHUNK_ROWS, encoding="utf-8"):
+        if len(chunk.columns) < 2:
+            raise DemandFileError("Insufficient columns in the file")
+        elif len(chunk.columns) > 2:
+            raise DemandFileError("Too many columns in the file")
+
+        rows += len(chunk)
+        if rows > MAX_UPLOAD_ROWS:
+            raise DemandFileError(
+                f"Too many rows in the file. Maximum is {MAX_UPLOAD_ROWS} rows."
+            )
+
+        chunk.columns = ["datetime", "demand"]
+        months = pd.to_datetime(chunk["datetime"]).dt.to_period("M")
+        chunk_totals = pd.to_numeric(chunk["demand"]).groupby(months).sum()
+        if monthly_totals is None:
+            monthly_totals = chunk_totals
+        else:
+            monthly_totals = monthly_totals.add(chunk_totals, fill_value=0)
+
+    if monthly_totals is None:
+        raise DemandFileError("No rows in the file")
+
+    # Fill months without rows and label each month by its last day, as DataFrame.resample("M") does
+    months = pd.period_range(
+        monthly_totals.index.min(), monthly_totals.index.max(), freq="M"
+    )
+    monthly_totals = monthly_totals.reindex(months, fill_value=0)
+    index = pd.DatetimeIndex(
+        months.to_timestamp(how="end").normalize(), name="datetime", freq="M"
+    )
+    return pd.DataFrame({"demand": monthly_totals.to_numpy()}, index=index)
+
+
+def get_monthly_demand(historical_inventory):
+    # Aggregate in the database and fetch only the latest months needed for forecasting
+    monthly_totals = list(
+        historical_inventory.annotate(month=TruncMonth("datetime"))
+        .values("month")
+        .annotate(demand=Sum("demand"))
+        .order_by("-month")[:MAX_FORECAST_MONTHS]
+    )
+    if not monthly_totals:
+        return pd.DataFrame({"demand": []}, index=pd.DatetimeIndex([], name="datetime"))
+
+    df = pd.DataFrame(monthly_totals)
+    # Label each month by its last day, as DataFrame.resample("M") does
+    df["datetime"] = pd.to_datetime(df["month"]) + pd.offsets.MonthEnd(0)
+    df = df.set_index("datetime")[["demand"]].sort_index()
+
+    # Months without any history rows are missing from the aggregate
+    return df.asfreq("M", fill_value=0)[-MAX_FORECAST_MONTHS:]
+
+
+def get_forecast_fingerprint(monthly_demand, parameters):
+    payload = json.dumps(
+        {
+            "monthly_demand": serialize_monthly_demand(monthly_demand),
+            "parameters": parameters,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_legacy_forecast_result(forecast_data):
+    # Older results hold the figures themselves instead of the numeric series
+    return "history" not in forecast_data
+
+
+def get_stored_forecast_result(inventory_id, fingerprint):
+    cache_key = ForecastResult.get_cache_key(inventory_id, fingerprint)
+    forecast_data = cache.get(cache_key)
+
+    if forecast_data is None:
+        forecast_result = ForecastResult.objects.filter(
+            inventory_id=inventory_id, fingerprint=fingerprint
+        ).first()
+        if forecast_result is not None:
+            forecast_data = forecast_result.result
+            cache.set(cache_key, forecast_data, timeout=60 * 60 * 24)
+
+    # Results stored in the older format are fitted again and replaced
+    if forecast_data is not None and is_legacy_forecast_result(forecast_data):
+        return None
+    return forecast_data
+
+
+def store_forecast_result(
+    inventory_id, fingerprint, forecast_data, parameters, source="history"
+):
+    ForecastResult.objects.update_or_create(
+        inventory_id=inventory_id,
+        fingerprint=fingerprint,
+        defaults={"parameters": parameters, "result": forecast_data, "source": source},
+    )
+    cache_key = ForecastResult.get_cache_key(inventory_id, fingerprint)
+    cache.set(cache_key, forecast_data, timeout=60 * 60 * 24)
+
+
+def serialize_series(values):
+    # Decomposed components are undefined at the edges of the series
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def fit_forecast_engine(engine, demand, inventory_id=None):
+    # ARIMA refits of an inventory's own history reuse its stored model orders
+    if engine == "auto_arima" and inventory_id is not None:
+        return fit_warm_auto_arima(
+            inventory_id,
+            demand,
+            FORECAST_PARAMETERS["n_periods"],
+            m=FORECAST_PARAMETERS["m"],
+        )
+    return FORECAST_ENGINES[engine](
+        demand, FORECAST_PARAMETERS["n_periods"], m=FORECAST_PARAMETERS["m"]
+    )
+
+
+def calculate_forecast(
+    monthly_demand, engine=DEFAULT_FORECAST_ENGINE, inventory_id=None
+):
+    decomposed = seasonal_decompose(monthly_demand["demand"])
+
+    if engine == "auto":
+        engine = select_forecast_engine(
+            monthly_demand["demand"], m=FORECAST_PARAMETERS["m"]
+        )
+
+    fallback_from = None
+    try:
+        forecast_results = fit_forecast_engine(
+            engine, monthly_demand["demand"], inventory_id
+        )
+    except ForecastFitError:
+        # Fits that fail, time out or run out of memory fall back to the cheaper engines
+        fallback_from = engine
+        cheaper_engines = list(FORECAST_ENGINES)[: list(FORECAST_ENGINES).index(engine)]
+        for engine in reversed(cheaper_engines):
+            try:
+                forecast_results = fit_forecast_engine(
+                    engine, monthly_demand["demand"], inventory_id
+                )
+                break
+            except Exception:
+                if engine == cheaper_engines[0]:
+                    raise
+
+    forecast_dates = pd.date_range(
+        start=monthly_demand.index[-1],
+        periods=FORECAST_PARAMETERS["n_periods"] + 1,
+        freq="M",
+    )[1:]
+
+    forecast_data = {
+        "engine": engine,
+        "fallback_from": fallback_from,
+        "history": serialize_monthly_demand(monthly_demand),
+        "decomposition": {
+            "trend": serialize_series(decomposed.trend),
+            "seasonal": serialize_series(decomposed.seasonal),
+            "residual": serialize_series(decomposed.resid),
+        },
+        "forecast_datetime": [date.isoformat() for date in forecast_dates],
+        "forecast": [float(value) for value in forecast_results],
+        "annual_forecast": float(sum(forecast_results)),
+    }
+    return forecast_data
+
+
+def build_decomposed_figure(forecast_data):
+    dates = forecast_data["history"]["datetime"]
+    decomposition = forecast_data["decomposition"]
+    data_trace = go.Scatter(
+        x=dates, y=forecast_data["history"]["demand"], mode="lines", name="Data"
+    )
+    trend_trace = go.Scatter(
+        x=dates, y=decomposition["trend"], mode="lines", name="Trend"
+    )
+    seasonal_trace = go.Scatter(
+        x=dates, y=decomposition["seasonal"], mode="lines", name="Seasonal"
+    )
+    residual_trace = go.Scatter(
+        x=dates, y=decomposition["residual"], mode="lines", name="Residual"
+    )
+    layout = go.Layout(
+        title="Decomposed Components",
+        xaxis=dict(title="Date"),
+        yaxis=dict(title="Value"),
+        xaxis_rangeslider_visible=True,
+    )
+    fig = go.Figure(
+        data=[data_trace, trend_trace, seasonal_trace, residual_trace], layout=layout
+    )
+    return pio.to_json(fig)
+
+
+def build_forecast_figure(forecast_data):
+    trace1 = go.Scatter(
+        x=forecast_data["history"]["datetime"],
+        y=forecast_data["history"]["demand"],
+        mode="lines+markers",
+        name="Original Data",
+    )
+    trace2 = go.Scatter(
+        x=forecast_data["forecast_datetime"],
+        y=forecast_data["forecast"],
+        mode="lines+markers",
+        name="Forecast Data",
+    )
+    layout = go.Layout(
+        title="Demand Forecast",
+        xaxis=dict(title="Date"),
+        yaxis=dict(title="Demand"),
+        xaxis_rangeslider_visible=True,
+    )
+    fig = go.Figure(data=[trace1, trace2], layout=layout)
+    return pio.to_json(fig)
+
+
+FORECAST_FIGURES = {
+    "decomposed": build_decomposed_figure,
+    "graph": build_forecast_figure,
+}
+
+
+def get_forecast_figures(inventory_id, fingerprint, forecast_data, include):
+    if not include:
+        return {}
+    if is_legacy_forecast_result(forecast_data):
+        return {name: forecast_data[name] for name in include if name in forecast_data}
+
+    # Figures are only built when requested and kept next to the stored forecast
+    cache_key = ForecastResult.get_figures_cache_key(inventory_id, fingerprint)
+    figures = cache.get(cache_key)
+    if figures is None:
+        figures = (
+            ForecastResult.objects.filter(
+                inventory_id=inventory_id, fingerprint=fingerprint
+            )
+            .values_list("figures", flat=True)
+            .first()
+            or {}
+        )
+
+    missing = [name for name in include if name not in figures]
+    if missing:
+        for name in missing:
+            figures[name] = FORECAST_FIGURES[name](forecast_data)
+        ForecastResult.objects.filter(
+            inventory_id=inventory_id, fingerprint=fingerprint
+        ).update(figures=figures)
+    cache.set(cache_key, figures, timeout=60 * 60 * 24)
+
+    return {name: figures[name] for name in include}
@@ -0,0 +1,45 @@
+from datetime import timedelta
+from django.db.models import F, Sum, Window
+from django.db.models.functions import (
+    Greatest,
+    RowNumber,
+    TruncDay,
+    TruncWeek,
+    TruncMonth,
+)
+
+HISTORY_INTERVALS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+HISTORY_DELETE_BATCH = 1000
+
+
+def get_history_buckets(historical_inventory, bucket):
+    # One row per bucket: the latest row of the bucket, carrying the bucket's total demand
+    return (
+        historical_inventory.annotate(bucket=bucket)
+        .annotate(
+            bucket_demand=Window(Sum("demand"), partition_by=[F("bucket")]),
+            row_number=Window(
+                RowNumber(),
+                partition_by=[F("bucket")],
+                order_by=[F("datetime").desc(), F("id").desc()],
+            ),
+        )
+        .filter(row_number=1)
+        .order_by("bucket")
+        .values("bucket", "bucket_demand", "stock_quantity")
+    )
+
+
+def get_compaction_bucket(granularity):
+    if granularity == "day":
+        return TruncDay("datetime")
+    # Weeks are split at month starts so monthly demand totals stay the same
+    return Greatest(TruncWeek("datetime"), TruncMonth("datetime"))
+
+
+def get_compaction_cutoff(timestamp, granularity):
+    # Cutoffs fall on bucket starts, so no bucket is only partly compacted
+    cutoff = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        cutoff -= timedelta(days=cutoff.weekday())
+    return cutoff
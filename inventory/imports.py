@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+import os
+from itertools import islice
+
+IMPORT_FILE_EXTENSIONS = [".csv", ".json", ".jsonl"]
+MAX_IMPORT_SIZE = 50 * 1024 * 1024
+IMPORT_CHUNK_ROWS = 1000
+# Characters read at a time from a JSON array file
+IMPORT_READ_CHARS = 64 * 1024
+# Only the first errors are stored, the rest are counted in failed_rows
+MAX_IMPORT_ERRORS = 1000
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def get_import_file_extension(name):
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in IMPORT_FILE_EXTENSIONS:
+        raise ImportFileError(
+            f"Unsupported file type. Use one of {', '.join(IMPORT_FILE_EXTENSIONS)}."
+        )
+    return extension
+
+
+def read_import_rows(file, name):
+    extension = get_import_file_extension(name)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    if extension == ".csv":
+        yield from csv.DictReader(text)
+    elif extension == ".jsonl":
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Passed on as is, so it is reported as an invalid row
+                yield line.strip()
+    else:
+        yield from read_json_array(text)
+
+
+def read_json_array(text, read_chars=None):
+    # Items of a JSON array are decoded one at a time from a buffer that only holds
+    # the item being parsed, so the whole file is never in memory as one object
+    if read_chars is None:
+        read_chars = IMPORT_READ_CHARS
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def next_char():
+        nonlocal buffer, position, eof
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or eof:
+                return buffer[position : position + 1]
+            buffer, position = text.read(read_chars), 0
+            eof = not buffer
+
+    if next_char() != "[":
+        raise ImportFileError("JSON files must contain a list of items.")
+    position += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        try:
+            row, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            row, end = None, None
+            if eof:
+                raise ImportFileError(f"Invalid JSON file: {e}")
+        # An item cut off at the end of the buffer, or a number that may continue,
+        # is decoded again with more of the file
+        if end is None or (end == len(buffer) and not eof):
+            more = text.read(max(read_chars, len(buffer) - position))
+            buffer, position, eof = buffer[position:] + more, 0, not more
+            continue
+        yield row
+        position = end
+
+        separator = next_char()
+        position += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ImportFileError("Invalid JSON file: expected ',' or ']'.")
+
+
+def chunk_import_rows(rows, size=IMPORT_CHUNK_ROWS):
+    # Rows are numbered from 1 in the order they appear in the file
+    numbered_rows = enumerate(rows, start=1)
+    while True:
+        chunk = list(islice(numbered_rows, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import Inventory, HistoricalInventory
+from inventory.forecasting import (
+    FORECAST_ENGINES,
+    MIN_FORECAST_MONTHS,
+    get_monthly_demand,
+)
+from inventory.backtesting import (
+    generate_synthetic_monthly_demand,
+    run_backtest,
+    summarize_backtest,
+)
+
+
+class Command(BaseCommand):
+    help = "Backtest forecast engines with rolling-origin cross-validation over synthetic or stored demand history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--engines",
+            nargs="+",
+            choices=list(FORECAST_ENGINES),
+            default=list(FORECAST_ENGINES),
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=None,
+            help="Number of synthetic series to generate instead of reading HistoricalInventory",
+        )
+        parser.add_argument("--months", type=int, default=60)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--inventory-ids", nargs="+", type=int, default=None)
+        parser.add_argument("--horizon", type=int, default=12)
+        parser.add_argument("--min-train", type=int, default=MIN_FORECAST_MONTHS)
+        parser.add_argument("--step", type=int, default=1)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of worker processes (defaults to the number of CPUs)",
+        )
+
+    def handle(self, *args, **options):
+        if options["synthetic"] is not None:
+            demand = generate_synthetic_monthly_demand(
+                options["synthetic"], options["months"], seed=options["seed"]
+            )
+            series = {f"synthetic_{i}": values for i, values in enumerate(demand)}
+        else:
+            series = self.load_series(options["inventory_ids"])
+
+        min_months = options["min_train"] + options["horizon"]
+        series = {
+            name: values for name, values in series.items() if len(values) >= min_months
+        }
+        if not series:
+            raise CommandError(
+                f"No series with at least {min_months} months of demand to backtest."
+            )
+
+        results = run_backtest(
+            series,
+            options["engines"],
+            horizon=options["horizon"],
+            min_train=options["min_train"],
+            step=options["step"],
+            workers=options["workers"],
+        )
+
+        if options["verbosity"] > 1:
+            for result in results:
+                self.stdout.write(
+                    f"{result['series']} {result['engine']}: "
+                    f"MAPE={result['mape']:.4f} RMSE={result['rmse']:.4f} "
+                    f"fit_time={result['fit_time']:.4f}s "
+                    f"peak_memory={result['peak_memory'] / 1024 / 1024:.2f}MB"
+                )
+
+        summary = summarize_backtest(results)
+        summary["fit_time"] = summary["fit_time"].map("{:.4f}s".format)
+        summary["peak_memory"] = (summary["peak_memory"] / 1024 / 1024).map(
+            "{:.2f}MB".format
+        )
+        self.stdout.write(summary.to_string(index=False))
+
+    def load_series(self, inventory_ids):
+        inventory = Inventory.objects.all()
+        if inventory_ids is not None:
+            inventory = inventory.filter(id__in=inventory_ids)
+
+        series = {}
+        for inventory_id in inventory.values_list("id", flat=True):
+            monthly_demand = get_monthly_demand(
+                HistoricalInventory.objects.filter(inventory_id=inventory_id)
+            )
+            series[f"inventory_{inventory_id}"] = monthly_demand["demand"].to_numpy()
+        return series
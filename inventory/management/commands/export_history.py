@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from inventory.models import HistoricalInventory
+from inventory.export import EXPORT_CHUNK_ROWS, EXPORT_FORMATS, export_history
+
+
+class Command(BaseCommand):
+    help = "Export HistoricalInventory rows to a compressed columnar file (.npz, or Parquet when pyarrow is installed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the file to write")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="npz")
+        parser.add_argument("--inventory-ids", nargs="+", type=int, default=None)
+        parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+
+    def handle(self, *args, **options):
+        historical_inventory = HistoricalInventory.objects.all()
+        if options["inventory_ids"]:
+            historical_inventory = historical_inventory.filter(
+                inventory_id__in=options["inventory_ids"]
+            )
+
+        with open(options["output"], "wb") as file:
+            rows = export_history(
+                file,
+                historical_inventory,
+                options["format"],
+                chunk_rows=options["chunk_rows"],
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {rows} rows to {options['output']}")
+        )
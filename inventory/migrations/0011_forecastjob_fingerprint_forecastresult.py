@@ -0,0 +1,47 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0010_forecastjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forecastjob",
+            name="fingerprint",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.CreateModel(
+            name="ForecastResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=64)),
+                ("parameters", models.JSONField()),
+                ("result", models.JSONField()),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "inventory",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="inventory.inventory",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("inventory", "fingerprint")},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("inventory", "0011_forecastjob_fingerprint_forecastresult"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="forecastjob",
+            name="monthly_demand",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="ForecastBatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "procurement_officer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="forecastjob",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="jobs",
+                to="inventory.forecastbatch",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0012_alter_forecastjob_monthly_demand_forecastbatch_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forecastjob",
+            name="engine",
+            field=models.CharField(
+                choices=[
+                    ("auto", "Auto"),
+                    ("seasonal_naive", "Seasonal Naive"),
+                    ("ets", "Exponential Smoothing"),
+                    ("auto_arima", "Auto ARIMA"),
+                ],
+                default="auto_arima",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0013_forecastjob_engine"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forecastjob",
+            name="source",
+            field=models.CharField(
+                choices=[("history", "History"), ("upload", "Upload")],
+                default="history",
+                max_length=10,
+            ),
+        ),
+        migrations.CreateModel(
+            name="ARIMAModelOrder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("order", models.JSONField()),
+                ("seasonal_order", models.JSONField()),
+                ("residual_pvalue", models.FloatField(blank=True, null=True)),
+                ("date_searched", models.DateTimeField()),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                (
+                    "inventory",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="inventory.inventory",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-18 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0014_forecastjob_source_arimamodelorder"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forecastresult",
+            name="figures",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.10 on 2026-10-18 00:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import inventory.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("inventory", "0015_forecastresult_figures"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryImport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("task_id", models.CharField(blank=True, max_length=255, null=True)),
+                (
+                    "file",
+                    models.FileField(
+                        storage=inventory.models.select_import_storage,
+                        upload_to="inventory/imports",
+                    ),
+                ),
+                ("total_rows", models.PositiveIntegerField(default=0)),
+                ("created_rows", models.PositiveIntegerField(default=0)),
+                ("failed_rows", models.PositiveIntegerField(default=0)),
+                ("errors", models.JSONField(blank=True, default=list)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                (
+                    "procurement_officer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
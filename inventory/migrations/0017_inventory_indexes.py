@@ -0,0 +1,39 @@
+# Generated by Django 4.2.10 on 2026-10-18 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0016_inventoryimport"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="inventory",
+            name="item_name",
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["procurement_officer", "last_updated", "id"],
+                name="inventory_officer_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["procurement_officer", "location"],
+                name="inventory_officer_location_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["procurement_officer", "stock_quantity"],
+                name="inventory_officer_stock_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.10 on 2026-10-18 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0017_inventory_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="historicalinventory",
+            index=models.Index(
+                fields=["inventory", "datetime"], name="historical_inventory_dt_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.10 on 2026-10-18 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0018_historicalinventory_datetime_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="historicalinventory",
+            name="granularity",
+            field=models.CharField(
+                choices=[("raw", "Raw"), ("day", "Day"), ("week", "Week")],
+                default="raw",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:20
+
+from django.db import migrations, models
+
+
+def set_forecast_result_sources(apps, schema_editor):
+    # Stored results only came from uploads when no history job has the same fingerprint
+    ForecastJob = apps.get_model("inventory", "ForecastJob")
+    ForecastResult = apps.get_model("inventory", "ForecastResult")
+    upload_keys = set(
+        ForecastJob.objects.filter(source="upload", fingerprint__isnull=False)
+        .values_list("inventory_id", "fingerprint")
+        .distinct()
+    ) - set(
+        ForecastJob.objects.filter(source="history", fingerprint__isnull=False)
+        .values_list("inventory_id", "fingerprint")
+        .distinct()
+    )
+    for inventory_id, fingerprint in upload_keys:
+        ForecastResult.objects.filter(
+            inventory_id=inventory_id, fingerprint=fingerprint
+        ).update(source="upload")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0020_inventorysimulation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forecastresult",
+            name="source",
+            field=models.CharField(
+                choices=[("history", "History"), ("upload", "Upload")],
+                default="history",
+                max_length=10,
+            ),
+        ),
+        migrations.RunPython(set_forecast_result_sources, migrations.RunPython.noop),
+    ]
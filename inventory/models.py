@@ -1,12 +1,18 @@
 from django.db import models
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.validators import MaxValueValidator, MinValueValidator
+from cloudinary_storage.storage import RawMediaCloudinaryStorage
 from accounts.models import User
+from .caching import bump_inventory_generation, delete_inventory_items
 
 
 class Inventory(models.Model):
-    item_name = models.CharField(max_length=255)
+    # Also gets a pattern index on PostgreSQL for the name prefix filter
+    item_name = models.CharField(max_length=255, db_index=True)
     description = models.TextField()
     unit_price = models.DecimalField(
         max_digits=10, decimal_places=2, validators=[MinValueValidator(0.0)]
@@ -18,16 +24,48 @@ class Inventory(models.Model):
     image = models.ImageField(upload_to="inventory", null=True, blank=True)
     procurement_officer = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["procurement_officer", "last_updated", "id"],
+                name="inventory_officer_updated_idx",
+            ),
+            models.Index(
+                fields=["procurement_officer", "location"],
+                name="inventory_officer_location_idx",
+            ),
+            models.Index(
+                fields=["procurement_officer", "stock_quantity"],
+                name="inventory_officer_stock_idx",
+            ),
+        ]
+
     def __str__(self):
         return str(self.item_name)
 
 
 class HistoricalInventory(models.Model):
+    GRANULARITY_CHOICES = [
+        ("raw", "Raw"),
+        ("day", "Day"),
+        ("week", "Week"),
+    ]
     stock_quantity = models.PositiveIntegerField()
     demand = models.PositiveIntegerField(default=0)
     datetime = models.DateTimeField()
+    # Compacted rows stand for a whole day or week, dated at the start of it
+    granularity = models.CharField(
+        max_length=10, choices=GRANULARITY_CHOICES, default="raw"
+    )
     inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["inventory", "datetime"], name="historical_inventory_dt_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.inventory.item_name} - {self.datetime}"
 
@@ -57,6 +95,138 @@ class OptimizedInventory(models.Model):
         return str(self.inventory.item_name)
 
 
+class ForecastBatch(models.Model):
+    date_created = models.DateTimeField(auto_now_add=True)
+    procurement_officer = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    def __str__(self):
+        return f"{self.procurement_officer.username} - {self.date_created}"
+
+
+class BackgroundJob(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    task_id = models.CharField(max_length=255, null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class ForecastJob(BackgroundJob):
+    progress = models.PositiveIntegerField(
+        default=0, validators=[MaxValueValidator(100)]
+    )
+    ENGINE_CHOICES = [
+        ("auto", "Auto"),
+        ("seasonal_naive", "Seasonal Naive"),
+        ("ets", "Exponential Smoothing"),
+        ("auto_arima", "Auto ARIMA"),
+    ]
+    engine = models.CharField(
+        max_length=20, choices=ENGINE_CHOICES, default="auto_arima"
+    )
+    SOURCE_CHOICES = [("history", "History"), ("upload", "Upload")]
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default="history")
+    fingerprint = models.CharField(max_length=64, null=True, blank=True)
+    # Null when the job should load the demand history of the inventory itself
+    monthly_demand = models.JSONField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE)
+    batch = models.ForeignKey(
+        ForecastBatch,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+
+    def __str__(self):
+        return f"{self.inventory.item_name} - {self.status}"
+
+
+class ARIMAModelOrder(models.Model):
+    order = models.JSONField()
+    seasonal_order = models.JSONField()
+    # Ljung-Box p-value of the residuals of the model found by the last full search
+    residual_pvalue = models.FloatField(null=True, blank=True)
+    date_searched = models.DateTimeField()
+    last_updated = models.DateTimeField(auto_now=True)
+    inventory = models.OneToOneField(Inventory, on_delete=models.CASCADE)
+
+    def __str__(self):
+        return f"{self.inventory.item_name} - {self.order} {self.seasonal_order}"
+
+
+def select_import_storage():
+    # The default Cloudinary storage only takes images, CSV and JSON files are raw uploads
+    if (
+        settings.STORAGES["default"]["BACKEND"]
+        == "cloudinary_storage.storage.MediaCloudinaryStorage"
+    ):
+        return RawMediaCloudinaryStorage()
+    return default_storage
+
+
+class InventoryImport(BackgroundJob):
+    file = models.FileField(
+        upload_to="inventory/imports", storage=select_import_storage
+    )
+    total_rows = models.PositiveIntegerField(default=0)
+    created_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    # Validation errors of the failed rows, keyed by their row number in the file
+    errors = models.JSONField(default=list, blank=True)
+    procurement_officer = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    def __str__(self):
+        return f"{self.procurement_officer.username} - {self.status}"
+
+
+class ForecastResult(models.Model):
+    fingerprint = models.CharField(max_length=64)
+    # Whether the forecast was fitted on the inventory's own history or on an uploaded file
+    source = models.CharField(
+        max_length=10, choices=ForecastJob.SOURCE_CHOICES, default="history"
+    )
+    parameters = models.JSONField()
+    result = models.JSONField()
+    figures = models.JSONField(default=dict, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ["inventory", "fingerprint"]
+
+    def __str__(self):
+        return f"{self.inventory.item_name} - {self.fingerprint}"
+
+    @staticmethod
+    def get_cache_key(inventory_id, fingerprint):
+        return f"{inventory_id}_forecast_result_{fingerprint}"
+
+    @staticmethod
+    def get_figures_cache_key(inventory_id, fingerprint):
+        return f"{inventory_id}_forecast_figures_{fingerprint}"
+
+
+class InventorySimulation(BackgroundJob):
+    # Policy, demand distribution and run settings the simulation was submitted with
+    parameters = models.JSONField()
+    result = models.JSONField(null=True, blank=True)
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE)
+
+    def __str__(self):
+        return f"{self.inventory.item_name} - {self.status}"
+
+
 @receiver(post_save, sender=Inventory)
 def create_historical_inventory(sender, instance, created, **kwargs):
     timestamp = instance.last_updated if not created else instance.date_added
@@ -78,3 +248,36 @@ def create_historical_inventory(sender, instance, created, **kwargs):
         inventory=instance,
         demand=demand,
     )
+
+    # The new point changes the demand history, so stored forecasts are stale
+    invalidate_forecast_results([instance.id])
+
+
+@receiver(post_save, sender=Inventory)
+def invalidate_saved_inventory_cache(sender, instance, created, **kwargs):
+    delete_inventory_items([instance.id])
+    if created:
+        bump_inventory_generation(instance.procurement_officer_id)
+
+
+@receiver(post_delete, sender=Inventory)
+def invalidate_deleted_inventory_cache(sender, instance, **kwargs):
+    delete_inventory_items([instance.id])
+    bump_inventory_generation(instance.procurement_officer_id)
+
+
+def invalidate_forecast_results(inventory_ids):
+    forecast_results = ForecastResult.objects.filter(inventory_id__in=inventory_ids)
+    keys = list(forecast_results.values_list("inventory_id", "fingerprint"))
+    if keys:
+        cache.delete_many(
+            [
+                ForecastResult.get_cache_key(inventory_id, fingerprint)
+                for inventory_id, fingerprint in keys
+            ]
+            + [
+                ForecastResult.get_figures_cache_key(inventory_id, fingerprint)
+                for inventory_id, fingerprint in keys
+            ]
+        )
+        forecast_results.delete()
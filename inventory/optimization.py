@@ -0,0 +1,143 @@
+import math
+import numpy as np
+from scipy.stats import norm
+
+
+def calculate_eoq_classical(demand, ordering_cost, holding_cost):
+    eoq = np.sqrt((2 * demand * ordering_cost) / holding_cost)
+    return eoq
+
+
+def calculate_safety_stock_reorder_point(demand, lead_time, service_level):
+    demand_per_day = demand / 365
+    lead_time_demand = demand_per_day * lead_time
+    z_score = norm.ppf(service_level + (1 - service_level) / 2)
+    safety_stock = z_score * math.sqrt(lead_time * demand_per_day * demand_per_day)
+    reorder_point = lead_time_demand + safety_stock
+    return safety_stock, reorder_point
+
+
+def calculate_eoq_with_rop(
+    demand, ordering_cost, holding_cost, lead_time, service_level
+):
+    _, reorder_point = calculate_safety_stock_reorder_point(
+        demand, lead_time, service_level
+    )
+    eoq_with_rop = math.sqrt(
+        (2 * demand * ordering_cost) * (reorder_point) / holding_cost
+    )
+    return eoq_with_rop
+
+
+def calculate_eoq_perishable(demand, ordering_cost, holding_cost, shelf_life):
+    demand_per_day = demand / 365
+    eoq_perishable = math.sqrt(
+        (2 * demand_per_day * ordering_cost) * shelf_life / holding_cost
+    )
+    return eoq_perishable
+
+
+def calculate_eoq_limited_storage(
+    demand, ordering_cost, holding_cost, storage_capacity
+):
+    eoq = math.sqrt((2 * demand * ordering_cost) / holding_cost)
+    eoq_limited_storage = min(eoq, storage_capacity)
+    return eoq_limited_storage
+
+
+def calculate_optimized_inventory_bulk(
+    demand,
+    ordering_cost,
+    holding_cost,
+    lead_time,
+    service_level,
+    shelf_life,
+    storage_limit,
+):
+    # Same rules as the scalar functions above, one array element per item.
+    # Optional parameters that are not set are passed as NaN.
+    demand = np.asarray(demand, dtype=float)
+    ordering_cost = np.asarray(ordering_cost, dtype=float)
+    holding_cost = np.asarray(holding_cost, dtype=float)
+    lead_time = np.asarray(lead_time, dtype=float)
+    service_level = np.asarray(service_level, dtype=float)
+    shelf_life = np.asarray(shelf_life, dtype=float)
+    storage_limit = np.asarray(storage_limit, dtype=float)
+
+    has_rop = ~np.isnan(lead_time) & ~np.isnan(service_level)
+    has_shelf_life = ~np.isnan(shelf_life)
+    has_storage_limit = ~np.isnan(storage_limit)
+    is_classical = (
+        np.isnan(lead_time)
+        & np.isnan(service_level)
+        & ~has_shelf_life
+        & ~has_storage_limit
+    )
+
+    demand_per_day = demand / 365
+    with np.errstate(invalid="ignore"):
+        z_score = norm.ppf(service_level + (1 - service_level) / 2)
+        safety_stock = z_score * demand_per_day * np.sqrt(lead_time)
+        reorder_point = demand_per_day * lead_time + safety_stock
+        safety_stock = np.where(has_rop, safety_stock, np.nan)
+        reorder_point = np.where(has_rop, reorder_point, np.nan)
+
+        eoq_classical = np.sqrt((2 * demand * ordering_cost) / holding_cost)
+        eoq = np.select(
+            [is_classical, has_rop, has_shelf_life, has_storage_limit],
+            [
+                eoq_classical,
+                np.sqrt((2 * demand * ordering_cost) * reorder_point / holding_cost),
+                np.sqrt(
+                    (2 * demand_per_day * ordering_cost) * shelf_life / holding_cost
+                ),
+                np.minimum(eoq_classical, storage_limit),
+            ],
+            default=np.nan,
+        )
+
+    return eoq, safety_stock, reorder_point
+
+
+def calculate_shared_storage_eoq(eoq, holding_cost, group, capacity, iterations=100):
+    # Items of a group share its storage capacity, the sum of their order quantities
+    # may not exceed it. With a multiplier l on the constraint every item orders
+    # eoq * sqrt(h / (h + 2 * l)), which is the exact Lagrangian solution for the
+    # classical EOQ and never exceeds the item's own limits. l is found by bisection,
+    # for all groups at once.
+    eoq = np.asarray(eoq, dtype=float)
+    holding_cost = np.asarray(holding_cost, dtype=float)
+    group = np.asarray(group, dtype=int)
+    capacity = np.asarray(capacity, dtype=float)
+    n_groups = len(capacity)
+
+    quantity = np.nan_to_num(eoq)
+    usage = np.bincount(group, weights=quantity, minlength=n_groups)
+    binding = usage > capacity
+
+    # At this multiplier the usage of every group is at most its capacity
+    weight = np.bincount(
+        group, weights=quantity * np.sqrt(holding_cost), minlength=n_groups
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        upper = np.where(binding & (capacity > 0), weight**2 / (2 * capacity**2), 0.0)
+    lower = np.zeros(n_groups)
+
+    for _ in range(iterations):
+        middle = (lower + upper) / 2
+        usage = np.bincount(
+            group,
+            weights=quantity
+            * np.sqrt(holding_cost / (holding_cost + 2 * middle[group])),
+            minlength=n_groups,
+        )
+        over = usage > capacity
+        lower = np.where(over, middle, lower)
+        upper = np.where(over, upper, middle)
+
+    multiplier = np.where(binding, upper, 0.0)
+    shared_eoq = eoq * np.sqrt(holding_cost / (holding_cost + 2 * multiplier[group]))
+    # Nothing can be ordered into a group without any capacity
+    shared_eoq = np.where(binding[group] & (capacity[group] <= 0), 0.0, shared_eoq)
+    shared_eoq = np.where(np.isnan(eoq), np.nan, shared_eoq)
+    return shared_eoq, multiplier
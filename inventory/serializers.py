@@ -1,5 +1,26 @@
 from rest_framework import serializers
-from .models import Inventory, HistoricalInventory, OptimizedInventory
+from procurement_system_backend.fields import CommaSeparatedChoiceField
+from .models import (
+    Inventory,
+    HistoricalInventory,
+    OptimizedInventory,
+    ForecastJob,
+    InventoryImport,
+    InventorySimulation,
+)
+from .export import EXPORT_FORMATS
+from .imports import MAX_IMPORT_SIZE, ImportFileError, get_import_file_extension
+from .simulation import (
+    DEFAULT_SIMULATION_PATHS,
+    MAX_SIMULATION_PATHS,
+    DEFAULT_SIMULATION_DAYS,
+    MAX_SIMULATION_DAYS,
+)
+from .forecasting import (
+    FORECAST_ENGINE_CHOICES,
+    FORECAST_FIGURES,
+    DEFAULT_FORECAST_ENGINE,
+)
 
 
 class InventorySerializer(serializers.ModelSerializer):
@@ -7,6 +28,83 @@ class InventorySerializer(serializers.ModelSerializer):
         model = Inventory
         exclude = ["procurement_officer"]
 
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class InventoryListQuerySerializer(serializers.Serializer):
+    location = serializers.CharField(required=False)
+    name = serializers.CharField(required=False)
+    min_stock = serializers.IntegerField(required=False, min_value=0)
+    max_stock = serializers.IntegerField(required=False, min_value=0)
+    # Comma separated fields to return, e.g. "id,item_name,stock_quantity"
+    fields = serializers.CharField(required=False)
+
+    def validate_fields(self, value):
+        fields = [name.strip() for name in value.split(",") if name.strip()]
+        invalid = [name for name in fields if name not in InventorySerializer().fields]
+        if invalid:
+            raise serializers.ValidationError(f"Invalid fields: {invalid}.")
+        return list(dict.fromkeys(fields))
+
+    def validate(self, data):
+        if data.get("min_stock", 0) > data.get("max_stock", float("inf")):
+            raise serializers.ValidationError(
+                "min_stock cannot be greater than max_stock."
+            )
+        return data
+
+
+class InventoryImportRowSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Inventory
+        fields = [
+            "item_name",
+            "description",
+            "unit_price",
+            "stock_quantity",
+            "location",
+        ]
+
+
+class InventoryImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InventoryImport
+        exclude = ["task_id", "procurement_officer"]
+        read_only_fields = [
+            "status",
+            "total_rows",
+            "created_rows",
+            "failed_rows",
+            "errors",
+            "error",
+        ]
+
+    def validate_file(self, value):
+        try:
+            get_import_file_extension(value.name)
+        except ImportFileError as e:
+            raise serializers.ValidationError(str(e))
+        if value.size > MAX_IMPORT_SIZE:
+            raise serializers.ValidationError(
+                f"File too large. Maximum size is {MAX_IMPORT_SIZE // (1024 * 1024)} MB."
+            )
+        return value
+
+
+class InventoryStockUpdateSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    stock_quantity = serializers.IntegerField(min_value=0)
+
+
+class InventoryBulkStockUpdateSerializer(serializers.Serializer):
+    items = InventoryStockUpdateSerializer(many=True, allow_empty=False)
+
 
 class HistoricalInventorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,6 +112,41 @@ class HistoricalInventorySerializer(serializers.ModelSerializer):
         exclude = ["inventory"]
 
 
+class HistoricalInventoryBucketSerializer(serializers.Serializer):
+    datetime = serializers.DateTimeField(source="bucket")
+    demand = serializers.IntegerField(source="bucket_demand")
+    stock_quantity = serializers.IntegerField()
+
+
+class HistoricalInventoryRangeSerializer(serializers.Serializer):
+    to = serializers.DateTimeField(required=False)
+
+    def get_fields(self):
+        # "from" is a Python keyword, so it cannot be declared as an attribute
+        fields = super().get_fields()
+        fields["from"] = serializers.DateTimeField(required=False)
+        return fields
+
+    def validate(self, data):
+        if "from" in data and "to" in data and data["from"] > data["to"]:
+            raise serializers.ValidationError("from cannot be later than to.")
+        return data
+
+
+class HistoricalInventoryQuerySerializer(HistoricalInventoryRangeSerializer):
+    INTERVAL_CHOICES = ["day", "week", "month"]
+
+    interval = serializers.ChoiceField(choices=INTERVAL_CHOICES, required=False)
+
+
+class HistoricalInventoryExportSerializer(HistoricalInventoryRangeSerializer):
+    # Not "format", which DRF reserves for picking a renderer
+    file_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default="npz")
+    inventory_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+
+
 class OptimizedInventorySerializer(serializers.ModelSerializer):
     class Meta:
         model = OptimizedInventory
@@ -21,6 +154,76 @@ class OptimizedInventorySerializer(serializers.ModelSerializer):
         read_only_fields = ["eoq", "safety_stock", "reorder_point", "inventory"]
 
 
-class ARIMAForecastSerializer(serializers.Serializer):
+class OptimizedInventoryBulkItemSerializer(serializers.ModelSerializer):
+    # A plain id avoids one lookup query per item, ownership is checked in bulk by the view
+    inventory = serializers.IntegerField()
+
+    class Meta:
+        model = OptimizedInventory
+        exclude = ["id", "eoq", "safety_stock", "reorder_point"]
+
+
+class OptimizedInventoryBulkSerializer(serializers.Serializer):
+    items = OptimizedInventoryBulkItemSerializer(
+        many=True, required=False, allow_empty=False
+    )
+    # "shared_storage" solves the order quantities of all items at a location jointly
+    mode = serializers.ChoiceField(
+        choices=["independent", "shared_storage"], default="independent"
+    )
+    # Storage capacity in units per location, locations without one are not constrained
+    capacities = serializers.DictField(
+        child=serializers.FloatField(min_value=0), required=False, allow_empty=False
+    )
+
+    def validate(self, data):
+        if data["mode"] == "shared_storage" and "capacities" not in data:
+            raise serializers.ValidationError(
+                {"capacities": "Capacities are required for the shared_storage mode."}
+            )
+        return data
+
+
+class InventorySimulationQuerySerializer(serializers.Serializer):
+    n_paths = serializers.IntegerField(
+        min_value=100, max_value=MAX_SIMULATION_PATHS, default=DEFAULT_SIMULATION_PATHS
+    )
+    horizon_days = serializers.IntegerField(
+        min_value=1, max_value=MAX_SIMULATION_DAYS, default=DEFAULT_SIMULATION_DAYS
+    )
+    # Defaults to the current stock quantity of the inventory item
+    initial_stock = serializers.IntegerField(min_value=0, required=False)
+    seed = serializers.IntegerField(min_value=0, required=False)
+
+
+class InventorySimulationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InventorySimulation
+        exclude = ["task_id"]
+
+
+class ForecastIncludeSerializer(serializers.Serializer):
+    # Comma separated figures to add to the numeric forecast, e.g. "decomposed,graph"
+    include = CommaSeparatedChoiceField(FORECAST_FIGURES, required=False, default=list)
+
+
+class ARIMAForecastSerializer(ForecastIncludeSerializer):
     # file = serializers.FileField(write_only=True)
-    pass
+    engine = serializers.ChoiceField(
+        choices=FORECAST_ENGINE_CHOICES, default=DEFAULT_FORECAST_ENGINE
+    )
+
+
+class ForecastJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ForecastJob
+        exclude = ["task_id", "monthly_demand"]
+
+
+class ForecastBatchSerializer(serializers.Serializer):
+    inventory_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    engine = serializers.ChoiceField(
+        choices=FORECAST_ENGINE_CHOICES, default=DEFAULT_FORECAST_ENGINE
+    )
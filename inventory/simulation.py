@@ -0,0 +1,109 @@
+import numpy as np
+
+# Limits of a simulation run, runs with more path days than the threshold go to a Celery worker
+DEFAULT_SIMULATION_PATHS = 5000
+MAX_SIMULATION_PATHS = 100_000
+DEFAULT_SIMULATION_DAYS = 365
+MAX_SIMULATION_DAYS = 365
+SIMULATION_SYNC_MAX_PATH_DAYS = 2_000_000
+
+DAYS_PER_MONTH = 365 / 12
+
+
+def get_demand_distribution(forecast_data):
+    # Monthly forecast means, spread by the residual of the decomposed demand history
+    residuals = np.array(
+        [
+            value
+            for value in forecast_data["decomposition"]["residual"]
+            if value is not None
+        ],
+        dtype=float,
+    )
+    monthly_std = float(residuals.std(ddof=1)) if len(residuals) > 1 else 0.0
+    return {
+        "monthly_mean": [max(0.0, value) for value in forecast_data["forecast"]],
+        "monthly_std": monthly_std,
+    }
+
+
+def get_daily_demand_parameters(distribution, horizon_days):
+    monthly_mean = np.asarray(distribution["monthly_mean"], dtype=float)
+    month = np.minimum(
+        (np.arange(horizon_days) / DAYS_PER_MONTH).astype(int), len(monthly_mean) - 1
+    )
+    daily_mean = monthly_mean[month] / DAYS_PER_MONTH
+    daily_std = distribution["monthly_std"] / np.sqrt(DAYS_PER_MONTH)
+    return daily_mean, daily_std
+
+
+def simulate_inventory_policy(
+    distribution,
+    initial_stock,
+    reorder_point,
+    order_quantity,
+    lead_time,
+    holding_cost,
+    ordering_cost,
+    n_paths,
+    horizon_days,
+    seed=None,
+):
+    # Continuous review (reorder point, order quantity) policy with lost sales.
+    # Days are stepped in order, every step updates all demand paths at once.
+    rng = np.random.default_rng(seed)
+    daily_mean, daily_std = get_daily_demand_parameters(distribution, horizon_days)
+
+    # Orders placed at the end of a day arrive at the start of the day lead_time later,
+    # pending arrivals are kept in a ring buffer of lead_time + 1 days
+    delay = max(1, int(lead_time))
+    arrivals = np.zeros((delay + 1, n_paths))
+    on_hand = np.full(n_paths, float(initial_stock))
+    on_order = np.zeros(n_paths)
+    total_demand = np.zeros(n_paths)
+    total_sales = np.zeros(n_paths)
+    stockout_days = np.zeros(n_paths)
+    holding_units = np.zeros(n_paths)
+    orders = np.zeros(n_paths)
+
+    for day in range(horizon_days):
+        slot = day % (delay + 1)
+        on_hand += arrivals[slot]
+        on_order -= arrivals[slot]
+        arrivals[slot] = 0.0
+
+        demand = np.maximum(rng.normal(daily_mean[day], daily_std, n_paths), 0.0)
+        sales = np.minimum(on_hand, demand)
+        on_hand -= sales
+        total_demand += demand
+        total_sales += sales
+        stockout_days += demand > sales
+        holding_units += on_hand
+
+        reorder = on_hand + on_order <= reorder_point
+        arrivals[(day + delay) % (delay + 1), reorder] += order_quantity
+        on_order[reorder] += order_quantity
+        orders += reorder
+
+    fill_rate = np.divide(
+        total_sales,
+        total_demand,
+        out=np.ones(n_paths),
+        where=total_demand > 0,
+    )
+    expected_orders = float(orders.mean())
+
+    return {
+        "n_paths": n_paths,
+        "horizon_days": horizon_days,
+        "fill_rate": float(fill_rate.mean()),
+        "fill_rate_p5": float(np.percentile(fill_rate, 5)),
+        "stockout_probability": float((stockout_days > 0).mean()),
+        "expected_stockout_days": float(stockout_days.mean()),
+        "expected_demand": float(total_demand.mean()),
+        "expected_lost_sales": float((total_demand - total_sales).mean()),
+        "expected_holding_cost": float(holding_units.mean() * holding_cost / 365),
+        "expected_orders": expected_orders,
+        "expected_ordering_cost": expected_orders * ordering_cost,
+        "expected_ending_stock": float(on_hand.mean()),
+    }
@@ -1,7 +1,50 @@
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
 from django.core.mail import send_mail
 from django.conf import settings
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Q
 from celery import shared_task
-from .models import Inventory
+from .models import (
+    Inventory,
+    HistoricalInventory,
+    ForecastJob,
+    ARIMAModelOrder,
+    InventoryImport,
+    InventorySimulation,
+)
+from .serializers import InventoryImportRowSerializer
+from .caching import bump_inventory_generation
+from .history import (
+    HISTORY_DELETE_BATCH,
+    get_history_buckets,
+    get_compaction_bucket,
+    get_compaction_cutoff,
+)
+from .imports import (
+    IMPORT_CHUNK_ROWS,
+    MAX_IMPORT_ERRORS,
+    read_import_rows,
+    chunk_import_rows,
+)
+from .simulation import simulate_inventory_policy
+from .forecasting import (
+    MIN_FORECAST_MONTHS,
+    FORECAST_PARAMETERS,
+    ARIMA_ORDER_MAX_AGE_DAYS,
+    calculate_forecast,
+    get_forecast_parameters,
+    serialize_monthly_demand,
+    deserialize_monthly_demand,
+    get_monthly_demand,
+    get_forecast_fingerprint,
+    get_stored_forecast_result,
+    store_forecast_result,
+    search_and_store_arima_model,
+    ForecastFitError,
+)
 from accounts.models import User
 
 
@@ -32,3 +75,286 @@ def send_inventory_notifications():
         )
 
     return "Inventory notification emails sent successfully."
+
+
+def run_background_job(job, work, error_message, success_message, update_fields=()):
+    # update_fields are saved with every status change, work returns the fields it filled in on success
+    job.status = "running"
+    job.save(update_fields=["status", *update_fields, "last_updated"])
+
+    try:
+        completed_fields = work(job) or []
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        job.save(update_fields=["status", "error", *update_fields, "last_updated"])
+        return f"{error_message}: {e}"
+
+    job.status = "completed"
+    job.save(
+        update_fields=["status", *update_fields, *completed_fields, "last_updated"]
+    )
+    return success_message
+
+
+def calculate_forecast_job(job):
+    parameters = get_forecast_parameters(job.engine)
+    if job.monthly_demand is None:
+        monthly_demand = get_monthly_demand(
+            HistoricalInventory.objects.filter(inventory_id=job.inventory_id)
+        )
+        if len(monthly_demand) < MIN_FORECAST_MONTHS:
+            raise ValueError(
+                "Insufficient data for forecasting. Minimum 24 months of data required."
+            )
+        job.monthly_demand = serialize_monthly_demand(monthly_demand)
+        job.fingerprint = get_forecast_fingerprint(monthly_demand, parameters)
+    else:
+        monthly_demand = deserialize_monthly_demand(job.monthly_demand)
+
+    forecast_data = None
+    if job.fingerprint:
+        forecast_data = get_stored_forecast_result(job.inventory_id, job.fingerprint)
+
+    if forecast_data is None:
+        forecast_data = calculate_forecast(
+            monthly_demand,
+            job.engine,
+            inventory_id=job.inventory_id if job.source == "history" else None,
+        )
+        if job.fingerprint:
+            store_forecast_result(
+                job.inventory_id,
+                job.fingerprint,
+                forecast_data,
+                parameters,
+                job.source,
+            )
+
+    job.progress = 100
+    job.result = forecast_data
+    return ["result", "fingerprint", "monthly_demand"]
+
+
+@shared_task
+def run_forecast_job(job_id):
+    job = ForecastJob.objects.get(id=job_id)
+    job.progress = 10
+    return run_background_job(
+        job,
+        calculate_forecast_job,
+        "Error running forecast job",
+        "Forecast job completed successfully.",
+        update_fields=["progress"],
+    )
+
+
+def simulate_inventory_job(simulation):
+    simulation.result = simulate_inventory_policy(**simulation.parameters)
+    return ["result"]
+
+
+@shared_task
+def run_inventory_simulation(simulation_id):
+    simulation = InventorySimulation.objects.get(id=simulation_id)
+    return run_background_job(
+        simulation,
+        simulate_inventory_job,
+        "Error running inventory simulation",
+        "Inventory simulation completed successfully.",
+    )
+
+
+@shared_task
+def refresh_arima_model_orders():
+    # Run the full stepwise search again for items whose stored orders are out of date
+    stale_before = timezone.now() - timedelta(days=ARIMA_ORDER_MAX_AGE_DAYS)
+    inventory_ids = ARIMAModelOrder.objects.filter(
+        date_searched__lt=stale_before
+    ).values_list("inventory_id", flat=True)
+
+    refreshed = 0
+    for inventory_id in inventory_ids:
+        monthly_demand = get_monthly_demand(
+            HistoricalInventory.objects.filter(inventory_id=inventory_id)
+        )
+        if len(monthly_demand) < MIN_FORECAST_MONTHS:
+            continue
+        try:
+            search_and_store_arima_model(
+                inventory_id, monthly_demand["demand"], m=FORECAST_PARAMETERS["m"]
+            )
+        except ForecastFitError:
+            # The stored orders stay in use until a later search succeeds
+            continue
+        refreshed += 1
+
+    return f"ARIMA model orders refreshed for {refreshed} inventory items."
+
+
+def import_inventory_chunk(inventory_import, chunk):
+    inventory = []
+    for row_number, row in chunk:
+        serializer = InventoryImportRowSerializer(data=row)
+        if serializer.is_valid():
+            inventory.append(
+                Inventory(
+                    **serializer.validated_data,
+                    procurement_officer_id=inventory_import.procurement_officer_id,
+                )
+            )
+        else:
+            inventory_import.failed_rows += 1
+            if len(inventory_import.errors) < MAX_IMPORT_ERRORS:
+                inventory_import.errors.append(
+                    {"row": row_number, "errors": serializer.errors}
+                )
+
+    # bulk_create skips the post_save signal, so the first history points are created here
+    with transaction.atomic():
+        Inventory.objects.bulk_create(inventory)
+        HistoricalInventory.objects.bulk_create(
+            [
+                HistoricalInventory(
+                    stock_quantity=item.stock_quantity,
+                    datetime=item.date_added,
+                    inventory=item,
+                )
+                for item in inventory
+            ]
+        )
+
+    inventory_import.total_rows += len(chunk)
+    inventory_import.created_rows += len(inventory)
+
+
+IMPORT_PROGRESS_FIELDS = ["total_rows", "created_rows", "failed_rows", "errors"]
+
+
+def import_inventory_file(inventory_import):
+    with inventory_import.file.open("rb") as file:
+        rows = read_import_rows(file, inventory_import.file.name)
+        for chunk in chunk_import_rows(rows, IMPORT_CHUNK_ROWS):
+            import_inventory_chunk(inventory_import, chunk)
+            inventory_import.save(
+                update_fields=[*IMPORT_PROGRESS_FIELDS, "last_updated"]
+            )
+
+
+@shared_task
+def import_inventory(import_id):
+    inventory_import = InventoryImport.objects.get(id=import_id)
+    try:
+        return run_background_job(
+            inventory_import,
+            import_inventory_file,
+            "Error importing inventory",
+            "Inventory import completed successfully.",
+            update_fields=IMPORT_PROGRESS_FIELDS,
+        )
+    finally:
+        # Rows already created stay, so the officer's cached id list is replaced once either way
+        if inventory_import.created_rows:
+            bump_inventory_generation(inventory_import.procurement_officer_id)
+
+
+HISTORY_COMPACTION_BATCH_BUCKETS = 500
+
+
+def replace_history_buckets(inventory_id, granularity, summaries, row_ids):
+    with transaction.atomic():
+        HistoricalInventory.objects.filter(id__in=row_ids).delete()
+        HistoricalInventory.objects.bulk_create(
+            [
+                HistoricalInventory(
+                    stock_quantity=summary["stock_quantity"],
+                    demand=summary["bucket_demand"],
+                    datetime=summary["bucket"],
+                    granularity=granularity,
+                    inventory_id=inventory_id,
+                )
+                for summary in summaries
+            ]
+        )
+    return len(row_ids) - len(summaries)
+
+
+def compact_inventory_history(inventory_id, granularity, cutoff):
+    rows = HistoricalInventory.objects.filter(
+        inventory_id=inventory_id, datetime__lt=cutoff
+    )
+    if granularity == "day":
+        rows = rows.exclude(granularity="week")
+    bucket = get_compaction_bucket(granularity)
+
+    compacted = 0
+    while True:
+        pending_buckets = list(
+            rows.exclude(granularity=granularity)
+            .annotate(bucket=bucket)
+            .order_by("bucket")
+            .values_list("bucket", flat=True)
+            .distinct()[:HISTORY_COMPACTION_BATCH_BUCKETS]
+        )
+        if not pending_buckets:
+            return compacted
+
+        pending = set(pending_buckets)
+        batch_rows = rows.filter(
+            datetime__gte=pending_buckets[0],
+            datetime__lt=pending_buckets[-1] + timedelta(days=7),
+        )
+        summaries = {
+            summary["bucket"]: summary
+            for summary in get_history_buckets(batch_rows, bucket)
+            if summary["bucket"] in pending
+        }
+        bucket_rows = (
+            batch_rows.annotate(bucket=bucket)
+            .filter(bucket__in=pending_buckets)
+            .order_by("bucket")
+            .values_list("bucket", "id")
+        )
+
+        # Whole buckets are replaced in transactions of about HISTORY_DELETE_BATCH rows,
+        # so locks on the history table are held briefly and an interrupted run resumes
+        group_summaries, group_ids = [], []
+        for row_bucket, bucket_ids in groupby(bucket_rows, key=itemgetter(0)):
+            group_summaries.append(summaries[row_bucket])
+            group_ids.extend(row_id for _, row_id in bucket_ids)
+            if len(group_ids) >= HISTORY_DELETE_BATCH:
+                compacted += replace_history_buckets(
+                    inventory_id, granularity, group_summaries, group_ids
+                )
+                group_summaries, group_ids = [], []
+        if group_ids:
+            compacted += replace_history_buckets(
+                inventory_id, granularity, group_summaries, group_ids
+            )
+
+
+@shared_task
+def compact_historical_inventory():
+    now = timezone.now()
+    week_cutoff = get_compaction_cutoff(
+        now - timedelta(days=settings.HISTORICAL_INVENTORY_DAILY_DAYS), "week"
+    )
+    day_cutoff = get_compaction_cutoff(
+        now - timedelta(days=settings.HISTORICAL_INVENTORY_RAW_DAYS), "day"
+    )
+
+    inventory_ids = (
+        HistoricalInventory.objects.filter(
+            Q(datetime__lt=week_cutoff, granularity__in=["raw", "day"])
+            | Q(datetime__lt=day_cutoff, granularity="raw")
+        )
+        .values_list("inventory_id", flat=True)
+        .distinct()
+    )
+
+    compacted = 0
+    for inventory_id in inventory_ids:
+        compacted += compact_inventory_history(inventory_id, "week", week_cutoff)
+        compacted += compact_inventory_history(inventory_id, "day", day_cutoff)
+
+    return f"Historical inventory compacted, {compacted} rows removed."
@@ -1,13 +1,74 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import FileSystemStorage
 from django.urls import reverse
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.cache import cache
 from rest_framework import status
 from rest_framework.test import APIClient
+import io
+import json
+from io import StringIO
+import math
+import tempfile
+import os
+import signal
+import time
 from datetime import timedelta
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+import numpy as np
+import pandas as pd
 from django.utils import timezone
 from accounts.models import User, Vendor
-from .models import Inventory, HistoricalInventory, OptimizedInventory
+from .models import (
+    Inventory,
+    HistoricalInventory,
+    OptimizedInventory,
+    ForecastJob,
+    ForecastResult,
+    ARIMAModelOrder,
+    InventoryImport,
+    InventorySimulation,
+)
+from .tasks import (
+    run_forecast_job,
+    refresh_arima_model_orders,
+    import_inventory,
+    compact_historical_inventory,
+    replace_history_buckets,
+    run_inventory_simulation,
+)
+from .export import read_history_npz, iter_history_chunks
+from .backtesting import backtest_series, generate_synthetic_monthly_demand
+from .simulation import simulate_inventory_policy
+from .caching import (
+    get_inventory_generation,
+    get_inventory_list_key,
+    get_inventory_item_key,
+)
+from .optimization import (
+    calculate_eoq_classical,
+    calculate_safety_stock_reorder_point,
+    calculate_eoq_with_rop,
+    calculate_eoq_perishable,
+    calculate_eoq_limited_storage,
+    calculate_optimized_inventory_bulk,
+    calculate_shared_storage_eoq,
+)
+from .forecasting import (
+    DemandFileError,
+    ForecastFitError,
+    ForecastFitAborted,
+    calculate_forecast,
+    fit_seasonal_naive,
+    get_monthly_demand,
+    read_monthly_demand_csv,
+    run_fit_in_process,
+    get_process_tree_rss,
+    select_forecast_engine,
+)
 
 
 class SetupClass(TestCase):
@@ -218,6 +279,97 @@ class InventorySignalsTests(SetupClass, TestCase):
             self.assertFalse(historical_inventory_items_after_delete.exists())
 
 
+class HistoricalInventoryCompactionTests(SetupClass, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        HistoricalInventory.objects.all().delete()
+        # Four rows a day, every day from 2022-12-01 to 2023-03-31
+        start = pd.Timestamp("2022-12-01T00:00:00Z")
+        HistoricalInventory.objects.bulk_create(
+            [
+                HistoricalInventory(
+                    stock_quantity=1000 - index,
+                    demand=index % 7,
+                    datetime=start + pd.Timedelta(hours=6 * index),
+                    inventory=self.inventory_item,
+                )
+                for index in range(4 * 121)
+            ]
+        )
+
+    def compact(self):
+        with self.settings(
+            HISTORICAL_INVENTORY_RAW_DAYS=30, HISTORICAL_INVENTORY_DAILY_DAYS=60
+        ), patch(
+            "inventory.tasks.timezone.now",
+            return_value=pd.Timestamp("2023-04-01T12:00:00Z").to_pydatetime(),
+        ):
+            compact_historical_inventory()
+
+    def test_compact_historical_inventory(self):
+        history = HistoricalInventory.objects.filter(inventory=self.inventory_item)
+        total_demand = sum(history.values_list("demand", flat=True))
+        monthly_demand = get_monthly_demand(history)
+
+        with patch("inventory.tasks.HISTORY_COMPACTION_BATCH_BUCKETS", 5):
+            self.compact()
+
+        self.assertEqual(sum(history.values_list("demand", flat=True)), total_demand)
+        pd.testing.assert_frame_equal(get_monthly_demand(history), monthly_demand)
+
+        # Rows before 2023-01-30 become weeks, before 2023-03-02 days, later rows stay raw
+        self.assertFalse(
+            history.filter(datetime__lt="2023-01-30", granularity__in=["raw", "day"])
+        )
+        self.assertFalse(
+            history.filter(datetime__lt="2023-03-02", granularity="raw").exists()
+        )
+        self.assertEqual(history.filter(granularity="day").count(), 2 + 28 + 1)
+        self.assertEqual(
+            history.filter(datetime__gte="2023-03-02", granularity="raw").count(),
+            4 * 30,
+        )
+
+        latest = history.filter(granularity="day").latest("datetime")
+        self.assertEqual(latest.datetime.isoformat(), "2023-03-01T00:00:00+00:00")
+        self.assertEqual(latest.stock_quantity, 1000 - (4 * (31 + 31 + 28) + 3))
+
+    def test_compact_historical_inventory_transaction_size(self):
+        history = HistoricalInventory.objects.filter(inventory=self.inventory_item)
+        monthly_demand = get_monthly_demand(history)
+
+        with patch("inventory.tasks.HISTORY_DELETE_BATCH", 10), patch(
+            "inventory.tasks.replace_history_buckets",
+            wraps=replace_history_buckets,
+        ) as replace:
+            self.compact()
+
+        # Whole buckets of four daily rows or a week of them, about ten rows per transaction
+        self.assertGreater(replace.call_count, 10)
+        for call in replace.call_args_list:
+            self.assertLess(len(call.args[3]), 10 + 7 * 4)
+        pd.testing.assert_frame_equal(get_monthly_demand(history), monthly_demand)
+
+    def test_compact_historical_inventory_is_idempotent(self):
+        self.compact()
+        rows = list(
+            HistoricalInventory.objects.order_by("datetime").values_list(
+                "datetime", "granularity", "demand", "stock_quantity"
+            )
+        )
+
+        self.compact()
+        self.assertEqual(
+            list(
+                HistoricalInventory.objects.order_by("datetime").values_list(
+                    "datetime", "granularity", "demand", "stock_quantity"
+                )
+            ),
+            rows,
+        )
+
+
 class InventoryViewsTests(SetupClass, TestCase):
     def setUp(self):
         super().setUp()
@@ -247,6 +399,140 @@ class InventoryViewsTests(SetupClass, TestCase):
         response = self.client.post(self.inventory_list_url)
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def create_inventory_items(self):
+        for index, (location, stock_quantity) in enumerate(
+            [("Pune", 10), ("Pune", 50), ("Mumbai", 200), ("Pune", 500)]
+        ):
+            Inventory.objects.create(
+                item_name=f"Bolt {index}",
+                description="Test Description",
+                unit_price=10.00,
+                stock_quantity=stock_quantity,
+                location=location,
+                procurement_officer=self.procurement_officer,
+            )
+
+    def test_inventory_list_view_cursor_pagination(self):
+        self.create_inventory_items()
+        self.client.force_authenticate(user=self.procurement_officer)
+
+        response = self.client.get(self.inventory_list_url, {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+        ids = [item["id"] for item in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            ids += [item["id"] for item in response.data["results"]]
+
+        expected_ids = list(
+            Inventory.objects.filter(procurement_officer=self.procurement_officer)
+            .order_by("last_updated", "id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected_ids)
+
+    def test_inventory_list_view_filters(self):
+        self.create_inventory_items()
+        self.client.force_authenticate(user=self.procurement_officer)
+
+        response = self.client.get(
+            self.inventory_list_url,
+            {"location": "Pune", "min_stock": 20, "max_stock": 500, "name": "Bolt"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(item["stock_quantity"] for item in response.data), [50, 500]
+        )
+
+    def test_inventory_list_view_fields(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(
+            self.inventory_list_url, {"fields": "id,item_name,stock_quantity"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {"id", "item_name", "stock_quantity"})
+
+    def test_inventory_list_view_invalid_query(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(self.inventory_list_url, {"fields": "password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            self.inventory_list_url, {"min_stock": 10, "max_stock": 5}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_inventory_list_view_filtered_reads_skip_cache(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        self.client.get(self.inventory_list_url, {"location": "Nowhere"})
+        self.assertIsNone(cache.get(self.get_inventory_list_key()))
+
+        response = self.client.get(self.inventory_list_url)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(cache.get(self.get_inventory_list_key()), [1])
+
+    def get_inventory_list_key(self):
+        return get_inventory_list_key(
+            self.procurement_officer.id,
+            get_inventory_generation(self.procurement_officer.id),
+        )
+
+    def test_inventory_list_view_assembled_from_cached_items(self):
+        self.create_inventory_items()
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(self.inventory_list_url)
+        self.assertEqual(len(response.data), 5)
+
+        cache.delete(get_inventory_item_key(self.inventory_item.id))
+        with self.assertNumQueries(1):
+            response = self.client.get(self.inventory_list_url)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(response.data[0]["id"], self.inventory_item.id)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.inventory_list_url)
+
+    def test_inventory_update_view_rewrites_only_item_entry(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        self.client.get(self.inventory_list_url)
+        generation = get_inventory_generation(self.procurement_officer.id)
+
+        response = self.client.patch(self.inventory_update_url, {"stock_quantity": 70})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            get_inventory_generation(self.procurement_officer.id), generation
+        )
+        self.assertEqual(
+            cache.get(get_inventory_item_key(self.inventory_item.id))["stock_quantity"],
+            70,
+        )
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.inventory_list_url)
+        self.assertEqual(response.data[0]["stock_quantity"], 70)
+
+    def test_inventory_create_and_delete_views_replace_cached_list(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        self.client.get(self.inventory_list_url)
+
+        data = {
+            "item_name": "Test Item Create",
+            "description": "Test Description",
+            "unit_price": 10.00,
+            "stock_quantity": 100,
+            "location": "Test Location",
+        }
+        self.client.post(self.inventory_create_url, data)
+        response = self.client.get(self.inventory_list_url)
+        self.assertEqual(len(response.data), 2)
+
+        self.client.delete(self.inventory_delete_url)
+        response = self.client.get(self.inventory_list_url)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["item_name"], "Test Item Create")
+
     def test_inventory_create_view_procurement_officer(self):
         self.client.force_authenticate(user=self.procurement_officer)
         data = {
@@ -518,6 +804,242 @@ class InventoryViewsTests(SetupClass, TestCase):
         response = self.client.post(self.historical_inventory_list_url)
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def test_inventory_bulk_stock_update_view(self):
+        inventory_item2 = Inventory.objects.create(
+            item_name="Test Item 2",
+            description="Test Description",
+            unit_price=10.00,
+            stock_quantity=50,
+            location="Test Location",
+            procurement_officer=self.procurement_officer,
+        )
+        self.client.force_authenticate(user=self.procurement_officer)
+        self.client.get(self.inventory_list_url)
+
+        data = {
+            "items": [
+                {"id": self.inventory_item.id, "stock_quantity": 70},
+                {"id": inventory_item2.id, "stock_quantity": 80},
+            ]
+        }
+        response = self.client.post(
+            reverse("inventory_bulk_stock_update"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 2)
+
+        self.inventory_item.refresh_from_db()
+        self.assertEqual(self.inventory_item.stock_quantity, 70)
+        latest = HistoricalInventory.objects.filter(
+            inventory=self.inventory_item
+        ).latest("datetime")
+        self.assertEqual(latest.stock_quantity, 70)
+        self.assertEqual(latest.demand, 30)
+        self.assertEqual(latest.datetime, self.inventory_item.last_updated)
+        self.assertEqual(
+            HistoricalInventory.objects.filter(inventory=inventory_item2)
+            .latest("datetime")
+            .demand,
+            0,
+        )
+        self.assertIsNone(cache.get(get_inventory_item_key(self.inventory_item.id)))
+        response = self.client.get(self.inventory_list_url)
+        self.assertEqual(
+            sorted(item["stock_quantity"] for item in response.data), [70, 80]
+        )
+
+    def test_inventory_bulk_stock_update_view_invalidates_forecast_results(self):
+        ForecastResult.objects.create(
+            fingerprint="abc",
+            parameters={},
+            result={},
+            inventory=self.inventory_item,
+        )
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {"items": [{"id": self.inventory_item.id, "stock_quantity": 70}]}
+        response = self.client.post(
+            reverse("inventory_bulk_stock_update"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(ForecastResult.objects.exists())
+
+    def test_inventory_bulk_stock_update_view_other_procurement_officer(self):
+        self.client.force_authenticate(user=self.procurement_officer2)
+        data = {"items": [{"id": self.inventory_item.id, "stock_quantity": 70}]}
+        response = self.client.post(
+            reverse("inventory_bulk_stock_update"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.inventory_item.refresh_from_db()
+        self.assertEqual(self.inventory_item.stock_quantity, 100)
+        self.assertEqual(
+            HistoricalInventory.objects.filter(inventory=self.inventory_item).count(),
+            1,
+        )
+
+    def test_inventory_bulk_stock_update_view_duplicate_items(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "items": [
+                {"id": self.inventory_item.id, "stock_quantity": 70},
+                {"id": self.inventory_item.id, "stock_quantity": 60},
+            ]
+        }
+        response = self.client.post(
+            reverse("inventory_bulk_stock_update"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_inventory_bulk_stock_update_view_vendor(self):
+        self.client.force_authenticate(user=self.vendor)
+        data = {"items": [{"id": self.inventory_item.id, "stock_quantity": 70}]}
+        response = self.client.post(
+            reverse("inventory_bulk_stock_update"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class InventoryImportViewsTests(SetupClass, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage_dir.cleanup)
+        storage_patcher = patch.object(
+            InventoryImport._meta.get_field("file"),
+            "storage",
+            FileSystemStorage(location=self.storage_dir.name),
+        )
+        storage_patcher.start()
+        self.addCleanup(storage_patcher.stop)
+
+        self.inventory_import_create_url = reverse("inventory_import_create")
+
+    def upload(self, name, content):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(
+            self.inventory_import_create_url,
+            {"file": SimpleUploadedFile(name, content.encode("utf-8"))},
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        return response.data["import_id"]
+
+    def test_inventory_import_csv(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        self.client.get(self.inventory_list_url)
+        import_id = self.upload(
+            "items.csv",
+            "item_name,description,unit_price,stock_quantity,location\n"
+            "Bolt,Steel bolt,0.50,1000,Pune\n"
+            "Nut,Steel nut,-1,500,Pune\n"
+            "Washer,Steel washer,0.10,2000,Mumbai\n",
+        )
+
+        with patch("inventory.tasks.IMPORT_CHUNK_ROWS", 2):
+            import_inventory(import_id)
+
+        inventory_import = InventoryImport.objects.get(id=import_id)
+        self.assertEqual(inventory_import.status, "completed")
+        self.assertEqual(inventory_import.total_rows, 3)
+        self.assertEqual(inventory_import.created_rows, 2)
+        self.assertEqual(inventory_import.failed_rows, 1)
+        self.assertEqual(inventory_import.errors[0]["row"], 2)
+        self.assertIn("unit_price", inventory_import.errors[0]["errors"])
+
+        bolt = Inventory.objects.get(item_name="Bolt")
+        self.assertEqual(bolt.procurement_officer, self.procurement_officer)
+        history = HistoricalInventory.objects.get(inventory=bolt)
+        self.assertEqual(history.stock_quantity, 1000)
+        self.assertEqual(history.demand, 0)
+        response = self.client.get(self.inventory_list_url)
+        self.assertEqual(len(response.data), 3)
+
+        response = self.client.get(
+            reverse("inventory_import_retrieve", args=[import_id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_rows"], 2)
+
+    def test_inventory_import_json_lines(self):
+        import_id = self.upload(
+            "items.jsonl",
+            '{"item_name": "Bolt", "description": "Steel bolt", "unit_price": 0.5, '
+            '"stock_quantity": 1000, "location": "Pune"}\n'
+            "not json\n",
+        )
+        import_inventory(import_id)
+
+        inventory_import = InventoryImport.objects.get(id=import_id)
+        self.assertEqual(inventory_import.status, "completed")
+        self.assertEqual(inventory_import.created_rows, 1)
+        self.assertEqual(inventory_import.failed_rows, 1)
+
+    def test_inventory_import_json_array(self):
+        rows = [
+            {
+                "item_name": f"Bolt {index}",
+                "description": "Steel bolt",
+                "unit_price": 0.5,
+                "stock_quantity": 1000,
+                "location": "Pune",
+            }
+            for index in range(5)
+        ]
+        import_id = self.upload("items.json", json.dumps(rows + ["not an item"]))
+
+        # A small read size splits items across reads of the file
+        with patch("inventory.imports.IMPORT_READ_CHARS", 16):
+            import_inventory(import_id)
+
+        inventory_import = InventoryImport.objects.get(id=import_id)
+        self.assertEqual(inventory_import.status, "completed")
+        self.assertEqual(inventory_import.created_rows, 5)
+        self.assertEqual(inventory_import.failed_rows, 1)
+        self.assertEqual(inventory_import.errors[0]["row"], 6)
+
+    def test_inventory_import_json_array_invalid(self):
+        import_id = self.upload("items.json", '[{"item_name": "Bolt"}, {"item')
+        import_inventory(import_id)
+
+        inventory_import = InventoryImport.objects.get(id=import_id)
+        self.assertEqual(inventory_import.status, "failed")
+        self.assertIn("Invalid JSON file", inventory_import.error)
+
+    def test_inventory_import_json_not_a_list(self):
+        import_id = self.upload("items.json", '{"item_name": "Bolt"}')
+        import_inventory(import_id)
+
+        inventory_import = InventoryImport.objects.get(id=import_id)
+        self.assertEqual(inventory_import.status, "failed")
+        self.assertIsNotNone(inventory_import.error)
+
+    def test_inventory_import_invalid_file_type(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(
+            self.inventory_import_create_url,
+            {"file": SimpleUploadedFile("items.xlsx", b"data")},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
+        self.assertFalse(InventoryImport.objects.exists())
+
+    def test_inventory_import_retrieve_other_procurement_officer(self):
+        import_id = self.upload("items.csv", "item_name\n")
+
+        self.client.force_authenticate(user=self.procurement_officer2)
+        response = self.client.get(
+            reverse("inventory_import_retrieve", args=[import_id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_inventory_import_vendor(self):
+        self.client.force_authenticate(user=self.vendor)
+        response = self.client.post(
+            self.inventory_import_create_url,
+            {"file": SimpleUploadedFile("items.csv", b"item_name\n")},
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 
 class HistoricalInventoryViewsTests(SetupClass, TestCase):
     def setUp(self):
@@ -529,6 +1051,68 @@ class HistoricalInventoryViewsTests(SetupClass, TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
 
+    def create_historical_inventory(self):
+        HistoricalInventory.objects.all().delete()
+        for datetime, stock_quantity, demand in [
+            ("2024-01-03T10:00:00Z", 90, 10),
+            ("2024-01-03T15:00:00Z", 80, 10),
+            ("2024-01-20T10:00:00Z", 60, 20),
+            ("2024-02-05T10:00:00Z", 55, 5),
+        ]:
+            HistoricalInventory.objects.create(
+                stock_quantity=stock_quantity,
+                demand=demand,
+                datetime=datetime,
+                inventory=self.inventory_item,
+            )
+
+    def test_historical_inventory_list_view_range(self):
+        self.create_historical_inventory()
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(
+            self.historical_inventory_list_url,
+            {"from": "2024-01-03T12:00:00Z", "to": "2024-01-31"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(item["stock_quantity"] for item in response.data), [60, 80]
+        )
+
+    def test_historical_inventory_list_view_interval(self):
+        self.create_historical_inventory()
+        self.client.force_authenticate(user=self.procurement_officer)
+
+        response = self.client.get(
+            self.historical_inventory_list_url, {"interval": "month"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item["demand"], item["stock_quantity"]) for item in response.data],
+            [(40, 60), (5, 55)],
+        )
+        self.assertTrue(response.data[0]["datetime"].startswith("2024-01-01"))
+
+        response = self.client.get(
+            self.historical_inventory_list_url, {"interval": "day", "to": "2024-01-10"}
+        )
+        self.assertEqual(
+            [(item["demand"], item["stock_quantity"]) for item in response.data],
+            [(20, 80)],
+        )
+
+    def test_historical_inventory_list_view_invalid_query(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(
+            self.historical_inventory_list_url, {"interval": "year"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            self.historical_inventory_list_url,
+            {"from": "2024-02-01", "to": "2024-01-01"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_historical_inventory_list_view_other_procurement_officer(self):
         self.client.force_authenticate(user=self.procurement_officer2)
         response = self.client.get(self.historical_inventory_list_url)
@@ -584,9 +1168,9 @@ class ARIMAForecastViewsTests(SetupClass, TestCase):
 
     def test_arima_forecast_view_sufficient_data(self):
         self.client.force_authenticate(user=self.procurement_officer)
-        response = self.client.get(self.arima_forecast_url2)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("annual_forecast", response.data)
+        response = self.client.post(self.arima_forecast_url2)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIn("job_id", response.data)
 
     def test_arima_forecast_view_insufficient_data(self):
         self.client.force_authenticate(user=self.procurement_officer)
@@ -597,8 +1181,8 @@ class ARIMAForecastViewsTests(SetupClass, TestCase):
         self.client.force_authenticate(user=self.procurement_officer)
         data = {"file": open("inventory/tests/test_data_sufficient_data.csv", "rb")}
         response = self.client.post(self.arima_forecast_url, data)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("annual_forecast", response.data)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIn("job_id", response.data)
 
     def test_arima_forecast_view_upload_csv_insufficient_data(self):
         self.client.force_authenticate(user=self.procurement_officer)
@@ -620,9 +1204,9 @@ class ARIMAForecastViewsTests(SetupClass, TestCase):
 
     def test_arima_forecast_view_procurement_officer(self):
         self.client.force_authenticate(user=self.procurement_officer)
-        response = self.client.get(self.arima_forecast_url2)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("annual_forecast", response.data)
+        response = self.client.post(self.arima_forecast_url2)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIn("job_id", response.data)
 
     def test_arima_forecast_view_other_procurement_officer(self):
         self.client.force_authenticate(user=self.procurement_officer2)
@@ -648,6 +1232,634 @@ class ARIMAForecastViewsTests(SetupClass, TestCase):
         response = self.client.delete(self.arima_forecast_url2)
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def test_arima_forecast_view_upload_csv_other_procurement_officer(self):
+        self.client.force_authenticate(user=self.procurement_officer2)
+        data = {"file": open("inventory/tests/test_data_sufficient_data.csv", "rb")}
+        response = self.client.post(self.arima_forecast_url, data)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_arima_forecast_view_get_does_not_submit(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        with patch("inventory.views.run_forecast_job.delay") as delay:
+            response = self.client.get(self.arima_forecast_url2)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        delay.assert_not_called()
+        self.assertFalse(ForecastJob.objects.exists())
+
+    def test_arima_forecast_view_reuses_pending_job(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        job_id = response.data["job_id"]
+
+        with patch("inventory.views.run_forecast_job.delay") as delay:
+            response = self.client.post(self.arima_forecast_url2)
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data["job_id"], job_id)
+
+            ForecastJob.objects.filter(id=job_id).update(status="running")
+            response = self.client.get(self.arima_forecast_url2)
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data["job_id"], job_id)
+        delay.assert_not_called()
+        self.assertEqual(ForecastJob.objects.count(), 1)
+
+        # A failed job is not waited on, the next submission fits again
+        ForecastJob.objects.filter(id=job_id).update(status="failed")
+        response = self.client.post(self.arima_forecast_url2)
+        self.assertNotEqual(response.data["job_id"], job_id)
+
+    def test_forecast_job_retrieve_view_completed(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        job_id = response.data["job_id"]
+
+        run_forecast_job(job_id)
+
+        response = self.client.get(reverse("forecast_job_retrieve", args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "completed")
+        self.assertEqual(response.data["progress"], 100)
+        self.assertIn("annual_forecast", response.data["result"])
+
+    def test_forecast_job_retrieve_view_pending(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        job_id = response.data["job_id"]
+
+        response = self.client.get(reverse("forecast_job_retrieve", args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertIsNone(response.data["result"])
+
+    def test_forecast_job_retrieve_view_other_procurement_officer(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        job_id = response.data["job_id"]
+
+        self.client.force_authenticate(user=self.procurement_officer2)
+        response = self.client.get(reverse("forecast_job_retrieve", args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_arima_forecast_view_reuses_stored_result(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        run_forecast_job(response.data["job_id"])
+        self.assertEqual(
+            ForecastResult.objects.filter(inventory=self.inventory_item2).count(), 1
+        )
+
+        response = self.client.get(self.arima_forecast_url2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "completed")
+        self.assertIn("annual_forecast", response.data["result"])
+        self.assertEqual(ForecastJob.objects.count(), 1)
+
+    def test_forecast_job_retrieve_view_numeric_result_by_default(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        job_id = response.data["job_id"]
+        run_forecast_job(job_id)
+
+        response = self.client.get(reverse("forecast_job_retrieve", args=[job_id]))
+        result = response.data["result"]
+        self.assertNotIn("graph", result)
+        self.assertNotIn("decomposed", result)
+        self.assertEqual(len(result["forecast_datetime"]), 12)
+        self.assertEqual(
+            len(result["decomposition"]["trend"]), len(result["history"]["demand"])
+        )
+
+    def test_forecast_job_retrieve_view_include_figures(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        job_id = response.data["job_id"]
+        run_forecast_job(job_id)
+
+        response = self.client.get(
+            reverse("forecast_job_retrieve", args=[job_id]), {"include": "graph"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("graph", response.data["result"])
+        self.assertNotIn("decomposed", response.data["result"])
+
+        forecast_result = ForecastResult.objects.get(inventory=self.inventory_item2)
+        self.assertEqual(list(forecast_result.figures), ["graph"])
+        self.assertNotIn("graph", forecast_result.result)
+
+    def test_forecast_job_retrieve_view_legacy_result(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        job_id = response.data["job_id"]
+        run_forecast_job(job_id)
+
+        # Results stored before the numeric series hold the figures themselves
+        legacy_result = {
+            "engine": "auto_arima",
+            "decomposed": "{}",
+            "forecast": [1.0] * 12,
+            "annual_forecast": 12.0,
+            "graph": "{}",
+        }
+        job = ForecastJob.objects.get(id=job_id)
+        job.result = legacy_result
+        job.save()
+        ForecastResult.objects.filter(inventory=self.inventory_item2).update(
+            result=legacy_result, figures={}
+        )
+        cache.clear()
+
+        response = self.client.get(
+            reverse("forecast_job_retrieve", args=[job_id]), {"include": "graph"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["result"], legacy_result)
+
+        # A new request fits the forecast again instead of serving the old format
+        response = self.client.post(self.arima_forecast_url2)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_forecast_job(response.data["job_id"])
+        forecast_result = ForecastResult.objects.get(inventory=self.inventory_item2)
+        self.assertIn("history", forecast_result.result)
+
+    def test_arima_forecast_view_stored_result_include_figures(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        run_forecast_job(response.data["job_id"])
+
+        response = self.client.get(
+            self.arima_forecast_url2, {"include": "decomposed,graph"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("decomposed", response.data["result"])
+        self.assertIn("graph", response.data["result"])
+
+        with patch("inventory.forecasting.build_forecast_figure") as build:
+            response = self.client.get(self.arima_forecast_url2, {"include": "graph"})
+        build.assert_not_called()
+        self.assertIn("graph", response.data["result"])
+
+    def test_arima_forecast_view_invalid_include(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(self.arima_forecast_url2, {"include": "table"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("include", response.data)
+
+    def test_arima_forecast_view_stored_result_invalidated_on_new_history(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        run_forecast_job(response.data["job_id"])
+
+        self.inventory_item2.stock_quantity = 90
+        self.inventory_item2.save()
+        self.assertFalse(
+            ForecastResult.objects.filter(inventory=self.inventory_item2).exists()
+        )
+
+        response = self.client.post(self.arima_forecast_url2)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIn("job_id", response.data)
+
+    def test_get_monthly_demand(self):
+        historical_inventory = HistoricalInventory.objects.filter(
+            inventory=self.inventory_item2
+        )
+        monthly_demand = get_monthly_demand(historical_inventory)
+
+        df = pd.DataFrame(
+            list(historical_inventory.values("datetime", "demand"))
+        ).set_index("datetime")
+        expected = df.resample("M").sum()[-60:]
+
+        self.assertEqual(len(monthly_demand), 60)
+        self.assertListEqual(list(monthly_demand.index), list(expected.index))
+        self.assertListEqual(list(monthly_demand["demand"]), list(expected["demand"]))
+
+    def test_arima_forecast_view_engine(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        for engine in ["auto", "seasonal_naive", "ets"]:
+            response = self.client.post(self.arima_forecast_url2, {"engine": engine})
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+            job = ForecastJob.objects.get(id=response.data["job_id"])
+            self.assertEqual(job.engine, engine)
+
+            run_forecast_job(job.id)
+            job.refresh_from_db()
+            self.assertEqual(job.status, "completed")
+            self.assertEqual(len(job.result["forecast"]), 12)
+            self.assertIn(job.result["engine"], ["seasonal_naive", "ets", "auto_arima"])
+
+    def test_arima_forecast_view_invalid_engine(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(self.arima_forecast_url2, {"engine": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_run_fit_in_process(self):
+        forecast = run_fit_in_process(fit_seasonal_naive, [1, 2, 3, 4], 6, 2)
+        self.assertEqual(forecast.tolist(), [3, 4, 3, 4, 3, 4])
+
+    def test_run_fit_in_process_error(self):
+        with self.assertRaises(ForecastFitError) as context:
+            run_fit_in_process(int, "invalid")
+        self.assertNotIsInstance(context.exception, ForecastFitAborted)
+        self.assertIn("ValueError", str(context.exception))
+
+    def test_run_fit_in_process_timeout(self):
+        start = time.monotonic()
+        with self.assertRaises(ForecastFitAborted):
+            run_fit_in_process(time.sleep, 30, timeout=0.5)
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_run_fit_in_process_memory_limit(self):
+        def allocate():
+            data = np.ones(100 * 1024 * 1024 // 8)
+            time.sleep(30)
+            return data.sum()
+
+        with self.assertRaises(ForecastFitAborted) as context:
+            run_fit_in_process(allocate, memory_limit=50 * 1024 * 1024)
+        self.assertIn("memory", str(context.exception))
+
+    def test_get_process_tree_rss_counts_descendants(self):
+        receiver, sender = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            if os.fork() == 0:
+                data = np.ones(100 * 1024 * 1024 // 8)
+                os.write(sender, str(os.getpid()).encode())
+                time.sleep(30)
+                os._exit(int(data[0]))
+            time.sleep(30)
+            os._exit(0)
+
+        grandchild = int(os.read(receiver, 32))
+        try:
+            with open(f"/proc/{pid}/statm") as file:
+                own_rss = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            self.assertGreater(get_process_tree_rss(pid) - own_rss, 100 * 1024 * 1024)
+        finally:
+            os.kill(grandchild, signal.SIGKILL)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            os.close(receiver)
+            os.close(sender)
+
+    @override_settings(FORECAST_FIT_TIMEOUT=1)
+    def test_calculate_forecast_falls_back_after_timeout(self):
+        monthly_demand = get_monthly_demand(
+            HistoricalInventory.objects.filter(inventory=self.inventory_item2)
+        )
+        with patch(
+            "inventory.forecasting.fit_searched_arima",
+            lambda *args: time.sleep(30),
+        ):
+            forecast_data = calculate_forecast(monthly_demand, "auto_arima")
+
+        self.assertEqual(forecast_data["engine"], "ets")
+        self.assertEqual(forecast_data["fallback_from"], "auto_arima")
+        self.assertEqual(len(forecast_data["forecast"]), 12)
+
+    def test_select_forecast_engine_seasonal_series(self):
+        demand = pd.Series([10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120] * 4)
+        self.assertEqual(select_forecast_engine(demand), "seasonal_naive")
+
+    def test_forecast_job_reuses_stored_arima_model_order(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.arima_forecast_url2)
+        run_forecast_job(response.data["job_id"])
+        model_order = ARIMAModelOrder.objects.get(inventory=self.inventory_item2)
+
+        self.inventory_item2.stock_quantity = 90
+        self.inventory_item2.save()
+
+        response = self.client.post(self.arima_forecast_url2)
+        with patch(
+            "inventory.forecasting.search_and_store_arima_model"
+        ) as search_and_store_arima_model:
+            run_forecast_job(response.data["job_id"])
+            search_and_store_arima_model.assert_not_called()
+
+        job = ForecastJob.objects.get(id=response.data["job_id"])
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(
+            ARIMAModelOrder.objects.get(inventory=self.inventory_item2).date_searched,
+            model_order.date_searched,
+        )
+
+    def test_forecast_job_upload_does_not_store_arima_model_order(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {"file": open("inventory/tests/test_data_sufficient_data.csv", "rb")}
+        response = self.client.post(self.arima_forecast_url, data)
+        run_forecast_job(response.data["job_id"])
+        self.assertFalse(ARIMAModelOrder.objects.exists())
+        self.assertEqual(ForecastResult.objects.get().source, "upload")
+
+    def test_read_monthly_demand_csv_matches_resample(self):
+        path = "inventory/tests/test_data_sufficient_data.csv"
+        df = pd.read_csv(path)
+        df["datetime"] = pd.to_datetime(df["datetime"])
+        expected = df.set_index("datetime").resample("M").sum()
+
+        with open(path, "rb") as f:
+            file = SimpleUploadedFile("demand.csv", f.read())
+        with patch("inventory.forecasting.UPLOAD_CHUNK_ROWS", 7):
+            monthly_demand = read_monthly_demand_csv(file)
+
+        pd.testing.assert_frame_equal(monthly_demand, expected, check_freq=False)
+
+    def test_read_monthly_demand_csv_too_many_rows(self):
+        with open("inventory/tests/test_data_sufficient_data.csv", "rb") as f:
+            file = SimpleUploadedFile("demand.csv", f.read())
+        with patch("inventory.forecasting.MAX_UPLOAD_ROWS", 100):
+            with self.assertRaises(DemandFileError):
+                read_monthly_demand_csv(file)
+
+    def test_arima_forecast_view_upload_csv_too_large(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {"file": open("inventory/tests/test_data_sufficient_data.csv", "rb")}
+        with patch("inventory.forecasting.MAX_UPLOAD_SIZE", 1024):
+            response = self.client.post(self.arima_forecast_url, data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
+        self.assertFalse(ForecastJob.objects.exists())
+
+    def test_refresh_arima_model_orders(self):
+        date_searched = timezone.now() - timedelta(days=60)
+        ARIMAModelOrder.objects.create(
+            order=[0, 0, 0],
+            seasonal_order=[0, 0, 0, 12],
+            residual_pvalue=1.0,
+            date_searched=date_searched,
+            inventory=self.inventory_item2,
+        )
+
+        refresh_arima_model_orders()
+
+        model_order = ARIMAModelOrder.objects.get(inventory=self.inventory_item2)
+        self.assertGreater(model_order.date_searched, date_searched)
+
+    def test_forecast_job_failed(self):
+        job = ForecastJob.objects.create(
+            inventory=self.inventory_item2,
+            monthly_demand={"datetime": [], "demand": []},
+        )
+
+        run_forecast_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertIsNotNone(job.error)
+
+
+class ForecastBatchViewsTests(SetupClass, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.inventory_item2 = Inventory.objects.create(
+            item_name="Test Item 2",
+            description="Test Description",
+            unit_price=10.00,
+            stock_quantity=100,
+            location="Test Location",
+            procurement_officer=self.procurement_officer,
+        )
+
+        datetime = timezone.datetime(2021, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        HistoricalInventory.objects.bulk_create(
+            [
+                HistoricalInventory(
+                    stock_quantity=100,
+                    demand=10,
+                    datetime=datetime + timedelta(days=7 * week),
+                    inventory=self.inventory_item2,
+                )
+                for week in range(260)
+            ]
+        )
+
+        self.forecast_batch_create_url = reverse("forecast_batch_create")
+
+    def test_forecast_batch_view_all_items(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.forecast_batch_create_url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["jobs"], 2)
+
+        batch_url = reverse("forecast_batch_retrieve", args=[response.data["batch_id"]])
+        response = self.client.get(batch_url)
+        self.assertEqual(response.data["status"], "running")
+        self.assertEqual(response.data["results"], [])
+
+        for job in ForecastJob.objects.all():
+            run_forecast_job(job.id)
+
+        response = self.client.get(batch_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "completed")
+        self.assertEqual(response.data["completed"], 1)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(len(response.data["summary"]["items"]), 1)
+        self.assertEqual(
+            response.data["summary"]["locations"][0]["annual_forecast"],
+            response.data["summary"]["items"][0]["annual_forecast"],
+        )
+
+    def test_forecast_batch_view_selected_items(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {"inventory_ids": [self.inventory_item2.id]}
+        response = self.client.post(self.forecast_batch_create_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["jobs"], 1)
+
+    def test_forecast_batch_view_other_procurement_officer_items(self):
+        self.client.force_authenticate(user=self.procurement_officer2)
+        data = {"inventory_ids": [self.inventory_item2.id]}
+        response = self.client.post(self.forecast_batch_create_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forecast_batch_retrieve_view_other_procurement_officer(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.forecast_batch_create_url)
+        batch_url = reverse("forecast_batch_retrieve", args=[response.data["batch_id"]])
+
+        self.client.force_authenticate(user=self.procurement_officer2)
+        response = self.client.get(batch_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_forecast_batch_view_vendor(self):
+        self.client.force_authenticate(user=self.vendor)
+        response = self.client.post(self.forecast_batch_create_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BacktestForecastsCommandTests(SetupClass, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        datetime = timezone.datetime(2021, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        HistoricalInventory.objects.bulk_create(
+            [
+                HistoricalInventory(
+                    stock_quantity=100,
+                    demand=10,
+                    datetime=datetime + timedelta(days=7 * week),
+                    inventory=self.inventory_item,
+                )
+                for week in range(260)
+            ]
+        )
+
+    def test_backtest_forecasts_synthetic(self):
+        out = StringIO()
+        call_command(
+            "backtest_forecasts",
+            "--synthetic=2",
+            "--months=40",
+            "--seed=1",
+            "--engines",
+            "seasonal_naive",
+            "ets",
+            "--step=4",
+            "--workers=1",
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn("seasonal_naive", output)
+        self.assertIn("ets", output)
+        self.assertIn("mape", output)
+
+    def test_backtest_forecasts_inventory(self):
+        out = StringIO()
+        call_command(
+            "backtest_forecasts",
+            f"--inventory-ids={self.inventory_item.id}",
+            "--engines",
+            "seasonal_naive",
+            "--step=12",
+            "--workers=1",
+            stdout=out,
+        )
+        self.assertIn("seasonal_naive", out.getvalue())
+
+    def test_backtest_series_auto_arima_fits_in_process(self):
+        demand = generate_synthetic_monthly_demand(1, 48, seed=1)[0]
+        with patch(
+            "inventory.forecasting.run_fit_in_process",
+            side_effect=AssertionError("Backtest fits must not fork"),
+        ):
+            result = backtest_series("series", demand, "auto_arima", 12, 36, 12)
+        self.assertEqual(result["folds"], 1)
+        self.assertEqual(result["failed_folds"], 0)
+        # The ARIMA search allocates far more than the fold bookkeeping
+        self.assertGreater(result["peak_memory"], 1024 * 1024)
+
+    def test_backtest_forecasts_insufficient_data(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "backtest_forecasts",
+                f"--inventory-ids={self.inventory_item.id}",
+                "--min-train=100",
+                "--workers=1",
+                stdout=StringIO(),
+            )
+
+
+class ExportHistoryTests(SetupClass, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        datetime = timezone.datetime(2021, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        HistoricalInventory.objects.bulk_create(
+            [
+                HistoricalInventory(
+                    stock_quantity=1000 - day,
+                    demand=day % 5,
+                    datetime=datetime + timedelta(days=day),
+                    inventory=self.inventory_item,
+                )
+                for day in range(250)
+            ]
+        )
+        self.history_export_url = reverse("historical_inventory_export")
+
+    def assert_export_matches(self, columns, historical_inventory):
+        rows = list(
+            historical_inventory.order_by("id").values_list(
+                "inventory_id", "datetime", "stock_quantity", "demand"
+            )
+        )
+        self.assertEqual(len(columns["demand"]), len(rows))
+        self.assertEqual(columns["demand"].tolist(), [row[3] for row in rows])
+        self.assertEqual(columns["stock_quantity"].tolist(), [row[2] for row in rows])
+        self.assertEqual(
+            columns["datetime"].tolist(),
+            [row[1].replace(tzinfo=None) for row in rows],
+        )
+
+    def test_export_history_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = f"{directory}/history.npz"
+            out = StringIO()
+            call_command("export_history", output, "--chunk-rows=100", stdout=out)
+            self.assertIn("Exported 251 rows", out.getvalue())
+
+            columns = read_history_npz(output)
+            with np.load(output) as archive:
+                self.assertIn("demand_00002", archive.files)
+
+        self.assert_export_matches(columns, HistoricalInventory.objects.all())
+
+    def test_export_history_view(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(
+            self.history_export_url,
+            {"inventory_ids": [self.inventory_item.id], "from": "2021-03-01"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("historical_inventory.npz", response["Content-Disposition"])
+
+        columns = read_history_npz(io.BytesIO(b"".join(response.streaming_content)))
+        self.assert_export_matches(
+            columns,
+            HistoricalInventory.objects.filter(
+                inventory=self.inventory_item, datetime__gte="2021-03-01"
+            ),
+        )
+
+    def test_export_history_view_streams_chunks(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        with patch(
+            "inventory.export.iter_history_chunks",
+            side_effect=lambda rows, chunk_rows: iter_history_chunks(rows, 100),
+        ) as iter_chunks:
+            response = self.client.get(self.history_export_url)
+            self.assertTrue(response.streaming)
+
+            # Nothing is read from the database before the first bytes are asked for
+            iter_chunks.assert_not_called()
+            content = list(response.streaming_content)
+
+        # One part per chunk of 100 rows and the archive footer
+        self.assertEqual(len(content), 4)
+        columns = read_history_npz(io.BytesIO(b"".join(content)))
+        self.assert_export_matches(
+            columns,
+            HistoricalInventory.objects.filter(inventory=self.inventory_item),
+        )
+
+    def test_export_history_view_other_procurement_officer(self):
+        self.client.force_authenticate(user=self.procurement_officer2)
+        response = self.client.get(self.history_export_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        columns = read_history_npz(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(columns, {})
+
+    def test_export_history_view_invalid_format(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(self.history_export_url, {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class OptimizedInventoryViewsTests(SetupClass, TestCase):
     def setUp(self):
@@ -1011,3 +2223,371 @@ class OptimizedInventoryViewsTests(SetupClass, TestCase):
         response = self.client.get(self.optimized_inventory_delete_url)
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
         self.assertEqual(OptimizedInventory.objects.count(), 1)
+
+    def test_calculate_optimized_inventory_bulk_matches_scalar(self):
+        nan = float("nan")
+        eoq, safety_stock, reorder_point = calculate_optimized_inventory_bulk(
+            demand=[100, 100, 100, 100, 100],
+            ordering_cost=[10, 10, 10, 10, 10],
+            holding_cost=[5, 5, 5, 5, 5],
+            lead_time=[nan, 5, nan, nan, 5],
+            service_level=[nan, 0.95, nan, nan, nan],
+            shelf_life=[nan, nan, 30, nan, nan],
+            storage_limit=[nan, nan, nan, 10, nan],
+        )
+
+        expected_safety_stock, expected_reorder_point = (
+            calculate_safety_stock_reorder_point(100, 5, 0.95)
+        )
+        self.assertAlmostEqual(eoq[0], calculate_eoq_classical(100, 10, 5))
+        self.assertAlmostEqual(eoq[1], calculate_eoq_with_rop(100, 10, 5, 5, 0.95))
+        self.assertAlmostEqual(eoq[2], calculate_eoq_perishable(100, 10, 5, 30))
+        self.assertAlmostEqual(eoq[3], calculate_eoq_limited_storage(100, 10, 5, 10))
+        self.assertTrue(math.isnan(eoq[4]))
+        self.assertAlmostEqual(safety_stock[1], expected_safety_stock)
+        self.assertAlmostEqual(reorder_point[1], expected_reorder_point)
+        self.assertEqual(int(np.isnan(safety_stock).sum()), 4)
+
+    def test_optimized_inventory_bulk_view_create_and_update(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "items": [
+                {
+                    "inventory": self.inventory_item.id,
+                    "demand": 200,
+                    "ordering_cost": 10,
+                    "holding_cost": 5,
+                },
+                {
+                    "inventory": self.inventory_item2.id,
+                    "demand": 100,
+                    "ordering_cost": 10,
+                    "holding_cost": 5,
+                    "lead_time": 5,
+                    "service_level": 0.95,
+                },
+            ]
+        }
+        response = self.client.post(
+            reverse("optimized_inventory_bulk"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["updated"], 1)
+
+        self.optimized_inventory_item.refresh_from_db()
+        self.assertEqual(self.optimized_inventory_item.demand, 200)
+        self.assertIsNone(self.optimized_inventory_item.lead_time)
+        self.assertIsNone(self.optimized_inventory_item.safety_stock)
+        self.assertAlmostEqual(
+            self.optimized_inventory_item.eoq, calculate_eoq_classical(200, 10, 5)
+        )
+
+        optimized_inventory_item2 = OptimizedInventory.objects.get(
+            inventory=self.inventory_item2
+        )
+        self.assertAlmostEqual(
+            optimized_inventory_item2.eoq,
+            calculate_eoq_with_rop(100, 10, 5, 5, 0.95),
+        )
+        self.assertIsNotNone(optimized_inventory_item2.reorder_point)
+
+    def test_calculate_shared_storage_eoq(self):
+        nan = float("nan")
+        eoq = np.array([100, 200, 50, nan, 30])
+        holding_cost = np.array([1, 4, 2, 1, 1])
+        shared_eoq, multiplier = calculate_shared_storage_eoq(
+            eoq, holding_cost, [0, 0, 1, 0, 1], [150, 100]
+        )
+
+        # The binding location is filled up to its capacity
+        self.assertAlmostEqual(shared_eoq[0] + shared_eoq[1], 150)
+        self.assertGreater(multiplier[0], 0)
+        # Marginal holding cost plus the multiplier is equal for the items sharing it
+        for index in [0, 1]:
+            self.assertAlmostEqual(
+                holding_cost[index] * ((eoq[index] / shared_eoq[index]) ** 2 - 1) / 2,
+                multiplier[0],
+            )
+        self.assertTrue(math.isnan(shared_eoq[3]))
+        # The other location has room for its unconstrained order quantities
+        self.assertEqual(multiplier[1], 0)
+        self.assertEqual(shared_eoq[2], 50)
+        self.assertEqual(shared_eoq[4], 30)
+
+    def test_optimized_inventory_bulk_view_shared_storage(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "mode": "shared_storage",
+            "capacities": {"Test Location": 30},
+            "items": [
+                {
+                    "inventory": self.inventory_item.id,
+                    "demand": 200,
+                    "ordering_cost": 10,
+                    "holding_cost": 5,
+                },
+                {
+                    "inventory": self.inventory_item2.id,
+                    "demand": 100,
+                    "ordering_cost": 10,
+                    "holding_cost": 5,
+                },
+            ],
+        }
+        response = self.client.post(
+            reverse("optimized_inventory_bulk"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        location = response.data["locations"]["Test Location"]
+        self.assertEqual(location["capacity"], 30)
+        self.assertAlmostEqual(location["used"], 30)
+        self.assertGreater(location["multiplier"], 0)
+
+        eoq = sorted(
+            OptimizedInventory.objects.filter(
+                inventory__in=[self.inventory_item, self.inventory_item2]
+            ).values_list("eoq", flat=True)
+        )
+        # Equal holding costs shrink both order quantities by the same factor
+        self.assertAlmostEqual(sum(eoq), 30)
+        self.assertAlmostEqual(
+            eoq[1] / eoq[0],
+            calculate_eoq_classical(200, 10, 5) / calculate_eoq_classical(100, 10, 5),
+        )
+
+    def test_optimized_inventory_bulk_view_shared_storage_includes_colocated_items(
+        self,
+    ):
+        self.client.force_authenticate(user=self.procurement_officer)
+        # inventory_item shares "Test Location" with inventory_item2 but is not in the request
+        data = {
+            "mode": "shared_storage",
+            "capacities": {"Test Location": 30},
+            "items": [
+                {
+                    "inventory": self.inventory_item2.id,
+                    "demand": 100,
+                    "ordering_cost": 10,
+                    "holding_cost": 5,
+                },
+            ],
+        }
+        response = self.client.post(
+            reverse("optimized_inventory_bulk"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertAlmostEqual(response.data["locations"]["Test Location"]["used"], 30)
+
+        eoq = OptimizedInventory.objects.filter(
+            inventory__location="Test Location"
+        ).values_list("eoq", flat=True)
+        self.assertEqual(len(eoq), 2)
+        self.assertAlmostEqual(sum(eoq), 30)
+
+    def test_optimized_inventory_bulk_view_shared_storage_without_capacities(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(
+            reverse("optimized_inventory_bulk"),
+            {"mode": "shared_storage"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("capacities", response.data)
+
+    def test_optimized_inventory_bulk_view_recompute_existing(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(
+            reverse("optimized_inventory_bulk"), {}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(response.data["updated"], 1)
+
+        self.optimized_inventory_item.refresh_from_db()
+        self.assertAlmostEqual(
+            self.optimized_inventory_item.eoq,
+            calculate_eoq_with_rop(100, 10, 5, 5, 0.95),
+        )
+
+    def test_optimized_inventory_bulk_view_other_procurement_officer(self):
+        self.client.force_authenticate(user=self.procurement_officer2)
+        data = {
+            "items": [
+                {
+                    "inventory": self.inventory_item.id,
+                    "demand": 200,
+                    "ordering_cost": 10,
+                    "holding_cost": 5,
+                }
+            ]
+        }
+        response = self.client.post(
+            reverse("optimized_inventory_bulk"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.optimized_inventory_item.refresh_from_db()
+        self.assertEqual(self.optimized_inventory_item.demand, 100)
+
+    def test_optimized_inventory_bulk_view_vendor(self):
+        self.client.force_authenticate(user=self.vendor)
+        response = self.client.post(
+            reverse("optimized_inventory_bulk"), {}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class InventorySimulationTests(SetupClass, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.forecast_result = ForecastResult.objects.create(
+            inventory=self.inventory_item,
+            fingerprint="fingerprint",
+            parameters={},
+            result={
+                "history": {"datetime": [], "demand": []},
+                "decomposition": {"residual": [None, 0.0, 0.0, 0.0, None]},
+                "forecast": [100.0] * 12,
+            },
+        )
+
+        self.inventory_simulation_url = reverse(
+            "inventory_simulation", args=[self.inventory_item.id]
+        )
+
+    def test_simulate_inventory_policy_without_demand(self):
+        result = simulate_inventory_policy(
+            {"monthly_mean": [0.0], "monthly_std": 0.0},
+            initial_stock=50,
+            reorder_point=10,
+            order_quantity=20,
+            lead_time=3,
+            holding_cost=3.65,
+            ordering_cost=50,
+            n_paths=10,
+            horizon_days=30,
+        )
+        self.assertEqual(result["fill_rate"], 1.0)
+        self.assertEqual(result["stockout_probability"], 0.0)
+        self.assertEqual(result["expected_orders"], 0.0)
+        self.assertAlmostEqual(result["expected_holding_cost"], 50 * 0.01 * 30)
+        self.assertEqual(result["expected_ending_stock"], 50.0)
+
+    def test_simulate_inventory_policy_without_orders(self):
+        # 10 units a day against 100 units of stock runs out after 10 of 20 days
+        result = simulate_inventory_policy(
+            {"monthly_mean": [10 * 365 / 12], "monthly_std": 0.0},
+            initial_stock=100,
+            reorder_point=-1,
+            order_quantity=0,
+            lead_time=0,
+            holding_cost=1,
+            ordering_cost=0,
+            n_paths=5,
+            horizon_days=20,
+        )
+        self.assertAlmostEqual(result["fill_rate"], 0.5)
+        self.assertEqual(result["stockout_probability"], 1.0)
+        self.assertEqual(result["expected_stockout_days"], 10.0)
+        self.assertAlmostEqual(result["expected_lost_sales"], 100.0)
+
+    def test_inventory_simulation_view(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(
+            self.inventory_simulation_url, {"n_paths": 200, "horizon_days": 90}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "completed")
+        result = response.data["result"]
+        self.assertEqual(result["n_paths"], 200)
+        self.assertEqual(result["horizon_days"], 90)
+        # The reorder point covers the lead time demand of a noiseless forecast
+        self.assertEqual(result["fill_rate"], 1.0)
+        self.assertEqual(result["stockout_probability"], 0.0)
+        self.assertGreater(result["expected_orders"], 0)
+        self.assertGreater(result["expected_holding_cost"], 0)
+
+    def test_inventory_simulation_view_stockouts(self):
+        self.forecast_result.result = {
+            "history": {"datetime": [], "demand": []},
+            "decomposition": {"residual": [-60.0, 0.0, 60.0]},
+            "forecast": [100.0] * 12,
+        }
+        self.forecast_result.save()
+        self.optimized_inventory_item.reorder_point = 0
+        self.optimized_inventory_item.save()
+
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(
+            self.inventory_simulation_url, {"n_paths": 500, "seed": 7}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data["result"]
+        self.assertLess(result["fill_rate"], 1.0)
+        self.assertGreater(result["stockout_probability"], 0.9)
+
+        response2 = self.client.post(
+            self.inventory_simulation_url, {"n_paths": 500, "seed": 7}
+        )
+        self.assertEqual(response2.data["result"], result)
+
+    def test_inventory_simulation_view_without_forecast(self):
+        self.forecast_result.delete()
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.inventory_simulation_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("forecast", response.data)
+
+    def test_inventory_simulation_view_uploaded_forecast(self):
+        self.forecast_result.source = "upload"
+        self.forecast_result.save()
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.inventory_simulation_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("forecast", response.data)
+        self.assertFalse(InventorySimulation.objects.exists())
+
+    def test_inventory_simulation_view_get_not_allowed(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.get(self.inventory_simulation_url)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_inventory_simulation_view_invalid_query(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.post(self.inventory_simulation_url, {"n_paths": 10})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("n_paths", response.data)
+
+    def test_inventory_simulation_view_other_procurement_officer(self):
+        self.client.force_authenticate(user=self.procurement_officer2)
+        response = self.client.post(self.inventory_simulation_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_inventory_simulation_view_long_run(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        with patch("inventory.views.SIMULATION_SYNC_MAX_PATH_DAYS", 1000):
+            response = self.client.post(
+                self.inventory_simulation_url, {"n_paths": 200, "horizon_days": 30}
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        simulation_id = response.data["simulation_id"]
+        self.assertEqual(response.data["status"], "pending")
+
+        run_inventory_simulation(simulation_id)
+
+        response = self.client.get(
+            reverse("inventory_simulation_detail", args=[simulation_id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "completed")
+        self.assertEqual(response.data["result"]["n_paths"], 200)
+        self.assertEqual(response.data["result"]["fill_rate"], 1.0)
+
+        self.client.force_authenticate(user=self.procurement_officer2)
+        response = self.client.get(
+            reverse("inventory_simulation_detail", args=[simulation_id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -12,16 +12,61 @@ urlpatterns = [
     path(
         "<int:pk>/delete/", views.InventoryDeleteView.as_view(), name="inventory_delete"
     ),
+    path(
+        "stock/bulk/",
+        views.InventoryBulkStockUpdateView.as_view(),
+        name="inventory_bulk_stock_update",
+    ),
+    path(
+        "import/",
+        views.InventoryImportCreateView.as_view(),
+        name="inventory_import_create",
+    ),
+    path(
+        "import/<int:pk>/",
+        views.InventoryImportRetrieveView.as_view(),
+        name="inventory_import_retrieve",
+    ),
     path(
         "historical/<int:inventory_id>/list/",
         views.HistoricalInventoryListView.as_view(),
         name="historical_inventory_list",
     ),
+    path(
+        "historical/export/",
+        views.HistoricalInventoryExportView.as_view(),
+        name="historical_inventory_export",
+    ),
     path(
         "forecast/<int:inventory_id>/",
         views.ARIMAForecastAPIView.as_view(),
         name="arima_forecast",
     ),
+    path(
+        "forecast/jobs/<int:pk>/",
+        views.ForecastJobRetrieveView.as_view(),
+        name="forecast_job_retrieve",
+    ),
+    path(
+        "forecast/batch/",
+        views.ForecastBatchCreateView.as_view(),
+        name="forecast_batch_create",
+    ),
+    path(
+        "forecast/batch/<int:pk>/",
+        views.ForecastBatchRetrieveView.as_view(),
+        name="forecast_batch_retrieve",
+    ),
+    path(
+        "optimize/bulk/",
+        views.OptimizedInventoryBulkAPIView.as_view(),
+        name="optimized_inventory_bulk",
+    ),
+    path(
+        "optimize/simulations/<int:pk>/",
+        views.InventorySimulationRetrieveView.as_view(),
+        name="inventory_simulation_detail",
+    ),
     path(
         "optimize/<int:inventory_id>/",
         views.OptimizedInventoryRetrieveAPIView.as_view(),
@@ -42,4 +87,9 @@ urlpatterns = [
         views.OptimizedInventoryDestroyAPIView.as_view(),
         name="optimized_inventory_delete",
     ),
+    path(
+        "optimize/<int:inventory_id>/simulate/",
+        views.InventorySimulationAPIView.as_view(),
+        name="inventory_simulation",
+    ),
 ]
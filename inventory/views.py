@@ -1,33 +1,93 @@
-import io
 import math
-from scipy.stats import norm
 from rest_framework import generics
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from celery import group
 from drf_spectacular.utils import extend_schema
-import pandas as pd
 import numpy as np
-from pmdarima import auto_arima
-import plotly.graph_objs as go
-import plotly.io as pio
-from statsmodels.tsa.seasonal import seasonal_decompose
 from accounts.permissions import IsProcurementOfficer
-from .models import Inventory, HistoricalInventory, OptimizedInventory
+from .models import (
+    Inventory,
+    HistoricalInventory,
+    OptimizedInventory,
+    ForecastBatch,
+    ForecastJob,
+    InventoryImport,
+    InventorySimulation,
+    ForecastResult,
+    invalidate_forecast_results,
+)
 from .serializers import (
     InventorySerializer,
+    InventoryListQuerySerializer,
+    InventoryBulkStockUpdateSerializer,
+    InventoryImportSerializer,
     HistoricalInventorySerializer,
+    HistoricalInventoryBucketSerializer,
+    HistoricalInventoryQuerySerializer,
+    HistoricalInventoryExportSerializer,
     OptimizedInventorySerializer,
+    OptimizedInventoryBulkSerializer,
+    InventorySimulationQuerySerializer,
+    InventorySimulationSerializer,
     ARIMAForecastSerializer,
+    ForecastIncludeSerializer,
+    ForecastJobSerializer,
+    ForecastBatchSerializer,
+)
+from .caching import (
+    INVENTORY_CACHE_TIMEOUT,
+    get_inventory_generation,
+    get_inventory_list_key,
+    get_inventory_item_key,
+    set_inventory_items,
+    delete_inventory_items,
+)
+from .history import HISTORY_INTERVALS, get_history_buckets
+from .export import EXPORT_CONTENT_TYPES, stream_history_export
+from .optimization import (
+    calculate_eoq_classical,
+    calculate_safety_stock_reorder_point,
+    calculate_eoq_with_rop,
+    calculate_eoq_perishable,
+    calculate_eoq_limited_storage,
+    calculate_optimized_inventory_bulk,
+    calculate_shared_storage_eoq,
+)
+from .simulation import (
+    SIMULATION_SYNC_MAX_PATH_DAYS,
+    get_demand_distribution,
+    simulate_inventory_policy,
 )
+from .forecasting import (
+    MIN_FORECAST_MONTHS,
+    MAX_FORECAST_MONTHS,
+    DemandFileError,
+    serialize_monthly_demand,
+    read_monthly_demand_csv,
+    get_monthly_demand,
+    get_forecast_parameters,
+    get_forecast_fingerprint,
+    get_stored_forecast_result,
+    get_forecast_figures,
+)
+from .tasks import run_forecast_job, import_inventory, run_inventory_simulation
 
 
 class BaseInventoryAPIView(generics.GenericAPIView):
@@ -38,17 +98,82 @@ class BaseInventoryAPIView(generics.GenericAPIView):
         return Inventory.objects.filter(procurement_officer=self.request.user)
 
 
+class InventoryCursorPagination(CursorPagination):
+    ordering = ("last_updated", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
 class InventoryListView(BaseInventoryAPIView, generics.ListAPIView):
-    def list(self, request, *args, **kwargs):
-        cache_key = f"{request.user.id}_inventory_list"
-        cached_data = cache.get(cache_key)
+    pagination_class = InventoryCursorPagination
+
+    def get_query(self):
+        if not hasattr(self, "_query"):
+            serializer = InventoryListQuerySerializer(data=self.request.query_params)
+            serializer.is_valid(raise_exception=True)
+            self._query = serializer.validated_data
+        return self._query
+
+    @property
+    def paginator(self):
+        # Pagination is opt-in so existing clients keep getting the full list
+        params = self.request.query_params
+        if "cursor" not in params and "page_size" not in params:
+            return None
+        return super().paginator
 
-        if cached_data is not None:
-            return Response(cached_data)
+    def get_queryset(self):
+        query = self.get_query()
+        queryset = super().get_queryset()
+
+        if "location" in query:
+            queryset = queryset.filter(location=query["location"])
+        if "name" in query:
+            queryset = queryset.filter(item_name__startswith=query["name"])
+        if "min_stock" in query:
+            queryset = queryset.filter(stock_quantity__gte=query["min_stock"])
+        if "max_stock" in query:
+            queryset = queryset.filter(stock_quantity__lte=query["max_stock"])
+        if "fields" in query:
+            queryset = queryset.only(*query["fields"], "last_updated")
+
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.get_query().get("fields"))
+        return super().get_serializer(*args, **kwargs)
 
-        response = super().list(request, *args, **kwargs)
-        cache.set(cache_key, response.data, timeout=60 * 60 * 24)
-        return response
+    def list(self, request, *args, **kwargs):
+        # Only the plain full list is cached, filtered and paginated reads go to the database
+        if self.get_query() or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        # The id list is cached per generation, the items themselves one entry each
+        generation = get_inventory_generation(request.user.id)
+        list_key = get_inventory_list_key(request.user.id, generation)
+        inventory_ids = cache.get(list_key)
+        if inventory_ids is None:
+            inventory_ids = list(
+                self.get_queryset().order_by("id").values_list("id", flat=True)
+            )
+            cache.set(list_key, inventory_ids, timeout=INVENTORY_CACHE_TIMEOUT)
+
+        item_keys = [get_inventory_item_key(id) for id in inventory_ids]
+        cached_items = cache.get_many(item_keys)
+        missing_ids = [
+            id for id, key in zip(inventory_ids, item_keys) if key not in cached_items
+        ]
+        if missing_ids:
+            items = self.get_serializer(
+                self.get_queryset().filter(id__in=missing_ids), many=True
+            ).data
+            set_inventory_items(items)
+            cached_items.update(
+                {get_inventory_item_key(item["id"]): item for item in items}
+            )
+
+        return Response([cached_items[key] for key in item_keys if key in cached_items])
 
 
 class InventoryCreateView(BaseInventoryAPIView, generics.CreateAPIView):
@@ -56,8 +181,7 @@ class InventoryCreateView(BaseInventoryAPIView, generics.CreateAPIView):
 
     def perform_create(self, serializer):
         serializer.save(procurement_officer=self.request.user)
-        cache_key = f"{self.request.user.id}_inventory_list"
-        cache.delete(cache_key)
+        set_inventory_items([serializer.data])
 
 
 class InventoryRetrieveView(BaseInventoryAPIView, generics.RetrieveAPIView):
@@ -67,17 +191,129 @@ class InventoryRetrieveView(BaseInventoryAPIView, generics.RetrieveAPIView):
 class InventoryUpdateView(BaseInventoryAPIView, generics.UpdateAPIView):
     def update(self, request, *args, **kwargs):
         response = super().update(request, *args, **kwargs)
-        cache_key = f"{request.user.id}_inventory_list"
-        cache.delete(cache_key)
+        # Only the entry of the updated item is rewritten, the officer's list stays cached
+        set_inventory_items([response.data])
         return response
 
 
 class InventoryDeleteView(BaseInventoryAPIView, generics.DestroyAPIView):
-    def destroy(self, request, *args, **kwargs):
-        response = super().destroy(request, *args, **kwargs)
-        cache_key = f"{request.user.id}_inventory_list"
-        cache.delete(cache_key)
-        return response
+    pass
+
+
+class InventoryBulkStockUpdateView(BaseInventoryAPIView):
+    serializer_class = InventoryBulkStockUpdateSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        stock_quantities = {
+            item["id"]: item["stock_quantity"]
+            for item in serializer.validated_data["items"]
+        }
+        if len(stock_quantities) != len(serializer.validated_data["items"]):
+            return Response(
+                {"items": "Each inventory item can only be included once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        timestamp = timezone.now()
+        with transaction.atomic():
+            inventory = list(
+                self.get_queryset().select_for_update().filter(id__in=stock_quantities)
+            )
+            missing_ids = sorted(
+                set(stock_quantities) - {item.id for item in inventory}
+            )
+            if missing_ids:
+                return Response(
+                    {"items": f"Inventory items not found: {missing_ids}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Latest history row of every item in one query, as the post_save signal would look up per item
+            latest_stock_quantities = dict(
+                HistoricalInventory.objects.filter(inventory_id__in=stock_quantities)
+                .annotate(
+                    row_number=Window(
+                        RowNumber(),
+                        partition_by=[F("inventory_id")],
+                        order_by=F("datetime").desc(),
+                    )
+                )
+                .filter(row_number=1)
+                .values_list("inventory_id", "stock_quantity")
+            )
+
+            historical_inventory = []
+            for item in inventory:
+                item.stock_quantity = stock_quantities[item.id]
+                item.last_updated = timestamp
+                demand = 0
+                if item.id in latest_stock_quantities:
+                    demand = max(
+                        0, latest_stock_quantities[item.id] - item.stock_quantity
+                    )
+                historical_inventory.append(
+                    HistoricalInventory(
+                        stock_quantity=item.stock_quantity,
+                        datetime=timestamp,
+                        inventory=item,
+                        demand=demand,
+                    )
+                )
+
+            # bulk_update skips save() and its post_save signal, so history is written here
+            Inventory.objects.bulk_update(
+                inventory, ["stock_quantity", "last_updated"], batch_size=1000
+            )
+            HistoricalInventory.objects.bulk_create(
+                historical_inventory, batch_size=1000
+            )
+            invalidate_forecast_results(list(stock_quantities))
+
+        delete_inventory_items(list(stock_quantities))
+
+        return Response(
+            {
+                "updated": len(inventory),
+                "items": [
+                    {
+                        "id": history.inventory_id,
+                        "stock_quantity": history.stock_quantity,
+                        "demand": history.demand,
+                    }
+                    for history in historical_inventory
+                ],
+            }
+        )
+
+
+class InventoryImportCreateView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = InventoryImportSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        inventory_import = serializer.save(procurement_officer=request.user)
+
+        # Large catalogs are parsed and created on a Celery worker
+        task = import_inventory.delay(inventory_import.id)
+        inventory_import.task_id = task.id
+        inventory_import.save(update_fields=["task_id"])
+
+        return Response(
+            {"import_id": inventory_import.id, "status": inventory_import.status},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class InventoryImportRetrieveView(generics.RetrieveAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = InventoryImportSerializer
+
+    def get_queryset(self):
+        return InventoryImport.objects.filter(procurement_officer=self.request.user)
 
 
 # @method_decorator(cache_page(60 * 15), name="dispatch")
@@ -85,89 +321,75 @@ class HistoricalInventoryListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
     serializer_class = HistoricalInventorySerializer
 
+    def get_query(self):
+        if not hasattr(self, "_query"):
+            serializer = HistoricalInventoryQuerySerializer(
+                data=self.request.query_params
+            )
+            serializer.is_valid(raise_exception=True)
+            self._query = serializer.validated_data
+        return self._query
+
+    def get_serializer_class(self):
+        if "interval" in self.get_query():
+            return HistoricalInventoryBucketSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
         inventory_id = self.kwargs.get("inventory_id")
+        query = self.get_query()
 
         inventory = get_object_or_404(
             Inventory, id=inventory_id, procurement_officer=self.request.user
         )
 
-        return HistoricalInventory.objects.filter(inventory=inventory)
-
-
-def calculate_auto_arima(monthly_demand):
-    decomposed = seasonal_decompose(monthly_demand["demand"])
-    data = monthly_demand["demand"]
-    trend = decomposed.trend
-    seasonal = decomposed.seasonal
-    residual = decomposed.resid
-    data_trace = go.Scatter(x=monthly_demand.index, y=data, mode="lines", name="Data")
-    trend_trace = go.Scatter(
-        x=monthly_demand.index, y=trend, mode="lines", name="Trend"
-    )
-    seasonal_trace = go.Scatter(
-        x=monthly_demand.index, y=seasonal, mode="lines", name="Seasonal"
-    )
-    residual_trace = go.Scatter(
-        x=monthly_demand.index, y=residual, mode="lines", name="Residual"
-    )
-    layout = go.Layout(
-        title="Decomposed Components",
-        xaxis=dict(title="Date"),
-        yaxis=dict(title="Value"),
-        xaxis_rangeslider_visible=True,
-    )
-    fig = go.Figure(
-        data=[data_trace, trend_trace, seasonal_trace, residual_trace], layout=layout
-    )
-    decomposed_json = pio.to_json(fig)
-
-    model = auto_arima(
-        monthly_demand["demand"],
-        seasonal=True,
-        m=12,
-        test="adf",
-        maxiter=100,
-        max_order=None,
-        d=None,
-        error_action="ignore",
-        suppress_warnings=True,
-        stepwise=True,
-        trace=True,
-    )
-
-    forecast_results = model.predict(n_periods=12, return_conf_int=False)
-
-    trace1 = go.Scatter(
-        x=monthly_demand.index,
-        y=monthly_demand["demand"],
-        mode="lines+markers",
-        name="Original Data",
-    )
-    forecast_dates = pd.date_range(
-        start=monthly_demand.index[-1], periods=13, freq="M"
-    )[
-        1:
-    ]  # Next 12 months
-    trace2 = go.Scatter(
-        x=forecast_dates, y=forecast_results, mode="lines+markers", name="Forecast Data"
-    )
-    layout = go.Layout(
-        title="Demand Forecast",
-        xaxis=dict(title="Date"),
-        yaxis=dict(title="Demand"),
-        xaxis_rangeslider_visible=True,
-    )
-    fig = go.Figure(data=[trace1, trace2], layout=layout)
-    graph_json = pio.to_json(fig)
-
-    forecast_data = {
-        "decomposed": decomposed_json,
-        "forecast": list(forecast_results),
-        "annual_forecast": sum(forecast_results),
-        "graph": graph_json,
-    }
-    return forecast_data
+        queryset = HistoricalInventory.objects.filter(inventory=inventory)
+        if "from" in query:
+            queryset = queryset.filter(datetime__gte=query["from"])
+        if "to" in query:
+            queryset = queryset.filter(datetime__lte=query["to"])
+        if "interval" not in query:
+            return queryset
+
+        return get_history_buckets(
+            queryset, HISTORY_INTERVALS[query["interval"]]("datetime")
+        )
+
+
+class HistoricalInventoryExportView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = HistoricalInventoryExportSerializer
+
+    def get(self, request):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        historical_inventory = HistoricalInventory.objects.filter(
+            inventory__procurement_officer=request.user
+        )
+        if "inventory_ids" in query:
+            historical_inventory = historical_inventory.filter(
+                inventory_id__in=query["inventory_ids"]
+            )
+        if "from" in query:
+            historical_inventory = historical_inventory.filter(
+                datetime__gte=query["from"]
+            )
+        if "to" in query:
+            historical_inventory = historical_inventory.filter(
+                datetime__lte=query["to"]
+            )
+
+        file_format = query["file_format"]
+        response = StreamingHttpResponse(
+            stream_history_export(historical_inventory, file_format),
+            content_type=EXPORT_CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = content_disposition_header(
+            True, f"historical_inventory.{file_format}"
+        )
+        return response
 
 
 # @method_decorator(cache_page(60 * 15), name="dispatch")
@@ -180,45 +402,108 @@ class ARIMAForecastAPIView(generics.GenericAPIView):
             inventory_id=inventory_id, inventory__procurement_officer=self.request.user
         )
 
-    def get(self, request, inventory_id):
-        historical_inventory = self.get_queryset(inventory_id)
-        if not historical_inventory.exists():
+    def submit_forecast_job(self, inventory, monthly_demand, data, source, submit=True):
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        engine = serializer.validated_data["engine"]
+        include = serializer.validated_data["include"]
+
+        # Check if there is enough data for forecasting (minimum 24 months, maximum 60 months)
+        if len(monthly_demand) < MIN_FORECAST_MONTHS:
             return Response(
                 {
-                    "error": "No historical inventory data found for the specified inventory_id"
+                    "error": "Insufficient data for forecasting. Minimum 24 months of data required."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        elif len(monthly_demand) > MAX_FORECAST_MONTHS:
+            monthly_demand = monthly_demand[
+                -MAX_FORECAST_MONTHS:
+            ]  # Consider only the latest 60 months of data
+
+        monthly_demand = monthly_demand[["demand"]]
+
+        # Reuse the stored forecast if the demand history has not changed
+        fingerprint = get_forecast_fingerprint(
+            monthly_demand, get_forecast_parameters(engine)
+        )
+        forecast_data = get_stored_forecast_result(inventory.id, fingerprint)
+        if forecast_data is not None:
+            figures = get_forecast_figures(
+                inventory.id, fingerprint, forecast_data, include
+            )
+            return Response(
+                {"status": "completed", "result": {**forecast_data, **figures}}
+            )
+
+        # Repeated requests for the same demand wait on the job already fitting it
+        job = (
+            ForecastJob.objects.filter(
+                inventory=inventory,
+                fingerprint=fingerprint,
+                source=source,
+                status__in=["pending", "running"],
+            )
+            .order_by("-id")
+            .first()
+        )
+        if job is None and not submit:
+            return Response(
+                {
+                    "error": "No forecast for the current demand history. Submit one with POST."
                 },
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        data = {
-            "datetime": [item.datetime for item in historical_inventory],
-            "demand": [item.demand for item in historical_inventory],
-            "stock_quantity": [item.stock_quantity for item in historical_inventory],
-        }
-        df = pd.DataFrame(data)
-        df["datetime"] = pd.to_datetime(df["datetime"])
-        df.set_index("datetime", inplace=True)
+        if job is None:
+            # Model fitting is slow, so it runs on a Celery worker instead of the request worker
+            job = ForecastJob.objects.create(
+                inventory=inventory,
+                engine=engine,
+                source=source,
+                fingerprint=fingerprint,
+                monthly_demand=serialize_monthly_demand(monthly_demand),
+            )
+            task = run_forecast_job.delay(job.id)
+            job.task_id = task.id
+            job.save(update_fields=["task_id"])
 
-        # Resample the data to monthly frequency
-        monthly_demand = df.resample("M").sum()
+        return Response(
+            {"job_id": job.id, "status": job.status},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-        # Check if there is enough data for forecasting (minimum 24 months, maximum 60 months)
-        if len(monthly_demand) < 24:
+    def submit_history_forecast_job(self, inventory_id, data, submit):
+        monthly_demand = get_monthly_demand(self.get_queryset(inventory_id))
+        if monthly_demand.empty:
             return Response(
                 {
-                    "error": "Insufficient data for forecasting. Minimum 24 months of data required."
+                    "error": "No historical inventory data found for the specified inventory_id"
                 },
-                status=status.HTTP_400_BAD_REQUEST,
+                status=status.HTTP_404_NOT_FOUND,
             )
-        elif len(monthly_demand) > 60:
-            monthly_demand = monthly_demand[
-                -60:
-            ]  # Consider only the latest 60 months of data
 
-        forecast_data = calculate_auto_arima(monthly_demand)
-        return Response(forecast_data)
+        inventory = Inventory.objects.get(id=inventory_id)
+        return self.submit_forecast_job(
+            inventory, monthly_demand, data, "history", submit
+        )
+
+    def get(self, request, inventory_id):
+        # Only reads the stored forecast or the job fitting it, new jobs are submitted with POST
+        return self.submit_history_forecast_job(
+            inventory_id, request.query_params, submit=False
+        )
 
     def post(self, request, inventory_id):
+        if "file" not in request.data:
+            return self.submit_history_forecast_job(
+                inventory_id, request.data, submit=True
+            )
+
+        inventory = get_object_or_404(
+            Inventory, id=inventory_id, procurement_officer=self.request.user
+        )
+
         file = request.FILES.get("file")
         if not file:
             return Response(
@@ -226,85 +511,183 @@ class ARIMAForecastAPIView(generics.GenericAPIView):
             )
 
         try:
-            df = pd.read_csv(io.StringIO(file.read().decode("utf-8")))
+            monthly_demand = read_monthly_demand_csv(file)
+        except DemandFileError as e:
+            return Response({"file": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if len(df.columns) < 2:
-            return Response(
-                {"file": "Insufficient columns in the file"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        elif len(df.columns) > 2:
-            return Response(
-                {"file": "Too many columns in the file"},
-                status=status.HTTP_400_BAD_REQUEST,
+        return self.submit_forecast_job(
+            inventory, monthly_demand, request.data, "upload"
+        )
+
+
+class ForecastJobRetrieveView(generics.RetrieveAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = ForecastJobSerializer
+
+    def get_queryset(self):
+        return ForecastJob.objects.filter(
+            inventory__procurement_officer=self.request.user
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        include_serializer = ForecastIncludeSerializer(data=request.query_params)
+        include_serializer.is_valid(raise_exception=True)
+        include = include_serializer.validated_data["include"]
+
+        job = self.get_object()
+        data = self.get_serializer(job).data
+        if job.status == "completed" and job.fingerprint:
+            figures = get_forecast_figures(
+                job.inventory_id, job.fingerprint, job.result, include
             )
+            data["result"] = {**job.result, **figures}
+        return Response(data)
 
-        df.columns = ["datetime", "demand"]
-        df["datetime"] = pd.to_datetime(df["datetime"])
-        df.set_index("datetime", inplace=True)
 
-        # Resample the data to monthly frequency
-        monthly_demand = df.resample("M").sum()
+class ForecastBatchCreateView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = ForecastBatchSerializer
 
-        # Check if there is enough data for forecasting (minimum 24 months, maximum 60 months)
-        if len(monthly_demand) < 24:
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        inventory = Inventory.objects.filter(procurement_officer=request.user)
+        requested_ids = serializer.validated_data.get("inventory_ids")
+        if requested_ids is not None:
+            inventory = inventory.filter(id__in=requested_ids)
+        inventory_ids = list(inventory.values_list("id", flat=True))
+
+        if requested_ids is not None:
+            missing_ids = sorted(set(requested_ids) - set(inventory_ids))
+            if missing_ids:
+                return Response(
+                    {"inventory_ids": f"Inventory items not found: {missing_ids}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        if not inventory_ids:
             return Response(
-                {
-                    "error": "Insufficient data for forecasting. Minimum 24 months of data required."
-                },
+                {"error": "No inventory items to forecast."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        elif len(monthly_demand) > 60:
-            monthly_demand = monthly_demand[
-                -60:
-            ]  # Consider only the latest 60 months of data
-
-        forecast_data = calculate_auto_arima(monthly_demand)
-        return Response(forecast_data)
 
+        batch = ForecastBatch.objects.create(procurement_officer=request.user)
+        jobs = ForecastJob.objects.bulk_create(
+            [
+                ForecastJob(
+                    inventory_id=inventory_id,
+                    batch=batch,
+                    engine=serializer.validated_data["engine"],
+                )
+                for inventory_id in inventory_ids
+            ]
+        )
 
-def calculate_eoq_classical(demand, ordering_cost, holding_cost):
-    eoq = np.sqrt((2 * demand * ordering_cost) / holding_cost)
-    return eoq
+        # Fan out one task per item, each job reports its result as soon as it finishes
+        group_result = group(run_forecast_job.s(job.id) for job in jobs).apply_async()
+        for job, task in zip(jobs, group_result.results):
+            job.task_id = task.id
+        ForecastJob.objects.bulk_update(jobs, ["task_id"])
 
+        return Response(
+            {"batch_id": batch.id, "jobs": len(jobs)},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-def calculate_safety_stock_reorder_point(demand, lead_time, service_level):
-    demand_per_day = demand / 365
-    lead_time_demand = demand_per_day * lead_time
-    z_score = norm.ppf(service_level + (1 - service_level) / 2)
-    safety_stock = z_score * math.sqrt(lead_time * demand_per_day * demand_per_day)
-    reorder_point = lead_time_demand + safety_stock
-    return safety_stock, reorder_point
 
+def get_forecast_batch_summary(jobs):
+    items = []
+    locations = {}
+    for job in jobs:
+        if job["status"] != "completed":
+            continue
+        annual_forecast = job["result"]["annual_forecast"]
+        items.append(
+            {
+                "inventory_id": job["inventory_id"],
+                "item_name": job["inventory__item_name"],
+                "location": job["inventory__location"],
+                "annual_forecast": annual_forecast,
+            }
+        )
+        location = locations.setdefault(
+            job["inventory__location"],
+            {"location": job["inventory__location"], "annual_forecast": 0, "items": 0},
+        )
+        location["annual_forecast"] += annual_forecast
+        location["items"] += 1
 
-def calculate_eoq_with_rop(
-    demand, ordering_cost, holding_cost, lead_time, service_level
-):
-    _, reorder_point = calculate_safety_stock_reorder_point(
-        demand, lead_time, service_level
-    )
-    eoq_with_rop = math.sqrt(
-        (2 * demand * ordering_cost) * (reorder_point) / holding_cost
-    )
-    return eoq_with_rop
+    return {"items": items, "locations": list(locations.values())}
 
 
-def calculate_eoq_perishable(demand, ordering_cost, holding_cost, shelf_life):
-    demand_per_day = demand / 365
-    eoq_perishable = math.sqrt(
-        (2 * demand_per_day * ordering_cost) * shelf_life / holding_cost
-    )
-    return eoq_perishable
+class ForecastBatchRetrieveView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = ForecastBatchSerializer
 
+    def get(self, request, pk):
+        batch = get_object_or_404(
+            ForecastBatch, id=pk, procurement_officer=request.user
+        )
 
-def calculate_eoq_limited_storage(
-    demand, ordering_cost, holding_cost, storage_capacity
-):
-    eoq = math.sqrt((2 * demand * ordering_cost) / holding_cost)
-    eoq_limited_storage = min(eoq, storage_capacity)
-    return eoq_limited_storage
+        since = request.query_params.get("since")
+        if since is not None:
+            since = parse_datetime(since)
+            if since is None:
+                return Response(
+                    {"since": "Invalid datetime"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        jobs = list(
+            batch.jobs.values(
+                "id",
+                "status",
+                "result",
+                "error",
+                "last_updated",
+                "inventory_id",
+                "inventory__item_name",
+                "inventory__location",
+            ).order_by("id")
+        )
+        completed = sum(1 for job in jobs if job["status"] == "completed")
+        failed = sum(1 for job in jobs if job["status"] == "failed")
+
+        # Only finished jobs are reported, optionally only those finished after `since`
+        results = [
+            {
+                "job_id": job["id"],
+                "inventory_id": job["inventory_id"],
+                "item_name": job["inventory__item_name"],
+                "location": job["inventory__location"],
+                "status": job["status"],
+                "annual_forecast": (job["result"] or {}).get("annual_forecast"),
+                "forecast": (job["result"] or {}).get("forecast"),
+                "error": job["error"],
+                "last_updated": job["last_updated"],
+            }
+            for job in jobs
+            if job["status"] in ["completed", "failed"]
+            and (since is None or job["last_updated"] > since)
+        ]
+
+        return Response(
+            {
+                "batch_id": batch.id,
+                "status": (
+                    "completed" if completed + failed == len(jobs) else "running"
+                ),
+                "total": len(jobs),
+                "completed": completed,
+                "failed": failed,
+                "results": results,
+                "summary": get_forecast_batch_summary(jobs),
+            }
+        )
 
 
 class OptimizedInventoryCreateAPIView(generics.CreateAPIView):
@@ -462,6 +845,152 @@ class OptimizedInventoryUpdateAPIView(generics.UpdateAPIView):
         serializer.save(safety_stock=safety_stock, reorder_point=reorder_point, eoq=eoq)
 
 
+class OptimizedInventoryBulkAPIView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = OptimizedInventoryBulkSerializer
+
+    input_fields = [
+        "demand",
+        "ordering_cost",
+        "holding_cost",
+        "lead_time",
+        "service_level",
+        "shelf_life",
+        "storage_limit",
+    ]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data.get("items")
+
+        # Without items, every existing OptimizedInventory of the officer is recomputed
+        if items is None:
+            optimized_inventory = list(
+                OptimizedInventory.objects.filter(
+                    inventory__procurement_officer=request.user
+                )
+            )
+            new_optimized_inventory = []
+        else:
+            inventory_ids = [item["inventory"] for item in items]
+            if len(set(inventory_ids)) != len(inventory_ids):
+                return Response(
+                    {"items": "Each inventory item can only be included once."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            owned_ids = set(
+                Inventory.objects.filter(
+                    id__in=inventory_ids, procurement_officer=request.user
+                ).values_list("id", flat=True)
+            )
+            missing_ids = sorted(set(inventory_ids) - owned_ids)
+            if missing_ids:
+                return Response(
+                    {"items": f"Inventory items not found: {missing_ids}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            existing = OptimizedInventory.objects.in_bulk(
+                inventory_ids, field_name="inventory_id"
+            )
+            optimized_inventory = []
+            new_optimized_inventory = []
+            for item in items:
+                instance = existing.get(item["inventory"])
+                if instance is None:
+                    instance = OptimizedInventory(inventory_id=item["inventory"])
+                    new_optimized_inventory.append(instance)
+                else:
+                    optimized_inventory.append(instance)
+                for field in self.input_fields:
+                    setattr(instance, field, item.get(field))
+
+            # Capacity is shared by every item at a location, so the officer's other
+            # optimized items there are solved again with their stored inputs
+            if serializer.validated_data["mode"] == "shared_storage":
+                shared_locations = Inventory.objects.filter(
+                    id__in=inventory_ids,
+                    location__in=list(serializer.validated_data["capacities"]),
+                ).values_list("location", flat=True)
+                optimized_inventory += OptimizedInventory.objects.filter(
+                    inventory__procurement_officer=request.user,
+                    inventory__location__in=shared_locations,
+                ).exclude(inventory_id__in=inventory_ids)
+
+        instances = optimized_inventory + new_optimized_inventory
+        eoq, safety_stock, reorder_point = calculate_optimized_inventory_bulk(
+            *(
+                np.array([getattr(instance, field) for instance in instances], float)
+                for field in self.input_fields
+            )
+        )
+
+        locations = {}
+        if serializer.validated_data["mode"] == "shared_storage":
+            eoq, locations = self.share_storage(
+                instances, eoq, serializer.validated_data["capacities"]
+            )
+        for instance, values in zip(
+            instances, zip(eoq.tolist(), safety_stock.tolist(), reorder_point.tolist())
+        ):
+            instance.eoq, instance.safety_stock, instance.reorder_point = (
+                None if math.isnan(value) else value for value in values
+            )
+
+        with transaction.atomic():
+            OptimizedInventory.objects.bulk_update(
+                optimized_inventory,
+                self.input_fields + ["eoq", "safety_stock", "reorder_point"],
+                batch_size=1000,
+            )
+            OptimizedInventory.objects.bulk_create(
+                new_optimized_inventory, batch_size=1000
+            )
+
+        data = {
+            "created": len(new_optimized_inventory),
+            "updated": len(optimized_inventory),
+            "items": OptimizedInventorySerializer(instances, many=True).data,
+        }
+        if serializer.validated_data["mode"] == "shared_storage":
+            data["locations"] = locations
+        return Response(data)
+
+    def share_storage(self, instances, eoq, capacities):
+        item_locations = dict(
+            Inventory.objects.filter(
+                id__in=[instance.inventory_id for instance in instances]
+            ).values_list("id", "location")
+        )
+        location_names, group = np.unique(
+            [item_locations[instance.inventory_id] for instance in instances],
+            return_inverse=True,
+        )
+        capacity = np.array(
+            [capacities.get(location, np.inf) for location in location_names]
+        )
+        holding_cost = np.array(
+            [instance.holding_cost for instance in instances], float
+        )
+        eoq, multiplier = calculate_shared_storage_eoq(
+            eoq, holding_cost, group, capacity
+        )
+
+        used = np.bincount(group, weights=np.nan_to_num(eoq), minlength=len(capacity))
+        locations = {
+            location: {
+                "capacity": capacities[location],
+                "used": float(used[index]),
+                "multiplier": float(multiplier[index]),
+            }
+            for index, location in enumerate(location_names.tolist())
+            if location in capacities
+        }
+        return eoq, locations
+
+
 class BaseOptimizedInventoryAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
     serializer_class = OptimizedInventorySerializer
@@ -492,6 +1021,92 @@ class OptimizedInventoryDestroyAPIView(
     pass
 
 
+class InventorySimulationAPIView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = InventorySimulationQuerySerializer
+
+    def post(self, request, inventory_id):
+        optimized_inventory = get_object_or_404(
+            OptimizedInventory.objects.select_related("inventory"),
+            inventory_id=inventory_id,
+            inventory__procurement_officer=request.user,
+        )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if optimized_inventory.eoq is None:
+            return Response(
+                {"eoq": "The inventory item has no optimized order quantity."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Demand paths are drawn from the latest forecast of the item's own history,
+        # results are dropped when history changes
+        forecast_result = (
+            ForecastResult.objects.filter(
+                inventory_id=inventory_id, source="history", result__has_key="history"
+            )
+            .order_by("-date_created")
+            .first()
+        )
+        if forecast_result is None:
+            return Response(
+                {
+                    "forecast": "No forecast found for this inventory item. Run a forecast first."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        parameters = {
+            "distribution": get_demand_distribution(forecast_result.result),
+            "initial_stock": serializer.validated_data.get(
+                "initial_stock", optimized_inventory.inventory.stock_quantity
+            ),
+            "reorder_point": optimized_inventory.reorder_point or 0.0,
+            "order_quantity": optimized_inventory.eoq,
+            "lead_time": optimized_inventory.lead_time or 0,
+            "holding_cost": optimized_inventory.holding_cost,
+            "ordering_cost": optimized_inventory.ordering_cost,
+            "n_paths": serializer.validated_data["n_paths"],
+            "horizon_days": serializer.validated_data["horizon_days"],
+            "seed": serializer.validated_data.get("seed"),
+        }
+
+        if (
+            parameters["n_paths"] * parameters["horizon_days"]
+            <= SIMULATION_SYNC_MAX_PATH_DAYS
+        ):
+            return Response(
+                {
+                    "status": "completed",
+                    "result": simulate_inventory_policy(**parameters),
+                }
+            )
+
+        # Long runs go to a Celery worker instead of the request worker
+        simulation = InventorySimulation.objects.create(
+            inventory_id=inventory_id, parameters=parameters
+        )
+        task = run_inventory_simulation.delay(simulation.id)
+        simulation.task_id = task.id
+        simulation.save(update_fields=["task_id"])
+
+        return Response(
+            {"simulation_id": simulation.id, "status": simulation.status},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class InventorySimulationRetrieveView(generics.RetrieveAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = InventorySimulationSerializer
+
+    def get_queryset(self):
+        return InventorySimulation.objects.filter(
+            inventory__procurement_officer=self.request.user
+        )
+
+
 @extend_schema(exclude=True)
 @api_view(["GET"])
 @permission_classes([AllowAny])
@@ -502,12 +1117,22 @@ def getRoutes(request):
         "/<int:pk>",
         "/<int:pk>/update",
         "/<int:pk>/delete",
+        "/stock/bulk",
+        "/import",
+        "/import/<int:pk>",
         "/historical/<int:inventory_id>/list",
+        "/historical/export",
         "/forecast/<int:inventory_id>",
+        "/forecast/jobs/<int:pk>",
+        "/forecast/batch",
+        "/forecast/batch/<int:pk>",
+        "/optimize/bulk",
+        "/optimize/simulations/<int:pk>",
         "/optimize/<int:inventory_id>",
         "/optimize/<int:inventory_id>/create",
         "/optimize/<int:inventory_id>/update",
         "/optimize/<int:inventory_id>/delete",
+        "/optimize/<int:inventory_id>/simulate",
     ]
 
     return Response(routes)
@@ -1,8 +1,22 @@
+import time
 from django.core.cache import cache
 from django.http import HttpRequest
 from django.utils.cache import get_cache_key
 
 
+def get_version(key):
+    # Versioned counters are part of other cache keys, bumping one makes those keys unreachable.
+    # A lost counter restarts from the clock, so it never reuses an older version.
+    return cache.get_or_set(key, time.time_ns(), timeout=None)
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
 def expire_page(path):
     request = HttpRequest()
     request.path = path
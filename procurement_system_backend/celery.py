@@ -16,6 +16,18 @@ app.conf.beat_schedule = {
         "task": "inventory.tasks.send_inventory_notifications",
         "schedule": crontab(hour=10, minute=0, day_of_week=1),
     },
+    "refresh-arima-model-orders": {
+        "task": "inventory.tasks.refresh_arima_model_orders",
+        "schedule": crontab(hour=2, minute=0, day_of_week=0),
+    },
+    "compact-historical-inventory": {
+        "task": "inventory.tasks.compact_historical_inventory",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "draft-reorder-requisitions": {
+        "task": "purchase.tasks.draft_reorder_requisitions",
+        "schedule": crontab(hour=6, minute=0),
+    },
 }
 
 app.autodiscover_tasks()
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+
+class CommaSeparatedChoiceField(serializers.CharField):
+    # A comma separated list of choices, e.g. "radar_plot,parallel_plot", validated into a list without repeats
+    def __init__(self, choices, **kwargs):
+        self.choices = list(choices)
+        kwargs.setdefault("allow_blank", True)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        invalid = [name for name in names if name not in self.choices]
+        if invalid:
+            raise serializers.ValidationError(
+                f"Invalid figures: {invalid}. Choose from {self.choices}."
+            )
+        return list(dict.fromkeys(names))
+
+    def to_representation(self, value):
+        return ",".join(value)
@@ -261,3 +261,17 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+
+# Historical inventory retention
+# Rows older than RAW_DAYS are compacted into daily rows, older than DAILY_DAYS into weekly rows
+HISTORICAL_INVENTORY_RAW_DAYS = int(os.getenv("HISTORICAL_INVENTORY_RAW_DAYS", 90))
+HISTORICAL_INVENTORY_DAILY_DAYS = int(os.getenv("HISTORICAL_INVENTORY_DAILY_DAYS", 365))
+
+# Forecast model fitting
+# ARIMA fits run in a separate process that is killed after FIT_TIMEOUT seconds
+# or when its resident memory grows past FIT_MEMORY_LIMIT megabytes
+FORECAST_FIT_TIMEOUT = int(os.getenv("FORECAST_FIT_TIMEOUT", 120))
+FORECAST_FIT_MEMORY_LIMIT = int(os.getenv("FORECAST_FIT_MEMORY_LIMIT", 1024))
+# A non-stepwise ARIMA order search tries every candidate order, spread over N_JOBS cores
+ARIMA_STEPWISE = os.getenv("ARIMA_STEPWISE", "True") == "True"
+ARIMA_N_JOBS = int(os.getenv("ARIMA_N_JOBS", 1))
@@ -0,0 +1,22 @@
+from procurement_system_backend.cache import get_version, bump_version
+
+RANKING_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_bid_version_key(requisition_id):
+    return f"{requisition_id}_bid_version"
+
+
+def get_bid_ranking_key(requisition_id, version, weights):
+    weights = ",".join(f"{weight:g}" for weight in weights)
+    return f"{requisition_id}_bid_ranking_{version}_{weights}"
+
+
+def get_bid_version(requisition_id):
+    return get_version(get_bid_version_key(requisition_id))
+
+
+def bump_bid_versions(requisition_ids):
+    # The requisition's bids changed, so rankings cached under the old version are never read again
+    for requisition_id in set(requisition_ids):
+        bump_version(get_bid_version_key(requisition_id))
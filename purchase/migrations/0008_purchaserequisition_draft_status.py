@@ -0,0 +1,27 @@
+# Generated by Django 4.2.10 on 2026-10-18 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("purchase", "0007_alter_purchaserequisition_quantity_requested_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="purchaserequisition",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft"),
+                    ("pending", "Pending"),
+                    ("approved", "Approved"),
+                    ("rejected", "Rejected"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0021_forecastresult_source"),
+        ("purchase", "0008_purchaserequisition_draft_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="purchaserequisition",
+            name="inventory",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="inventory.inventory"
+            ),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
 from django.core.validators import MinValueValidator
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from inventory.models import Inventory
-from accounts.models import User
+from accounts.models import User, Vendor
+from .caching import bump_bid_versions
 
 
 class PurchaseRequisition(models.Model):
@@ -19,13 +22,15 @@ class PurchaseRequisition(models.Model):
         upload_to="requisition/attachments", null=True, blank=True
     )
     STATUS_CHOICES = [
+        ("draft", "Draft"),
         ("pending", "Pending"),
         ("approved", "Approved"),
         ("rejected", "Rejected"),
     ]
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     report = models.FileField(upload_to="requisition/reports", null=True, blank=True)
-    inventory = models.OneToOneField(Inventory, on_delete=models.CASCADE)
+    # An item is reordered again once its earlier requisitions are approved or rejected
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE)
 
     def __str__(self):
         return self.requisition_number
@@ -71,3 +76,20 @@ class PurchaseOrder(models.Model):
 
     def __str__(self):
         return self.order_number
+
+
+@receiver(post_save, sender=SupplierBid)
+@receiver(post_delete, sender=SupplierBid)
+def invalidate_bid_rankings(sender, instance, **kwargs):
+    bump_bid_versions([instance.requisition_id])
+
+
+@receiver(post_save, sender=Vendor)
+def invalidate_vendor_bid_rankings(sender, instance, created, **kwargs):
+    # Rankings use the vendor rating, every requisition the vendor bid on is outdated
+    if not created:
+        bump_bid_versions(
+            SupplierBid.objects.filter(supplier_id=instance.user_id).values_list(
+                "requisition_id", flat=True
+            )
+        )
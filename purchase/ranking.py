@@ -0,0 +1,340 @@
+from itertools import combinations
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from scipy.stats import rankdata
+from rest_framework import serializers
+from .models import SupplierBid
+
+# Ranking criteria in decision matrix column order, True when a larger value is better
+RANKING_CRITERIA = {
+    "unit_price": False,
+    "total_cost": False,
+    "days_delivery": False,
+    "supplier_rating": True,
+    "total_ratings": True,
+}
+
+# Limits of a weight sensitivity run, bids times weight vectors are evaluated a chunk at a time
+SENSITIVITY_DEFAULT_SAMPLES = 5000
+SENSITIVITY_MAX_SAMPLES = 100_000
+SENSITIVITY_DEFAULT_STEPS = 10
+SENSITIVITY_MAX_STEPS = 20
+SENSITIVITY_CHUNK_ELEMENTS = 1_000_000
+SENSITIVITY_MAX_EVALUATIONS = 20_000_000
+
+RANKING_BID_FIELDS = [
+    "id",
+    "supplier__company_name",
+    "supplier__vendor__vendor_rating",
+    "supplier__vendor__total_ratings",
+    "quantity_fulfilled",
+    "unit_price",
+    "date_submitted",
+    "days_delivery",
+    "attachments",
+    "comments",
+    "status",
+]
+
+
+def get_bid_matrix(requisition):
+    # One joined query for every bid of the requisition, the numeric columns go into a float matrix
+    rows = list(
+        SupplierBid.objects.filter(requisition=requisition)
+        .order_by("id")
+        .values_list(*RANKING_BID_FIELDS)
+    )
+    if not rows:
+        return rows, np.empty((0, len(RANKING_CRITERIA)))
+
+    values = np.array(
+        [(row[5], row[4], row[7], row[2], row[3]) for row in rows], dtype=float
+    )
+    # Vendors without a profile have no rating yet
+    values = np.nan_to_num(values)
+    matrix = np.column_stack(
+        [
+            values[:, 0],
+            values[:, 0] * values[:, 1],
+            values[:, 2],
+            values[:, 3],
+            values[:, 4],
+        ]
+    )
+    return rows, matrix
+
+
+def get_ranking_weights(weights):
+    # Normalized and rounded, so equal weightings give the same vector and ranking cache key
+    weights = np.array(
+        [weights[criterion] for criterion in RANKING_CRITERIA], dtype=float
+    )
+    return np.round(weights / weights.sum(), 6)
+
+
+def get_normalized_matrix(matrix):
+    # Columns are min-max normalized, a column where every bid is equal does not separate them
+    low = matrix.min(axis=0)
+    spread = matrix.max(axis=0) - low
+    return np.divide(
+        matrix - low,
+        spread,
+        out=np.zeros_like(matrix),
+        where=spread > 0,
+    )
+
+
+def get_topsis_closeness(normalized, weights):
+    # TOPSIS - Technique for Order of Preference by Similarity to Ideal Solution.
+    # Weights are non-negative, so the weighted ideals are the normalized ideals times the weights
+    # and the distances of every bid under every weight vector (one per row) come from two matrix products.
+    benefit = np.array(list(RANKING_CRITERIA.values()))
+    high, low = normalized.max(axis=0), normalized.min(axis=0)
+    positive_ideal = np.where(benefit, high, low)
+    negative_ideal = np.where(benefit, low, high)
+
+    squared_weights = weights**2
+    distance_positive = np.sqrt(
+        squared_weights @ ((normalized - positive_ideal) ** 2).T
+    )
+    distance_negative = np.sqrt(
+        squared_weights @ ((normalized - negative_ideal) ** 2).T
+    )
+    total = distance_positive + distance_negative
+    # Bids equal to both ideals are identical on every criterion and tie in the middle
+    return np.divide(
+        distance_negative, total, out=np.full(total.shape, 0.5), where=total > 0
+    )
+
+
+def rank_bids_topsis(matrix, weights):
+    normalized = get_normalized_matrix(matrix)
+    closeness = get_topsis_closeness(normalized, weights[np.newaxis])[0]
+    rank = rankdata(-closeness, method="average")
+    return normalized * weights, closeness, rank
+
+
+def get_ranking_records(rows, matrix, closeness, rank, order):
+    datetime_field = serializers.DateTimeField()
+    storage = SupplierBid._meta.get_field("attachments").storage
+    records = []
+    for index in order:
+        row = rows[index]
+        records.append(
+            {
+                "id": row[0],
+                "supplier_company_name": row[1],
+                "supplier_rating": row[2],
+                "total_ratings": row[3],
+                "quantity_fulfilled": row[4],
+                "unit_price": float(row[5]),
+                "date_submitted": datetime_field.to_representation(row[6]),
+                "days_delivery": row[7],
+                "attachments": storage.url(row[8]) if row[8] else None,
+                "comments": row[9],
+                "status": row[10],
+                "total_cost": float(matrix[index, 1]),
+                "closeness": float(closeness[index]),
+                "rank": float(rank[index]),
+            }
+        )
+    return records
+
+
+def build_radar_figure(matrix, weighted, rank):
+    criteria = list(RANKING_CRITERIA)
+    fig = go.Figure()
+    for values, name in zip(weighted.tolist(), rank.tolist()):
+        fig.add_trace(
+            go.Scatterpolar(r=values, theta=criteria, fill="toself", name=name)
+        )
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+            )
+        ),
+        showlegend=True,
+        title="Multi-Criteria Evaluation of Bids: Radar Chart Ranking",
+    )
+    return pio.to_json(fig)
+
+
+def build_parallel_figure(matrix, weighted, rank):
+    fig = px.parallel_coordinates(
+        {
+            **{
+                criterion: matrix[:, column]
+                for column, criterion in enumerate(RANKING_CRITERIA)
+            },
+            "rank": rank,
+        },
+        color="rank",
+        color_continuous_scale=px.colors.sequential.Viridis,
+        labels={"rank": "Rank"},
+        dimensions=list(RANKING_CRITERIA),
+    )
+    fig.update_layout(
+        title="Multi-Criteria Evaluation: Parallel Coordinates of Bids Ranking",
+        title_x=0.5,
+        title_y=0.05,
+    )
+    return pio.to_json(fig)
+
+
+RANKING_FIGURES = {
+    "radar_plot": build_radar_figure,
+    "parallel_plot": build_parallel_figure,
+}
+
+
+def rank_requisition_bids(rows, matrix, weights, include):
+    weighted, closeness, rank = rank_bids_topsis(matrix, weights)
+    order = np.argsort(rank, kind="stable")
+    records = get_ranking_records(rows, matrix, closeness, rank, order)
+    figures = {
+        name: RANKING_FIGURES[name](matrix[order], weighted[order], rank[order])
+        for name in include
+    }
+    return records, figures
+
+
+def sample_simplex_weights(method, samples, steps, seed=None):
+    n_criteria = len(RANKING_CRITERIA)
+    if method == "grid":
+        # Every weight vector with weights in multiples of 1 / steps, as bars placed between steps stars
+        bars = np.array(
+            list(combinations(range(steps + n_criteria - 1), n_criteria - 1))
+        )
+        bounds = np.column_stack(
+            [
+                np.full(len(bars), -1),
+                bars,
+                np.full(len(bars), steps + n_criteria - 1),
+            ]
+        )
+        return (np.diff(bounds, axis=1) - 1) / steps
+    # Uniform over the simplex
+    return np.random.default_rng(seed).dirichlet(np.ones(n_criteria), size=samples)
+
+
+def get_weight_dict(weights):
+    return {
+        criterion: round(float(weight), 6)
+        for criterion, weight in zip(RANKING_CRITERIA, weights)
+    }
+
+
+def get_competition_ranks(closeness):
+    # Row-wise ranks where equal closeness shares the best rank, like rankdata(method="min")
+    # but from one sort of the whole chunk
+    order = np.argsort(-closeness, axis=1)
+    ordered = np.take_along_axis(closeness, order, axis=1)
+    positions = np.arange(closeness.shape[1])
+    starts = np.where(
+        np.concatenate(
+            [
+                np.ones((len(closeness), 1), dtype=bool),
+                ordered[:, 1:] != ordered[:, :-1],
+            ],
+            axis=1,
+        ),
+        positions,
+        0,
+    )
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.maximum.accumulate(starts, axis=1) + 1, axis=1)
+    return rank
+
+
+def analyze_weight_sensitivity(rows, matrix, sample_weights, reference_weights):
+    n_bids, n_samples = len(rows), len(sample_weights)
+    normalized = get_normalized_matrix(matrix)
+    reference_winner = int(
+        get_topsis_closeness(normalized, reference_weights[np.newaxis])[0].argmax()
+    )
+
+    rank_counts = np.zeros(n_bids * n_bids, dtype=np.int64)
+    rank_sum = np.zeros(n_bids)
+    rank_square_sum = np.zeros(n_bids)
+    wins = np.zeros(n_bids, dtype=np.int64)
+    region_sum = np.zeros((n_bids, len(RANKING_CRITERIA)))
+    region_low = np.full((n_bids, len(RANKING_CRITERIA)), np.inf)
+    region_high = np.full((n_bids, len(RANKING_CRITERIA)), -np.inf)
+    flip = None
+
+    # Only the ranks are kept from a chunk, so memory does not grow with the number of samples
+    chunk_size = max(1, SENSITIVITY_CHUNK_ELEMENTS // n_bids)
+    for start in range(0, n_samples, chunk_size):
+        weights = sample_weights[start : start + chunk_size]
+        closeness = get_topsis_closeness(normalized, weights)
+        rank = get_competition_ranks(closeness)
+        rank_counts += np.bincount(
+            (np.arange(n_bids) * n_bids + rank - 1).ravel(), minlength=n_bids * n_bids
+        )
+        rank_sum += rank.sum(axis=0)
+        rank_square_sum += (rank**2).sum(axis=0)
+
+        winner = closeness.argmax(axis=1)
+        wins += np.bincount(winner, minlength=n_bids)
+        for bid in np.unique(winner):
+            region = weights[winner == bid]
+            region_sum[bid] += region.sum(axis=0)
+            region_low[bid] = np.minimum(region_low[bid], region.min(axis=0))
+            region_high[bid] = np.maximum(region_high[bid], region.max(axis=0))
+
+        # The closest sampled weights where another bid wins
+        flipped = np.flatnonzero(winner != reference_winner)
+        if len(flipped):
+            distance = np.linalg.norm(weights[flipped] - reference_weights, axis=1)
+            nearest = distance.argmin()
+            if flip is None or distance[nearest] < flip["distance"]:
+                flip = {
+                    "id": rows[winner[flipped[nearest]]][0],
+                    "distance": float(distance[nearest]),
+                    "weights": get_weight_dict(weights[flipped[nearest]]),
+                }
+
+    rank_counts = rank_counts.reshape(n_bids, n_bids)
+    seen = rank_counts > 0
+    mean_rank = rank_sum / n_samples
+    rank_std = np.sqrt(np.maximum(rank_square_sum / n_samples - mean_rank**2, 0.0))
+
+    bids = [
+        {
+            "id": rows[index][0],
+            "supplier_company_name": rows[index][1],
+            "win_rate": float(wins[index] / n_samples),
+            "modal_rank": int(rank_counts[index].argmax() + 1),
+            "rank_stability": float(rank_counts[index].max() / n_samples),
+            "mean_rank": float(mean_rank[index]),
+            "rank_std": float(rank_std[index]),
+            "best_rank": int(seen[index].argmax() + 1),
+            "worst_rank": int(n_bids - seen[index][::-1].argmax()),
+        }
+        for index in range(n_bids)
+    ]
+    bids.sort(key=lambda bid: (-bid["win_rate"], bid["mean_rank"]))
+
+    winner_regions = [
+        {
+            "id": rows[index][0],
+            "share": float(wins[index] / n_samples),
+            "mean_weights": get_weight_dict(region_sum[index] / wins[index]),
+            "min_weights": get_weight_dict(region_low[index]),
+            "max_weights": get_weight_dict(region_high[index]),
+        }
+        for index in np.argsort(-wins, kind="stable")
+        if wins[index]
+    ]
+
+    return {
+        "samples": n_samples,
+        "reference_weights": get_weight_dict(reference_weights),
+        "reference_winner": rows[reference_winner][0],
+        "bids": bids,
+        "winner_regions": winner_regions,
+        "nearest_flip": flip,
+    }
@@ -1,6 +1,14 @@
 from datetime import timedelta
 from rest_framework import serializers
+from procurement_system_backend.fields import CommaSeparatedChoiceField
 from .models import PurchaseRequisition, SupplierBid, PurchaseOrder
+from .ranking import (
+    RANKING_FIGURES,
+    SENSITIVITY_DEFAULT_SAMPLES,
+    SENSITIVITY_MAX_SAMPLES,
+    SENSITIVITY_DEFAULT_STEPS,
+    SENSITIVITY_MAX_STEPS,
+)
 
 
 class PurchaseRequisitionSerializer(serializers.ModelSerializer):
@@ -38,21 +46,6 @@ class SupplierBidProcurementOfficerSerializer(serializers.ModelSerializer):
     )
     supplier_rating = serializers.ReadOnlyField(source="supplier.vendor.vendor_rating")
     total_ratings = serializers.ReadOnlyField(source="supplier.vendor.total_ratings")
-    weight_unit_price = serializers.FloatField(
-        write_only=True, required=True, min_value=0.0, max_value=1.0
-    )
-    weight_total_cost = serializers.FloatField(
-        write_only=True, required=True, min_value=0.0, max_value=1.0
-    )
-    weight_days_delivery = serializers.FloatField(
-        write_only=True, required=True, min_value=0.0, max_value=1.0
-    )
-    weight_supplier_rating = serializers.FloatField(
-        write_only=True, required=True, min_value=0.0, max_value=1.0
-    )
-    weight_total_ratings = serializers.FloatField(
-        write_only=True, required=True, min_value=0.0, max_value=1.0
-    )
 
     class Meta:
         model = SupplierBid
@@ -70,6 +63,24 @@ class SupplierBidProcurementOfficerSerializer(serializers.ModelSerializer):
         ]
         exclude = ["requisition", "supplier"]
 
+
+class BidRankingWeightsSerializer(serializers.Serializer):
+    weight_unit_price = serializers.FloatField(
+        write_only=True, required=True, min_value=0.0, max_value=1.0
+    )
+    weight_total_cost = serializers.FloatField(
+        write_only=True, required=True, min_value=0.0, max_value=1.0
+    )
+    weight_days_delivery = serializers.FloatField(
+        write_only=True, required=True, min_value=0.0, max_value=1.0
+    )
+    weight_supplier_rating = serializers.FloatField(
+        write_only=True, required=True, min_value=0.0, max_value=1.0
+    )
+    weight_total_ratings = serializers.FloatField(
+        write_only=True, required=True, min_value=0.0, max_value=1.0
+    )
+
     def validate(self, attrs):
         weights = [
             attrs.get("weight_unit_price", 0.0),
@@ -95,6 +106,27 @@ class SupplierBidProcurementOfficerSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class SupplierBidRankingSerializer(BidRankingWeightsSerializer):
+    # Comma separated figures to add to the ranking, e.g. "radar_plot,parallel_plot"
+    include = CommaSeparatedChoiceField(
+        RANKING_FIGURES, required=False, default=lambda: list(RANKING_FIGURES)
+    )
+
+
+class SupplierBidSensitivitySerializer(BidRankingWeightsSerializer):
+    # The weights are the reference the nearest winner flip is measured from
+    method = serializers.ChoiceField(choices=["random", "grid"], default="random")
+    samples = serializers.IntegerField(
+        min_value=1,
+        max_value=SENSITIVITY_MAX_SAMPLES,
+        default=SENSITIVITY_DEFAULT_SAMPLES,
+    )
+    steps = serializers.IntegerField(
+        min_value=1, max_value=SENSITIVITY_MAX_STEPS, default=SENSITIVITY_DEFAULT_STEPS
+    )
+    seed = serializers.IntegerField(min_value=0, required=False)
+
+
 class SupplierBidProcurementOfficerStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = SupplierBid
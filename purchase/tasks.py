@@ -1,8 +1,17 @@
+import math
+from datetime import timedelta
+from collections import defaultdict
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Exists, OuterRef
+from django.utils import timezone
+from inventory.models import OptimizedInventory
 from .models import PurchaseRequisition, SupplierBid
 
+REORDER_DEFAULT_LEAD_TIME = 7
+
 
 @shared_task
 def send_requisition_update_email(requisition_id):
@@ -130,3 +139,65 @@ def send_purchase_order_status_email(
         fail_silently=True,
     )
     return "Purchase order status email sent successfully."
+
+
+@shared_task
+def draft_reorder_requisitions():
+    # Items at or below their reorder point without a draft or pending requisition
+    open_requisitions = PurchaseRequisition.objects.filter(
+        inventory=OuterRef("inventory"), status__in=["draft", "pending"]
+    )
+    optimized_items = (
+        OptimizedInventory.objects.filter(
+            ~Exists(open_requisitions),
+            reorder_point__isnull=False,
+            eoq__isnull=False,
+            inventory__stock_quantity__lte=F("reorder_point"),
+        )
+        .select_related("inventory__procurement_officer")
+        .order_by("inventory_id")
+    )
+
+    today = timezone.localdate()
+    requisitions = []
+    officer_items = defaultdict(list)
+    for optimized in optimized_items:
+        inventory = optimized.inventory
+        lead_time = optimized.lead_time or REORDER_DEFAULT_LEAD_TIME
+        safety_stock = optimized.safety_stock
+        requisitions.append(
+            PurchaseRequisition(
+                requisition_number=f"AUTO-{inventory.id}-{today:%Y%m%d}",
+                quantity_requested=max(1, math.ceil(optimized.eoq)),
+                expected_delivery_date=today + timedelta(days=lead_time),
+                urgency_level=(
+                    "high"
+                    if safety_stock is not None
+                    and inventory.stock_quantity <= safety_stock
+                    else "medium"
+                ),
+                comments=f"Drafted automatically: stock {inventory.stock_quantity} is at or below the reorder point {optimized.reorder_point:.2f}.",
+                status="draft",
+                inventory=inventory,
+            )
+        )
+        officer_items[inventory.procurement_officer].append(
+            f"{inventory.item_name} (stock {inventory.stock_quantity}, order {requisitions[-1].quantity_requested})"
+        )
+
+    if not requisitions:
+        return "No inventory items below their reorder point."
+
+    with transaction.atomic():
+        PurchaseRequisition.objects.bulk_create(requisitions)
+
+    # One digest per procurement officer over a single connection
+    messages = []
+    for officer, items in officer_items.items():
+        item_list = "\n".join(items)
+        subject = "Draft Purchase Requisitions Created"
+        message = f"Dear Procurement Officer,\n\nThe following inventory items are at or below their reorder point and draft requisitions have been created for them:\n\n{item_list}\n\nPlease review and submit them.\n\nThank you."
+        messages.append((subject, message, settings.EMAIL_HOST_USER, [officer.email]))
+    send_mass_mail(messages, fail_silently=True)
+
+    return f"{len(requisitions)} draft requisitions created."
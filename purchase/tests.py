@@ -1,5 +1,7 @@
+import json
 from django.test import TestCase
 from django.urls import reverse
+from django.core import mail
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.cache import cache
 from rest_framework import status
@@ -7,8 +9,10 @@ from rest_framework.test import APIClient
 from datetime import timedelta
 from django.utils import timezone
 from accounts.models import User, Vendor
-from inventory.models import Inventory
+from inventory.models import Inventory, OptimizedInventory
 from .models import PurchaseRequisition, SupplierBid, PurchaseOrder
+from .tasks import draft_reorder_requisitions
+from .caching import get_bid_version
 
 
 class SetupClass(TestCase):
@@ -215,6 +219,9 @@ class SetupClass(TestCase):
         self.supplier_bid_procurement_officer_ranking_url = reverse(
             "supplier_bid_procurement_officer_ranking", kwargs={"requisition_id": 4}
         )
+        self.supplier_bid_procurement_officer_sensitivity_url = reverse(
+            "supplier_bid_procurement_officer_sensitivity", kwargs={"requisition_id": 4}
+        )
         self.supplier_bid_procurement_officer_detail_url = reverse(
             "supplier_bid_procurement_officer_detail", kwargs={"pk": 1}
         )
@@ -579,6 +586,147 @@ class PurchaseRequisitionViewsTests(SetupClass, TestCase):
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+class ReorderRequisitionTasksTests(SetupClass, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.inventory_item6 = Inventory.objects.create(
+            item_name="Test Item 6",
+            description="Test Description 6",
+            unit_price=35.00,
+            stock_quantity=10,
+            location="Test Location 6",
+            procurement_officer=self.procurement_officer2,
+        )
+
+        for inventory, reorder_point, eoq, lead_time, safety_stock in [
+            (self.inventory_item, 500.0, 60.0, 5, 20.0),
+            (self.inventory_item4, 250.0, 40.2, 5, 20.0),
+            (self.inventory_item5, 100.0, 80.0, None, None),
+            (self.inventory_item6, 30.0, 0.4, None, 15.0),
+        ]:
+            OptimizedInventory.objects.create(
+                demand=1000,
+                ordering_cost=50,
+                holding_cost=2,
+                lead_time=lead_time,
+                safety_stock=safety_stock,
+                reorder_point=reorder_point,
+                eoq=eoq,
+                inventory=inventory,
+            )
+
+    def test_draft_reorder_requisitions(self):
+        result = draft_reorder_requisitions()
+
+        self.assertEqual(result, "2 draft requisitions created.")
+        drafts = PurchaseRequisition.objects.filter(status="draft").order_by(
+            "inventory_id"
+        )
+        self.assertEqual(
+            [draft.inventory_id for draft in drafts],
+            [self.inventory_item4.id, self.inventory_item6.id],
+        )
+
+        today = timezone.localdate()
+        self.assertEqual(drafts[0].quantity_requested, 41)
+        self.assertEqual(drafts[0].expected_delivery_date, today + timedelta(days=5))
+        self.assertEqual(drafts[0].urgency_level, "medium")
+        self.assertEqual(drafts[1].quantity_requested, 1)
+        self.assertEqual(drafts[1].expected_delivery_date, today + timedelta(days=7))
+        self.assertEqual(drafts[1].urgency_level, "high")
+
+        # Items that already have an open requisition are left alone
+        self.assertEqual(
+            PurchaseRequisition.objects.get(inventory=self.inventory_item).status,
+            "pending",
+        )
+
+    def test_draft_reorder_requisitions_after_closed_requisition(self):
+        for inventory in [self.inventory_item2, self.inventory_item3]:
+            OptimizedInventory.objects.create(
+                demand=1000,
+                ordering_cost=50,
+                holding_cost=2,
+                lead_time=5,
+                safety_stock=20.0,
+                reorder_point=400.0,
+                eoq=30.0,
+                inventory=inventory,
+            )
+
+        result = draft_reorder_requisitions()
+
+        self.assertEqual(result, "4 draft requisitions created.")
+        for inventory, closed_status in [
+            (self.inventory_item2, "approved"),
+            (self.inventory_item3, "rejected"),
+        ]:
+            requisitions = PurchaseRequisition.objects.filter(
+                inventory=inventory
+            ).order_by("id")
+            self.assertEqual(
+                [requisition.status for requisition in requisitions],
+                [closed_status, "draft"],
+            )
+        self.assertEqual(
+            PurchaseRequisition.objects.filter(inventory=self.inventory_item).count(),
+            1,
+        )
+
+    def test_draft_reorder_requisitions_sends_one_digest_per_officer(self):
+        draft_reorder_requisitions()
+
+        self.assertEqual(len(mail.outbox), 2)
+        recipients = {message.to[0] for message in mail.outbox}
+        self.assertEqual(
+            recipients,
+            {self.procurement_officer.email, self.procurement_officer2.email},
+        )
+        for message in mail.outbox:
+            self.assertEqual(message.subject, "Draft Purchase Requisitions Created")
+
+    def test_draft_reorder_requisitions_is_idempotent(self):
+        draft_reorder_requisitions()
+        mail.outbox = []
+
+        result = draft_reorder_requisitions()
+
+        self.assertEqual(result, "No inventory items below their reorder point.")
+        self.assertEqual(PurchaseRequisition.objects.filter(status="draft").count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_draft_requisitions_hidden_from_vendors(self):
+        draft_reorder_requisitions()
+        draft = PurchaseRequisition.objects.get(inventory=self.inventory_item4)
+
+        self.client.force_authenticate(user=self.vendor)
+        response = self.client.get(self.purchase_requisition_vendor_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(draft.id, [item["id"] for item in response.data])
+
+        response = self.client.post(
+            reverse("supplier_bid_create", kwargs={"requisition_id": draft.id}),
+            {"quantity_fulfilled": 50, "unit_price": 10.00, "days_delivery": 7},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["status"], "Requisition is not open for bids.")
+
+    def test_draft_requisition_update_submits_it(self):
+        draft_reorder_requisitions()
+        draft = PurchaseRequisition.objects.get(inventory=self.inventory_item4)
+
+        self.client.force_authenticate(user=self.procurement_officer)
+        response = self.client.patch(
+            reverse("purchase_requisition_update", kwargs={"pk": draft.id}),
+            {"quantity_requested": 45},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        draft.refresh_from_db()
+        self.assertEqual(draft.status, "pending")
+        self.assertEqual(draft.quantity_requested, 45)
+
+
 class SupplierBidViewsTests(SetupClass, TestCase):
     def setUp(self):
         super().setUp()
@@ -994,6 +1142,281 @@ class SupplierBidViewsTests(SetupClass, TestCase):
         self.assertIn("radar_plot", response.data)
         self.assertIn("parallel_plot", response.data)
 
+    def test_supplier_bid_procurement_officer_rank_view_ranking(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.20,
+            "weight_total_cost": 0.20,
+            "weight_days_delivery": 0.20,
+            "weight_supplier_rating": 0.20,
+            "weight_total_ratings": 0.20,
+            "include": "",
+        }
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_ranking_url, data
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("radar_plot", response.data)
+        self.assertNotIn("parallel_plot", response.data)
+        records = json.loads(response.data["dataframe"])
+        self.assertEqual(
+            [record["id"] for record in records],
+            [self.supplier_bid.id, self.supplier_bid2.id],
+        )
+        self.assertEqual([record["rank"] for record in records], [1.0, 2.0])
+        self.assertEqual([record["closeness"] for record in records], [1.0, 0.0])
+        self.assertEqual(records[0]["total_cost"], 500.0)
+        self.assertEqual(records[0]["supplier_company_name"], "Vendor Corporation")
+
+    def test_supplier_bid_procurement_officer_rank_view_query_count(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.50,
+            "weight_total_cost": 0.25,
+            "weight_days_delivery": 0.25,
+            "weight_supplier_rating": 0.0,
+            "weight_total_ratings": 0.0,
+            "include": "radar_plot",
+        }
+        for index in range(20):
+            supplier = User.objects.create_user(
+                username=f"ranking_vendor_{index}",
+                email=f"ranking_vendor_{index}@example.com",
+                gstin=f"27RANKV{index:04d}A1Z5",
+                password="password123",
+                user_role="vendor",
+            )
+            SupplierBid.objects.create(
+                quantity_fulfilled=200,
+                unit_price=12.00 + index,
+                days_delivery=index + 1,
+                supplier=supplier,
+                requisition=self.purchase_requisition4,
+            )
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                self.supplier_bid_procurement_officer_ranking_url, data
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("radar_plot", response.data)
+        self.assertNotIn("parallel_plot", response.data)
+        records = json.loads(response.data["dataframe"])
+        self.assertEqual(len(records), 22)
+        self.assertEqual(records[0]["id"], self.supplier_bid.id)
+        self.assertIsNone(records[-1]["supplier_rating"])
+
+    def test_supplier_bid_procurement_officer_rank_view_cached(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.20,
+            "weight_total_cost": 0.20,
+            "weight_days_delivery": 0.20,
+            "weight_supplier_rating": 0.20,
+            "weight_total_ratings": 0.20,
+        }
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_ranking_url, data
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            cached_response = self.client.post(
+                self.supplier_bid_procurement_officer_ranking_url,
+                {**data, "include": "parallel_plot"},
+            )
+        self.assertEqual(cached_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_response.data["dataframe"], response.data["dataframe"])
+        self.assertEqual(
+            cached_response.data["parallel_plot"], response.data["parallel_plot"]
+        )
+        self.assertNotIn("radar_plot", cached_response.data)
+
+    def test_supplier_bid_procurement_officer_rank_view_bid_change(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.50,
+            "weight_total_cost": 0.0,
+            "weight_days_delivery": 0.50,
+            "weight_supplier_rating": 0.0,
+            "weight_total_ratings": 0.0,
+            "include": "",
+        }
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_ranking_url, data
+        )
+        records = json.loads(response.data["dataframe"])
+        self.assertEqual(records[0]["id"], self.supplier_bid.id)
+
+        version = get_bid_version(self.purchase_requisition4.id)
+        self.supplier_bid2.unit_price = 5.00
+        self.supplier_bid2.save()
+        self.assertNotEqual(get_bid_version(self.purchase_requisition4.id), version)
+
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_ranking_url, data
+        )
+        records = json.loads(response.data["dataframe"])
+        self.assertEqual(records[0]["id"], self.supplier_bid2.id)
+
+        version = get_bid_version(self.purchase_requisition4.id)
+        self.supplier_bid2.delete()
+        self.assertNotEqual(get_bid_version(self.purchase_requisition4.id), version)
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_ranking_url, data
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_supplier_bid_procurement_officer_rank_view_vendor_rating_change(self):
+        version = get_bid_version(self.purchase_requisition4.id)
+        other_version = get_bid_version(self.purchase_requisition.id)
+        vendor = Vendor.objects.get(user=self.vendor2)
+        vendor.vendor_rating = 4.5
+        vendor.total_ratings = 1
+        vendor.save()
+        self.assertNotEqual(get_bid_version(self.purchase_requisition4.id), version)
+        self.assertEqual(get_bid_version(self.purchase_requisition.id), other_version)
+
+    def create_fast_delivery_bid(self):
+        supplier = User.objects.create_user(
+            username="fast_vendor",
+            email="fast_vendor@example.com",
+            gstin="27FASTV0001A1Z5",
+            password="password123",
+            user_role="vendor",
+        )
+        return SupplierBid.objects.create(
+            quantity_fulfilled=200,
+            unit_price=30.00,
+            days_delivery=1,
+            supplier=supplier,
+            requisition=self.purchase_requisition4,
+        )
+
+    def test_supplier_bid_procurement_officer_sensitivity_view_random(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.20,
+            "weight_total_cost": 0.20,
+            "weight_days_delivery": 0.20,
+            "weight_supplier_rating": 0.20,
+            "weight_total_ratings": 0.20,
+            "samples": 2000,
+            "seed": 42,
+        }
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_sensitivity_url, data
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["method"], "random")
+        self.assertEqual(response.data["samples"], 2000)
+        # The first bid is cheaper with the same delivery time, it wins under any weights
+        self.assertEqual(response.data["reference_winner"], self.supplier_bid.id)
+        self.assertEqual(response.data["bids"][0]["id"], self.supplier_bid.id)
+        self.assertEqual(response.data["bids"][0]["win_rate"], 1.0)
+        self.assertEqual(response.data["bids"][0]["rank_stability"], 1.0)
+        self.assertEqual(len(response.data["winner_regions"]), 1)
+        self.assertIsNone(response.data["nearest_flip"])
+
+        repeated_response = self.client.post(
+            self.supplier_bid_procurement_officer_sensitivity_url, data
+        )
+        self.assertEqual(repeated_response.data, response.data)
+
+    def test_supplier_bid_procurement_officer_sensitivity_view_grid(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        fast_bid = self.create_fast_delivery_bid()
+        data = {
+            "weight_unit_price": 0.40,
+            "weight_total_cost": 0.40,
+            "weight_days_delivery": 0.20,
+            "weight_supplier_rating": 0.0,
+            "weight_total_ratings": 0.0,
+            "method": "grid",
+            "steps": 4,
+        }
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_sensitivity_url, data
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Weights in quarters, 70 ways to split four quarters over five criteria
+        self.assertEqual(response.data["samples"], 70)
+        self.assertEqual(response.data["reference_winner"], self.supplier_bid.id)
+
+        bids = {bid["id"]: bid for bid in response.data["bids"]}
+        self.assertEqual(bids[self.supplier_bid2.id]["win_rate"], 0.0)
+        self.assertEqual(bids[fast_bid.id]["best_rank"], 1)
+        self.assertEqual(bids[fast_bid.id]["worst_rank"], 3)
+        self.assertAlmostEqual(sum(bid["win_rate"] for bid in bids.values()), 1.0)
+
+        regions = {region["id"]: region for region in response.data["winner_regions"]}
+        self.assertEqual(set(regions), {self.supplier_bid.id, fast_bid.id})
+        self.assertEqual(regions[fast_bid.id]["max_weights"]["days_delivery"], 1.0)
+        self.assertEqual(regions[fast_bid.id]["min_weights"]["days_delivery"], 0.25)
+
+        nearest_flip = response.data["nearest_flip"]
+        self.assertEqual(nearest_flip["id"], fast_bid.id)
+        self.assertGreater(nearest_flip["weights"]["days_delivery"], 0.20)
+
+    def test_supplier_bid_procurement_officer_sensitivity_view_invalid_data(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.20,
+            "weight_total_cost": 0.20,
+            "weight_days_delivery": 0.20,
+            "weight_supplier_rating": 0.20,
+            "weight_total_ratings": 0.20,
+            "method": "exhaustive",
+            "steps": 100,
+        }
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_sensitivity_url, data
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("method", response.data)
+        self.assertIn("steps", response.data)
+
+    def test_supplier_bid_procurement_officer_sensitivity_view_insufficient_bids(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.20,
+            "weight_total_cost": 0.20,
+            "weight_days_delivery": 0.20,
+            "weight_supplier_rating": 0.20,
+            "weight_total_ratings": 0.20,
+        }
+        response = self.client.post(
+            reverse(
+                "supplier_bid_procurement_officer_sensitivity",
+                kwargs={"requisition_id": 1},
+            ),
+            data,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_supplier_bid_procurement_officer_sensitivity_view_vendor(self):
+        self.client.force_authenticate(user=self.vendor)
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_sensitivity_url, {}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_supplier_bid_procurement_officer_rank_view_invalid_include(self):
+        self.client.force_authenticate(user=self.procurement_officer)
+        data = {
+            "weight_unit_price": 0.20,
+            "weight_total_cost": 0.20,
+            "weight_days_delivery": 0.20,
+            "weight_supplier_rating": 0.20,
+            "weight_total_ratings": 0.20,
+            "include": "bar_plot",
+        }
+        response = self.client.post(
+            self.supplier_bid_procurement_officer_ranking_url, data
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("include", response.data)
+
     def test_supplier_bid_procurement_officer_rank_view_sum_not_1(self):
         self.client.force_authenticate(user=self.procurement_officer)
         data = {
@@ -1128,6 +1551,7 @@ class SupplierBidViewsTests(SetupClass, TestCase):
         data = {
             "status": "accepted",
         }
+        version = get_bid_version(self.purchase_requisition4.id)
         response = self.client.patch(
             self.supplier_bid_procurement_officer_status_url, data
         )
@@ -1139,6 +1563,7 @@ class SupplierBidViewsTests(SetupClass, TestCase):
         # Check that the other bids are rejected
         other_supplier_bid = SupplierBid.objects.get(pk=2)
         self.assertEqual(other_supplier_bid.status, "rejected")
+        self.assertNotEqual(get_bid_version(self.purchase_requisition4.id), version)
 
         # Check that the purchase requisition status is approved
         self.purchase_requisition4.refresh_from_db()
@@ -74,6 +74,11 @@ urlpatterns = [
         views.SupplierBidProcurementOfficerRankingView.as_view(),
         name="supplier_bid_procurement_officer_ranking",
     ),
+    path(
+        "supplier-bids/procurement-officer/list/<int:requisition_id>/ranking/sensitivity/",
+        views.SupplierBidProcurementOfficerSensitivityView.as_view(),
+        name="supplier_bid_procurement_officer_sensitivity",
+    ),
     path(
         "supplier-bids/procurement-officer/<int:pk>/",
         views.SupplierBidProcurementOfficerRetrieveView.as_view(),
@@ -1,6 +1,8 @@
+import json
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.db import IntegrityError
+from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_framework import generics, status, serializers
@@ -9,17 +11,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from drf_spectacular.utils import extend_schema
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.io as pio
 from .models import PurchaseRequisition, SupplierBid, PurchaseOrder
 from .serializers import (
     PurchaseRequisitionSerializer,
     PurchaseRequisitionVendorSerializer,
     SupplierBidSerializer,
     SupplierBidProcurementOfficerSerializer,
+    SupplierBidRankingSerializer,
+    SupplierBidSensitivitySerializer,
     SupplierBidProcurementOfficerStatusSerializer,
     PurchaseOrderSerializer,
     PurchaseOrderStatusSerializer,
@@ -34,6 +33,21 @@ from .tasks import (
     send_purchase_order_email,
     send_purchase_order_status_email,
 )
+from .ranking import (
+    RANKING_CRITERIA,
+    SENSITIVITY_MAX_EVALUATIONS,
+    get_bid_matrix,
+    get_ranking_weights,
+    rank_requisition_bids,
+    sample_simplex_weights,
+    analyze_weight_sensitivity,
+)
+from .caching import (
+    RANKING_CACHE_TIMEOUT,
+    get_bid_ranking_key,
+    get_bid_version,
+    bump_bid_versions,
+)
 from inventory.models import Inventory
 from accounts.permissions import IsProcurementOfficer, IsVendor
 
@@ -183,6 +197,10 @@ class SupplierBidCreateView(BaseSupplierAPIView, generics.CreateAPIView):
             raise serializers.ValidationError(
                 {"status": "Requisition is already approved or rejected."}
             )
+        if requisition.status == "draft":
+            raise serializers.ValidationError(
+                {"status": "Requisition is not open for bids."}
+            )
 
         # Validate quantity_fulfilled against requisition.quantity_requested
         quantity_fulfilled = serializer.validated_data.get("quantity_fulfilled")
@@ -279,7 +297,7 @@ class SupplierBidProcurementOfficerListView(generics.ListAPIView):
 # @method_decorator(cache_page(60 * 15), name="dispatch")
 class SupplierBidProcurementOfficerRankingView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
-    serializer_class = SupplierBidProcurementOfficerSerializer
+    serializer_class = SupplierBidRankingSerializer
 
     def post(self, request, requisition_id, *args, **kwargs):
         requisition = get_object_or_404(
@@ -287,149 +305,83 @@ class SupplierBidProcurementOfficerRankingView(generics.GenericAPIView):
             id=requisition_id,
             inventory__procurement_officer=self.request.user,
         )
-        bids = SupplierBid.objects.filter(requisition=requisition)
-
-        # Check if there are at least two bids
-        if bids.count() < 2:
-            return Response(
-                {"error": "There must be at least two bids to perform ranking."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        serializer = self.serializer_class(bids, many=True)
-        data = serializer.data
-
-        df = pd.DataFrame(data)
-        df["unit_price"] = pd.to_numeric(df["unit_price"])
-        df["quantity_fulfilled"] = pd.to_numeric(df["quantity_fulfilled"])
-        df["days_delivery"] = pd.to_numeric(df["days_delivery"])
-        df["supplier_rating"] = pd.to_numeric(df["supplier_rating"])
-        df["total_ratings"] = pd.to_numeric(df["total_ratings"])
-        df["total_cost"] = df["unit_price"] * df["quantity_fulfilled"]
-
-        # Multi-Criteria Evaluation using TOPSIS - Technique for Order of Preference by Similarity to Ideal Solution
-
-        # 1. Normalize the Decision Matrix
-        norm_df = df.copy()
-        norm_df = norm_df[
-            [
-                "unit_price",
-                "total_cost",
-                "days_delivery",
-                "supplier_rating",
-                "total_ratings",
-            ]
-        ]
-        norm_df = (norm_df - norm_df.min()) / (norm_df.max() - norm_df.min())
-
-        # 2. Define weights for each criterion
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        weights = {
-            "unit_price": serializer.validated_data["weight_unit_price"],
-            "total_cost": serializer.validated_data["weight_total_cost"],
-            "days_delivery": serializer.validated_data["weight_days_delivery"],
-            "supplier_rating": serializer.validated_data["weight_supplier_rating"],
-            "total_ratings": serializer.validated_data["weight_total_ratings"],
-        }
-
-        # 3. Multiply the normalized decision matrix by the weights to get the weighted normalized decision matrix
-        for col in norm_df.columns:
-            norm_df[col] *= weights[col]
-
-        # 4. Determine the positive ideal solution (PIS) and negative ideal solution (NIS)
-        PIS = pd.Series(
+        weights = get_ranking_weights(
             {
-                "unit_price": norm_df["unit_price"].min(),
-                "total_cost": norm_df["total_cost"].min(),
-                "days_delivery": norm_df["days_delivery"].min(),
-                "supplier_rating": norm_df["supplier_rating"].max(),
-                "total_ratings": norm_df["total_ratings"].max(),
+                criterion: serializer.validated_data[f"weight_{criterion}"]
+                for criterion in RANKING_CRITERIA
             }
         )
+        include = serializer.validated_data["include"]
+
+        # Rankings are cached per bid version, so any bid change makes a new key.
+        # A ranking computed while a bid changes is stored under the old version and never read.
+        version = get_bid_version(requisition.id)
+        cache_key = get_bid_ranking_key(requisition.id, version, weights)
+        ranking = cache.get(cache_key) or {}
+        missing = [name for name in include if name not in ranking]
+        if "dataframe" not in ranking or missing:
+            rows, matrix = get_bid_matrix(requisition)
+
+            # Check if there are at least two bids
+            if len(rows) < 2:
+                return Response(
+                    {"error": "There must be at least two bids to perform ranking."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        NIS = pd.Series(
-            {
-                "unit_price": norm_df["unit_price"].max(),
-                "total_cost": norm_df["total_cost"].max(),
-                "days_delivery": norm_df["days_delivery"].max(),
-                "supplier_rating": norm_df["supplier_rating"].min(),
-                "total_ratings": norm_df["total_ratings"].min(),
-            }
+            # Multi-Criteria Evaluation using TOPSIS - Technique for Order of Preference by Similarity to Ideal Solution
+            records, figures = rank_requisition_bids(rows, matrix, weights, missing)
+            ranking.update(figures)
+            ranking["dataframe"] = json.dumps(records)
+            cache.set(cache_key, ranking, timeout=RANKING_CACHE_TIMEOUT)
+
+        response_data = {
+            "dataframe": ranking["dataframe"],
+            **{name: ranking[name] for name in include},
+        }
+        return Response(response_data, content_type="application/json")
+
+
+class SupplierBidProcurementOfficerSensitivityView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    serializer_class = SupplierBidSensitivitySerializer
+
+    def post(self, request, requisition_id, *args, **kwargs):
+        requisition = get_object_or_404(
+            PurchaseRequisition,
+            id=requisition_id,
+            inventory__procurement_officer=self.request.user,
         )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
 
-        # 5. Calculate euclidean distances from PIS and NIS
-        dist_PIS = np.sqrt(((norm_df - PIS) ** 2).sum(axis=1))
-        dist_NIS = np.sqrt(((norm_df - NIS) ** 2).sum(axis=1))
-
-        # 6. Calculate relative closeness
-        closeness = dist_NIS / (dist_PIS + dist_NIS)
-        df["closeness"] = closeness
-        norm_df["closeness"] = closeness
-
-        # 7. Rank the alternatives based on closeness values
-        df["rank"] = df["closeness"].rank(ascending=False)
-        norm_df["rank"] = norm_df["closeness"].rank(ascending=False)
-
-        # Sort the dataframes by rank
-        df = df.sort_values(by="rank")
-        norm_df = norm_df.sort_values(by="rank")
-
-        df_json = df.to_json(orient="records")
-
-        # Create the radar chart
-        criteria = [
-            "unit_price",
-            "total_cost",
-            "days_delivery",
-            "supplier_rating",
-            "total_ratings",
-        ]
-        norm_values = norm_df.values.tolist()
-        alternative_names = list(norm_df["rank"])
-        fig = go.Figure()
-        for name, values in zip(alternative_names, norm_values):
-            fig.add_trace(
-                go.Scatterpolar(r=values, theta=criteria, fill="toself", name=name)
+        rows, matrix = get_bid_matrix(requisition)
+        if len(rows) < 2:
+            return Response(
+                {"error": "There must be at least two bids to perform ranking."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                )
-            ),
-            showlegend=True,
-            title="Multi-Criteria Evaluation of Bids: Radar Chart Ranking",
+
+        reference_weights = get_ranking_weights(
+            {criterion: params[f"weight_{criterion}"] for criterion in RANKING_CRITERIA}
         )
-        radar_plot_json = pio.to_json(fig)
-
-        # Create a parallel coordinates plot
-        fig = px.parallel_coordinates(
-            df,
-            color="rank",
-            color_continuous_scale=px.colors.sequential.Viridis,
-            labels={"rank": "Rank"},
-            dimensions=[
-                "unit_price",
-                "total_cost",
-                "days_delivery",
-                "supplier_rating",
-                "total_ratings",
-            ],
+        sample_weights = sample_simplex_weights(
+            params["method"], params["samples"], params["steps"], params.get("seed")
         )
-        fig.update_layout(
-            title="Multi-Criteria Evaluation: Parallel Coordinates of Bids Ranking",
-            title_x=0.5,
-            title_y=0.05,
+        if len(sample_weights) * len(rows) > SENSITIVITY_MAX_EVALUATIONS:
+            return Response(
+                {
+                    "samples": f"At most {SENSITIVITY_MAX_EVALUATIONS // len(rows)} weight vectors can be evaluated for {len(rows)} bids."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        result = analyze_weight_sensitivity(
+            rows, matrix, sample_weights, reference_weights
         )
-        parallel_plot_json = pio.to_json(fig)
-
-        response_data = {
-            "dataframe": df_json,
-            "radar_plot": radar_plot_json,
-            "parallel_plot": parallel_plot_json,
-        }
-        return Response(response_data, content_type="application/json")
+        return Response({"method": params["method"], **result})
 
 
 class SupplierBidProcurementOfficerRetrieveView(generics.RetrieveAPIView):
@@ -508,6 +460,7 @@ class SupplierBidProcurementOfficerStatusView(generics.UpdateAPIView):
                 id=instance.id
             )
             other_bids.update(status="rejected")
+            bump_bid_versions([requisition.id])
 
             # Convert the QuerySet to a list and extract the email addresses
             supplier_emails = list(other_bids.values_list("supplier__email", flat=True))
@@ -632,6 +585,7 @@ def getRoutes(request):
         "/supplier-bids/<int:pk>/delete",
         "/supplier-bids/procurement-officer/list/<int:requisition_id>",
         "/supplier-bids/procurement-officer/list/<int:requisition_id>/ranking",
+        "/supplier-bids/procurement-officer/list/<int:requisition_id>/ranking/sensitivity",
         "/supplier-bids/procurement-officer/<int:pk>",
         "/supplier-bids/procurement-officer/<int:pk>/status",
         "/purchase-orders/list",